@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+# Batch validation of submissions from the command line, without ArcGIS
+# Validates every CSV, XLS and XLSX file in a directory, or the jobs listed in a manifest, across a pool of
+# worker processes and writes a JSON report for each file plus a summary.
+#
+#   python BatchValidate.py submissions/ --schema URI --layer LAYER [--sheet SHEET] --out reports/
+#   python BatchValidate.py manifest.csv --out reports/ [--processes 4] [--quick]
+#
+# A manifest is a CSV file with the columns file, sheet, schema and layer. The sheet is left blank (or N/A) for
+# CSV files, schema is a schema uri or a "Title version" name, and relative paths are relative to the manifest.
+# In a directory the sheet of an Excel file is --sheet, or else the sheet named after the layer, or else the first.
+# With --quick only the header and a sample of the rows of each file are checked, and the report gives the
+# estimated error rate of the file instead of its row count and SRS.
+# Exits with 0 if every file is valid, 1 if any isn't and 2 if the jobs couldn't be read.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from itertools import izip
+
+import usginmodels
+import ExcelToCsv
+
+EXCEL_EXTENSIONS = (".xls", ".xlsx")
+CSV_EXTENSIONS = (".csv",)
+
+SEVERITY_NAMES = {usginmodels.NOTICE: "notice", usginmodels.WARNING: "warning", usginmodels.ERROR: "error"}
+
+class Job():
+    def __init__(self, in_file, sheet_name, schema, layer_name, quick=False):
+        self.in_file = in_file
+        self.sheet_name = sheet_name or "N/A"
+        self.schema = schema
+        self.layer_name = layer_name
+        self.quick = quick
+
+# Read the jobs of a manifest
+def read_manifest(manifest):
+    base_dir = os.path.dirname(os.path.abspath(manifest))
+    jobs = []
+    manifest_file = open(manifest, "rb")
+    try:
+        for row in csv.DictReader(manifest_file):
+            row = dict((key.strip().lower(), (value or "").strip()) for key, value in row.items() if key)
+            if not row.get("file"):
+                continue
+            jobs.append(Job(os.path.join(base_dir, row["file"]), row.get("sheet"), row.get("schema"), row.get("layer")))
+    finally:
+        manifest_file.close()
+    return jobs
+
+# Make a job for each CSV and Excel file in a directory
+def read_directory(directory, schema, layer_name, sheet_name=None):
+    jobs = []
+    for name in sorted(os.listdir(directory)):
+        extension = os.path.splitext(name)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            jobs.append(Job(os.path.join(directory, name), "N/A", schema, layer_name))
+        elif extension in EXCEL_EXTENSIONS and not name.startswith("~$"):
+            jobs.append(Job(os.path.join(directory, name), sheet_name, schema, layer_name))
+    return jobs
+
+# The sheet of an Excel file to validate when none is given, N/A if it has no sheets
+def default_sheet(in_file, layer_name):
+    names = ExcelToCsv.sheet_names(in_file)
+    if layer_name in names:
+        return layer_name
+    return names[0] if names else "N/A"
+
+# The content models are loaded once, in the parent process before the pool is started. Workers forked from it
+# already have them, anywhere else each worker loads them from the local snapshot once.
+def init_worker():
+    usginmodels.get_models()
+
+# Read all the rows of a usginmodels.ValidationRun, returning its summary
+def validate_stream(run):
+    for rowCorrected in run.rows():
+        pass
+    return run.summary
+
+# Convert (if needed) and validate one file, returning its report as a dictionary
+def run_job(job):
+    start = time.time()
+    report = {
+        "file": job.in_file,
+        "sheet": job.sheet_name,
+        "schema": job.schema,
+        "layer": job.layer_name,
+        "status": "failed",
+        "valid": False
+    }
+
+    try:
+        schema_uri = job.schema
+        if schema_uri and not schema_uri.startswith("http"):
+            schema_uri = usginmodels.get_schema_uri(schema_uri)
+        report["schema_uri"] = schema_uri
+        layer = usginmodels.get_layer(schema_uri, job.layer_name)
+
+        # The values of a sheet go straight to the validator, a CSV file is read as text. Both are validated as
+        # they are read and the corrected rows aren't kept, so a worker's memory doesn't grow with the file.
+        # A quick check only keeps the sampled rows.
+        if os.path.splitext(job.in_file)[1].lower() in EXCEL_EXTENSIONS:
+            if job.sheet_name == "N/A":
+                job.sheet_name = report["sheet"] = default_sheet(job.in_file, job.layer_name)
+                if job.sheet_name == "N/A":
+                    raise ExcelToCsv.ConversionError("The workbook has no sheets")
+            if job.quick:
+                check = ExcelToCsv.quick_check_excel(job.in_file, job.sheet_name, layer)
+            else:
+                rows = ExcelToCsv.iter_sheet_rows(job.in_file, job.sheet_name, layer)
+                summary = validate_stream(usginmodels.iter_validate_rows(rows, schema_uri, job.layer_name))
+        else:
+            csv_file = open(job.in_file, "rb")
+            try:
+                if job.quick:
+                    check = usginmodels.quick_check_file(csv_file, schema_uri, job.layer_name)
+                else:
+                    summary = validate_stream(usginmodels.iter_validate_file(csv_file, schema_uri, job.layer_name))
+            finally:
+                csv_file.close()
+        if job.quick:
+            valid, messages = check.valid, check.header_messages + check.messages
+        else:
+            valid, messages = summary.valid, summary.messages
+    except ExcelToCsv.CellEncodingError as err:
+        report["error"] = str(err)
+        report["error_row"] = err.row
+        report["error_column"] = err.column
+        report["error_cells"] = err.cells
+    except Exception as err:
+        report["error"] = "%s: %s" % (err.__class__.__name__, err)
+    else:
+        counts = {"error": 0, "warning": 0, "notice": 0}
+        report_messages = []
+        for m in messages:
+            severity = SEVERITY_NAMES.get(getattr(m, "severity", None), "notice")
+            counts[severity] += 1
+            report_messages.append({"severity": severity, "text": unicode(m)})
+
+        report.update({
+            "status": "valid" if valid else "invalid",
+            "valid": valid,
+            "counts": counts,
+            "messages": report_messages
+        })
+        if job.quick:
+            report.update({
+                "sampled": check.sampled,
+                "estimated_rows": check.estimated_rows,
+                "error_rate": round(check.error_rate, 4)
+            })
+        else:
+            report.update({
+                "rows": summary.rows,
+                "srs": summary.srs,
+                "long_fields": sorted(name for name, is_long in summary.long_fields.items() if is_long)
+            })
+
+    report["seconds"] = round(time.time() - start, 3)
+    return report
+
+# A report file name for each job, unique within the output directory
+def report_names(jobs):
+    names = []
+    used = set()
+    for job in jobs:
+        base = os.path.splitext(os.path.basename(job.in_file))[0]
+        if job.sheet_name and job.sheet_name != "N/A":
+            base += "-" + job.sheet_name
+        base = "".join(c if c.isalnum() or c in "-_." else "_" for c in base)
+        name = base + ".json"
+        i = 1
+        while name.lower() in used or name.lower() == "summary.json":
+            i += 1
+            name = "%s-%d.json" % (base, i)
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+def write_json(path, data):
+    out_file = open(path, "w")
+    try:
+        json.dump(data, out_file, indent=1, sort_keys=True)
+    finally:
+        out_file.close()
+
+# Validate the jobs across processes, writing the reports as they finish. Returns the summary.
+def run_batch(jobs, out_dir, processes=None):
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    usginmodels.get_models()
+    names = report_names(jobs)
+    start = time.time()
+
+    summary = {"files": [], "valid": 0, "invalid": 0, "failed": 0}
+    if processes == 1 or len(jobs) <= 1:
+        reports = (run_job(job) for job in jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, init_worker)
+        reports = pool.imap(run_job, jobs)
+
+    try:
+        for name, report in izip(names, reports):
+            write_json(os.path.join(out_dir, name), report)
+            summary[report["status"]] += 1
+            summary["files"].append({
+                "file": report["file"],
+                "sheet": report["sheet"],
+                "status": report["status"],
+                "report": name,
+                "rows": report.get("rows", report.get("estimated_rows")),
+                "counts": report.get("counts"),
+                "error": report.get("error"),
+                "seconds": report["seconds"]
+            })
+            print "%-8s %s%s" % (report["status"], report["file"], "" if report["sheet"] == "N/A" else " [" + report["sheet"] + "]")
+        if pool is not None:
+            pool.close()
+    except:
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.join()
+
+    summary["total"] = len(jobs)
+    summary["seconds"] = round(time.time() - start, 3)
+    write_json(os.path.join(out_dir, "summary.json"), summary)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a directory or manifest of submissions against the USGIN content models")
+    parser.add_argument("source", help="a directory of CSV and Excel files, or a CSV manifest with the columns file, sheet, schema, layer")
+    parser.add_argument("--out", required=True, help="directory for the reports")
+    parser.add_argument("--schema", help="schema uri or \"Title version\" for the files of a directory")
+    parser.add_argument("--layer", help="layer name for the files of a directory")
+    parser.add_argument("--sheet", help="sheet of the Excel files of a directory")
+    parser.add_argument("--processes", type=int, help="worker processes, one per CPU by default")
+    parser.add_argument("--quick", action="store_true", help="only check the header and a sample of the rows of each file")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.source):
+        if not args.schema or not args.layer:
+            parser.error("--schema and --layer are needed to validate a directory")
+        jobs = read_directory(args.source, args.schema, args.layer, args.sheet)
+    else:
+        try:
+            jobs = read_manifest(args.source)
+        except (IOError, csv.Error) as err:
+            print >> sys.stderr, "Can't read the manifest: %s" % err
+            return 2
+
+    if not jobs:
+        print >> sys.stderr, "No files to validate"
+        return 2
+    for job in jobs:
+        job.quick = args.quick
+
+    summary = run_batch(jobs, args.out, args.processes)
+    print "%d files: %d valid, %d invalid, %d failed in %.1f s" % (summary["total"], summary["valid"], summary["invalid"], summary["failed"], summary["seconds"])
+
+    return 0 if summary["valid"] == summary["total"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+# Conversion of a sheet of an Excel file to the CSV rows usginmodels validates
+# Shared by the Excel to NGDS Service ArcGIS tool and the batch validator, so it doesn't need arcpy.
+# Problems are raised as ConversionError for the caller to report.
+"""
+
+import datetime
+import os
+import random
+from collections import deque
+from itertools import izip
+import xlrd
+from usginmodels import sampling
+from usginmodels.encoding import EncodingChecker
+from usginmodels.result_cache import hash_sources
+
+class ConversionError(Exception):
+    pass
+
+class SheetNotFound(ConversionError):
+    def __init__(self, sheet_name):
+        ConversionError.__init__(self, "Invalid Sheet Name")
+        self.sheet_name = sheet_name
+
+# The most cells that failed the encoding check listed in the message of a CellEncodingError
+LISTED_CELLS = 10
+
+class CellEncodingError(ConversionError):
+    def __init__(self, rownum, colnum, value, cells=None):
+        message = "Encoding Error! Found an unrecognized character in row " + str(rownum+1) + ", column " + str(colnum+1) + ": " + value.encode("utf-8")
+        self.row = rownum + 1
+        self.column = colnum + 1
+
+        # Every cell with an unrecognized character as (row, column), counting from 1
+        self.cells = [(r + 1, c + 1) for r, c in cells] if cells else [(self.row, self.column)]
+        if len(self.cells) > 1:
+            others = ["row %d, column %d" % cell for cell in self.cells[1:LISTED_CELLS + 1]]
+            if len(self.cells) > LISTED_CELLS + 1:
+                others.append("...")
+            message += ". Also in " + "; ".join(others) + " (" + str(len(self.cells)) + " cells in all)"
+        ConversionError.__init__(self, message)
+
+# The CellEncodingError for the cells that failed the encoding check, a list of (row, column, value)
+def encoding_error(bad_cells):
+    rownum, colnum, value = bad_cells[0]
+    return CellEncodingError(rownum, colnum, value, [(r, c) for r, c, v in bad_cells])
+
+# Hash of the source of this module and of xlrd, set the first time converter_version is called
+converter_hash = None
+
+# The version of the conversion, for the keys of results validated from a spreadsheet (usginmodels.ResultCache)
+def converter_version():
+    global converter_hash
+    if converter_hash is None:
+        module_file = os.path.abspath(__file__)
+        if module_file.endswith((".pyc", ".pyo")):
+            module_file = module_file[:-1]
+        converter_hash = hash_sources([module_file, os.path.dirname(os.path.abspath(xlrd.__file__))])
+    return converter_hash
+
+# Get a list of sheet names for an Excel file
+def sheet_names(in_file):
+    wb = xlrd.open_workbook(in_file, on_demand = True)
+    try:
+        return wb.sheet_names()
+    finally:
+        wb.release_resources()
+
+# Convert the Excel sheet to CSV, returning a list of CSV lines
+def excel_to_csv(in_file, sheet_name):
+    wb = xlrd.open_workbook(in_file)
+    try:
+        sht = wb.sheet_by_name(sheet_name)
+    except:
+        raise SheetNotFound(sheet_name)
+
+    datemode = wb.datemode
+    check = EncodingChecker().check
+    bad_cells = []
+    rows = []
+    date_cells = {}
+    for rownum, (types, values) in enumerate(sht.rows_types_values()):
+        row = []
+        for colnum, (ctype, value) in enumerate(izip(types, values)):
+            # Dates are converted a column at a time below
+            if ctype == xlrd.XL_CELL_DATE:
+                cells = date_cells.get(colnum)
+                if cells is None:
+                    cells = date_cells[colnum] = ([], [])
+                cells[0].append(rownum)
+                cells[1].append(value)
+                row.append(None)
+                continue
+
+            # Text is checked for the encoding once for each distinct value, and every cell that fails is reported
+            if type(value) is unicode:
+                if not check(value):
+                    bad_cells.append((rownum, colnum, value))
+                    row.append(None)
+                    continue
+                text = str(value)
+            else:
+                text = value_text(ctype, value, datemode)
+
+            # Change any single quotes already in the data to double quotes since
+            # entire data values in the csv are enclosed with single quotes
+            row.append("\""+ text.replace("\"","\"\"") + "\"")
+        rows.append(row)
+
+    if bad_cells:
+        raise encoding_error(bad_cells)
+
+    for colnum, (rownums, values) in date_cells.items():
+        for rownum, text in izip(rownums, dates_text(values, datemode)):
+            rows[rownum][colnum] = "\"" + text + "\""
+
+    return [','.join(row) for row in rows]
+
+# Read the sheet as lists of values for usginmodels.validate_rows, the field names first, without going through
+# CSV text. Numbers in double fields stay floats and dates in dateTime fields become datetimes, every other cell
+# is the text excel_to_csv would have written, so the result of validation is the same.
+def sheet_rows(in_file, sheet_name, layer):
+    return list(iter_sheet_rows(in_file, sheet_name, layer))
+
+# sheet_rows as a stream: the rows are read from the file as they are asked for instead of loading the sheet,
+# so validating them a row at a time (usginmodels.iter_validate_rows) takes the same memory for any size of sheet.
+# Rows are padded to the width of the header. If a cell fails the encoding check no more rows are given, the rest
+# of the sheet is only checked for the encoding, and a CellEncodingError with every cell that failed comes up.
+def iter_sheet_rows(in_file, sheet_name, layer):
+    wb = xlrd.open_workbook(in_file, on_demand = True)
+    if sheet_name not in wb.sheet_names():
+        wb.release_resources()
+        raise SheetNotFound(sheet_name)
+
+    return typed_rows(wb, wb.iter_sheet_rows(sheet_name), layer)
+
+# The rows typed_rows reads before converting their dates together
+DATE_BLOCK = 1000
+
+# Yield the rows of iter_sheet_rows from the (types, values) of the cells, releasing the workbook at the end
+def typed_rows(wb, sheet_cells, layer):
+    try:
+        datemode = wb.datemode
+        field_types = dict((f.field_name, f.field_type) for f in layer.fields)
+        check = EncodingChecker().check
+        bad_cells = []
+
+        # Dates are left as None and noted as (row, column, value, field type) to be converted a block at a time
+        dates = []
+
+        def read_row(rownum, types, values, column_types):
+            row = []
+            for colnum, (ctype, value, field_type) in enumerate(izip(types, values, column_types)):
+                if type(value) is unicode:
+                    if check(value):
+                        row.append(str(value))
+                    else:
+                        bad_cells.append((rownum, colnum, value))
+                        row.append(None)
+                elif ctype == xlrd.XL_CELL_DATE:
+                    dates.append((row, colnum, value, field_type))
+                    row.append(None)
+                else:
+                    row.append(typed_value(ctype, value, field_type, datemode, rownum, colnum))
+            return row
+
+        def convert_dates():
+            values = [value for row, colnum, value, field_type in dates]
+            for (row, colnum, value, field_type), date in izip(dates, cells_datetime(values, datemode)):
+                row[colnum] = date if field_type == "dateTime" else date.isoformat()
+            del dates[:]
+
+        # The header is text, its field names give the types of the columns
+        for types, values in sheet_cells:
+            header = read_row(0, types, values, [""] * len(types))
+            convert_dates()
+            break
+        else:
+            return
+        width = len(header)
+        column_types = [field_types.get((name or "").strip(), "") for name in header]
+        if not bad_cells:
+            yield header
+
+        block = []
+        for rownum, (types, values) in enumerate(sheet_cells, 1):
+            # Once a cell has failed the rest of the sheet is only checked for the encoding
+            if bad_cells:
+                bad_cells.extend((rownum, colnum, value) for colnum, value in enumerate(values)
+                                 if type(value) is unicode and not check(value))
+                continue
+
+            if len(types) > len(column_types):
+                column_types.extend([""] * (len(types) - len(column_types)))
+            row = read_row(rownum, types, values, column_types)
+            if len(row) < width:
+                row.extend([""] * (width - len(row)))
+            block.append(row)
+
+            if len(block) == DATE_BLOCK and not bad_cells:
+                convert_dates()
+                for row in block:
+                    yield row
+                block = []
+
+        if bad_cells:
+            raise encoding_error(bad_cells)
+
+        convert_dates()
+        for row in block:
+            yield row
+    finally:
+        wb.release_resources()
+
+# Check the header and a sample of the rows of a sheet against a layer: the first head rows, the last tail rows and
+# samples rows picked at random in between, the same ones for the same seed. The sheet is streamed through once and
+# only the sampled rows are kept and converted, text that can't be encoded is left for the encoding check to report.
+# Returns a usginmodels QuickCheck.
+def quick_check_excel(in_file, sheet_name, layer, head = sampling.HEAD, tail = sampling.TAIL, samples = sampling.SAMPLES, seed = 0):
+    wb = xlrd.open_workbook(in_file, on_demand = True)
+    try:
+        if sheet_name not in wb.sheet_names():
+            raise SheetNotFound(sheet_name)
+        sheet_cells = wb.iter_sheet_rows(sheet_name)
+
+        for types, values in sheet_cells:
+            header = sample_values(types, values, [""] * len(types), wb.datemode)
+            break
+        else:
+            return layer.quick_check([], [], 0)
+
+        first = []
+        last = deque()
+        middle = []
+        rand = random.Random(seed)
+        n_middle = 0
+        n_rows = 0
+        for cells in sheet_cells:
+            n_rows += 1
+            if len(first) < head:
+                first.append(cells)
+                continue
+            if tail:
+                if len(last) < tail:
+                    last.append(cells)
+                    continue
+                last.append(cells)
+                cells = last.popleft()
+
+            # Reservoir sampling of the rows between the head and the tail
+            if n_middle < samples:
+                middle.append((n_middle, cells))
+            else:
+                i = rand.randint(0, n_middle)
+                if i < samples:
+                    middle[i] = (n_middle, cells)
+            n_middle += 1
+
+        field_types = dict((f.field_name, f.field_type) for f in layer.fields)
+        column_types = [field_types.get(name.strip(), "") for name in header]
+        rows = first + [cells for i, cells in sorted(middle)] + list(last)
+        rows = [sample_values(types, values, column_types, wb.datemode) for types, values in rows]
+        return layer.quick_check(header, rows, n_rows)
+    finally:
+        wb.release_resources()
+
+# The values of a sampled row as iter_sheet_rows gives them, except that text that can't be encoded is kept as utf-8
+def sample_values(types, values, column_types, datemode):
+    row = []
+    for ctype, value, field_type in izip(types, values, column_types):
+        try:
+            row.append(typed_value(ctype, value, field_type, datemode, 0, 0))
+        except CellEncodingError:
+            row.append(value.encode("utf-8"))
+    return row
+
+# Get the value of a cell for a field of the given type
+def typed_value(ctype, value, field_type, datemode, rownum, colnum):
+    if ctype == xlrd.XL_CELL_NUMBER and field_type == "double":
+        # As the text of the csv file would be read: whole numbers exactly, others to the 12 digits str keeps
+        if value == int(value):
+            return float(int(value))
+        return float(str(value))
+
+    if ctype == xlrd.XL_CELL_DATE and field_type == "dateTime":
+        return cell_datetime(value, datemode)
+
+    try:
+        return value_text(ctype, value, datemode)
+    except UnicodeError:
+        raise CellEncodingError(rownum, colnum, value)
+
+# Convert an Excel date to a datetime
+def cell_datetime(value, datemode):
+    if value >= 61:
+        year, month, day, hour, minute, second = xlrd.xldate_as_tuple(value, datemode)
+        return datetime.datetime(year, month, day, hour, minute, second)
+    # Excel treats the first 60 days of 1900 as ambiguous (see Microsoft documentation)
+    # Assume the dates are what is indicated in the cell
+    return datetime.datetime(1900, 1, 1, 0, 0, 0) + datetime.timedelta(days = value - 1)
+
+# Convert a list of Excel dates to datetimes as cell_datetime does, the dates after the first 60 days of 1900 all
+# at once
+def cells_datetime(values, datemode):
+    dates = [None] * len(values)
+    later = [i for i, value in enumerate(values) if value >= 61]
+    for i, date in izip(later, xlrd.xldates_as_datetime([values[i] for i in later], datemode)):
+        dates[i] = date
+    if len(later) < len(values):
+        for i, value in enumerate(values):
+            if dates[i] is None:
+                dates[i] = cell_datetime(value, datemode)
+    return dates
+
+# Get the iso dates of a column of Excel dates, as value_text gives them, converting the dates after the first
+# 60 days of 1900 all at once
+def dates_text(values, datemode):
+    texts = [None] * len(values)
+    later = [i for i, value in enumerate(values) if value >= 61]
+    for i, text in izip(later, xlrd.xldates_as_iso([values[i] for i in later], datemode)):
+        texts[i] = text
+    if len(later) < len(values):
+        for i, value in enumerate(values):
+            if texts[i] is None:
+                texts[i] = cell_datetime(value, datemode).isoformat()
+    return texts
+
+# Get the text of a cell as it is written to the csv file
+def cell_text(cell, datemode):
+    return value_text(cell.ctype, cell.value, datemode)
+
+# Get the text of a cell, given its type and value, as it is written to the csv file
+def value_text(ctype, value, datemode):
+
+    # Check that conversion from unicode to utf-8 and Win-1252 encoding (used by the server) is possible
+    # Raises UnicodeError if it isn't
+    if isinstance(value, unicode):
+        value = value.encode("utf-8")
+        value = value.encode("windows-1252")
+
+    # Excel stores #N/A with the internal code 42, change it back to #N/A
+    if isinstance(value, int):
+        if value == 42:
+            value = "#N/A"
+
+    # If the cell contains a date timestamp convert it to an iso date
+    if ctype == 3:
+        value = cell_datetime(value, datemode).isoformat()
+
+    # Remove decimal and trailing zeros that were added on Excel import
+    if isinstance(value, float):
+        if value == int(value):
+            value = '%d'%value
+
+    return str(value)
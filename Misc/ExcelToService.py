@@ -7,22 +7,21 @@
 """
 
 # import required modules
-import csv
 import arcpy
 from arcpy import env
 import os
-import datetime
 import dateutil.parser
 try:
     import usginmodels
 except:
-    arcpy.AddError("There was a problem with the usginmodels. Check that http://schemas.usgin.org/contentmodels.json is up and running.")
+    arcpy.AddError("Import of usginmodels module failed.")
     raise Exception
 try:
     import xlrd
 except:
     arcpy.AddError("Import of XLRD module failed.\nThe XLRD module can be downloaded from: http://pypi.python.org/pypi/xlrd")
     raise Exception
+import ExcelToCsv
 
 # Main function for the Excel to NGDS Feature ArcGIS Tool
 def main(argv=None):
@@ -41,19 +40,41 @@ def main(argv=None):
     path = os.path.dirname(in_file) + "\\"
 
     # Paste from development environment below here
-	
+
+    # The content models are loaded the first time they are needed, not when usginmodels is imported
+    try:
+        usginmodels.get_models()
+    except:
+        arcpy.AddError("There was a problem with the usginmodels. Check that http://schemas.usgin.org/contentmodels.json is up and running.")
+        raise Exception
+
     schema_uri = get_schema_uri(schema_name)
     layer_info = usginmodels.get_layer(schema_uri, layer_name)
 
-    # If data is in a sheet in an Excel file convert to CSV, otherwise just read
-    if sheet_name != "N/A":
-        csv_file = excel_to_csv(in_file, sheet_name)
+    # Reuse the result of an earlier run on the same file, sheet, schema and layer, read by the same conversion
+    results = usginmodels.ResultCache()
+    reader_version = ExcelToCsv.converter_version() if sheet_name != "N/A" else ""
+    result_key = results.key(in_file, sheet_name, schema_uri, layer_name, reader_version)
+    result = results.get(result_key)
+
+    if result is None:
+        # If data is in a sheet in an Excel file read its values straight into the validator, otherwise read the CSV
+        # The sheet is read a row at a time as it is validated and the corrected data comes back a column at a time,
+        # which takes much less memory for a large sheet.
+        if sheet_name != "N/A":
+            result = validate_sheet(in_file, sheet_name, schema_uri, layer_name, layer_info)
+            if result:
+                results.put(result_key, result)
+        else:
+            # Pass in the the CSV, the schema to validate against and the layer name
+            csv_file = open(in_file)
+            result = usginmodels.validate_file(csv_file, schema_uri, layer_name, columnar=True)
+            results.put(result_key, result)
     else:
-        csv_file = open(in_file)
+        arcpy.AddMessage("The file hasn't changed since it was last validated, using the earlier results.")
 
-    if csv_file:
-        # Pass in the the CSV as a dictionary, the schema to validate against and the layer name
-        valid, messages, dataCorrected, long_fields, srs = usginmodels.validate_file(csv_file, schema_uri, layer_name)
+    if result:
+        valid, messages, dataCorrected, long_fields, srs = result
         print_errors(valid, messages, dataCorrected)
 
         try:
@@ -97,71 +118,32 @@ def sheet_names(inExcel):
 
 # Get the uri for the schema
 def get_schema_uri(schema_name):
-    versions_dict = {}
-    models = usginmodels.get_models()
-    for m in models:
-      for v in m.versions:
-        versions_dict[m.title + " " + v.version] = v.uri
-    return versions_dict[schema_name]
+    return usginmodels.get_schema_uri(schema_name)
 
 # Convert the Excel sheet to CSV
 def excel_to_csv(in_file, sheet_name):
-
-    # Get the path for the folder of the Excel file (used for output of GeoDB)
-    path = os.path.dirname(in_file) + "/"
-    wb = xlrd.open_workbook(in_file)
     try:
-        sht = wb.sheet_by_name(sheet_name)
-    except:
-        arcpy.AddError("Invalid Sheet Name")
+        return ExcelToCsv.excel_to_csv(in_file, sheet_name)
+    except ExcelToCsv.SheetNotFound as err:
+        arcpy.AddError(str(err))
+        return None
+    except ExcelToCsv.CellEncodingError as err:
+        arcpy.AddError(str(err))
+        arcpy.AddError("CSV conversion failed")
         return None
 
-    csv_rows = []
-    for rownum in xrange(sht.nrows):
-        row = sht.row_values(rownum)
-        for colnum, col in enumerate(xrange(sht.ncols)):
-            cell = sht.cell(rownum, colnum)
-
-            # Check that conversion from unicode to utf-8 and Win-1252 encoding (used by the server) is possible
-            if isinstance(cell.value, unicode):
-                try:
-                    cell.value = cell.value.encode("utf-8")
-                    cell.value = cell.value.encode("windows-1252")
-                except:
-                    arcpy.AddError("Encoding Error! Found an unrecognized character in row " + str(rownum+1) + ", column " + str(colnum+1) + ": " + str(cell.value))
-                    arcpy.AddError("CSV conversion failed")
-                    return None
-
-            # Excel stores #N/A with the internal code 42, change it back to #N/A
-            if isinstance(cell.value, int):
-                if cell.value == 42:
-                    cell.value = "#N/A"
-
-            # If the cell contains a date timestamp convert it to an iso date
-            if cell.ctype == 3:
-                if cell.value >= 61:
-                    year, month, day, hour, minute, second = xlrd.xldate_as_tuple(cell.value, wb.datemode)
-                    cell.value = datetime.datetime(year, month, day, hour, minute, second).isoformat()
-                # Excel treats the first 60 days of 1900 as ambiguous (see Microsoft documentation)
-                # Assume the dates are what is indicated in the cell
-                else:
-                    cell.value = datetime.datetime(1900, 1, 1, 0, 0, 0) + datetime.timedelta(days = cell.value - 1)
-                    cell.value = cell.value.isoformat()
-
-            # Remove decimal and trailing zeros that were added on Excel import
-            if isinstance(cell.value, float):
-                if cell.value == int(cell.value):
-                    cell.value = '%d'%cell.value
-
-            # Change any single quotes already in the data to double quotes since
-            # entire data values in the csv are enclosed with single quotes
-            if isinstance(cell.value, str):
-                cell.value = str(cell.value).replace("\"","\"\"")
-
-            row[colnum] = "\""+ str(cell.value) + "\""
-        csv_rows.append(','.join(row))
-
-    return csv_rows
+# Validate the Excel sheet, reading its typed values into usginmodels.validate_rows as they are needed
+def validate_sheet(in_file, sheet_name, schema_uri, layer_name, layer):
+    try:
+        rows = ExcelToCsv.iter_sheet_rows(in_file, sheet_name, layer)
+        return usginmodels.validate_rows(rows, schema_uri, layer_name, columnar=True)
+    except ExcelToCsv.SheetNotFound as err:
+        arcpy.AddError(str(err))
+        return None
+    except ExcelToCsv.CellEncodingError as err:
+        arcpy.AddError(str(err))
+        arcpy.AddError("Reading the sheet failed")
+        return None
 
 # Print the error messages
 def print_errors(valid, messages, dataCorrected):
@@ -177,21 +159,22 @@ def print_errors(valid, messages, dataCorrected):
 
     # Only print notices, warnings and error messages
     for m in messages:
-        if "Warning!" in m:
+        severity = getattr(m, "severity", None)
+        if severity == usginmodels.WARNING:
             if msgs['warnCount'] < msgs['warnMax']:
                 arcpy.AddWarning(m)
                 msgs['warnCount'] += 1
             elif msgs['warnCount'] == msgs['warnMax']:
                 arcpy.AddWarning("Max number of warning messages reached (" + str(msgs['warnMax']) + "). Not showing anymore warnings that are not errors.")
                 msgs['warnCount'] += 1
-        elif "Error!" in m:
+        elif severity == usginmodels.ERROR:
             if msgs['errCount'] < msgs['errMax']:
                 arcpy.AddError(m)
                 msgs['errCount'] += 1
             elif msgs['errCount'] == msgs['errMax']:
                 arcpy.AddError("Max number of error messages reached (" + str(msgs['errMax']) + "). Fix indicated errors and import again.")
                 msgs['errCount'] += 1
-        elif "Notice!" in m:
+        elif severity == usginmodels.NOTICE:
             if msgs['noteCount'] < msgs['noteMax']:
                 arcpy.AddMessage(m)
                 msgs['noteCount'] += 1
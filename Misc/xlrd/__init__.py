@@ -275,6 +275,12 @@ from . import licences
 #
 # <p>Book.sheets() will load all/any unloaded sheets.</p>
 #
+# <p>Book.iter_sheet_rows(sheet_name_or_index) reads an unloaded sheet a row at
+# a time without loading it, so a large sheet can be processed in little memory.</p>
+#
+# <p>Excel 2007 (.xlsx) files work the same way: the sheets are read from the
+# ZIP file, which is closed by Book.release_resources().</p>
+#
 # <p>The caller may save memory by calling
 # Book.unload_sheet(sheet_name_or_index) when finished with the sheet.
 # This applies irrespective of the state of on_demand.</p>
@@ -320,7 +326,7 @@ from .biffh import (
 from .formula import * # is constrained by __all__
 from .book import Book, colname #### TODO #### formula also has `colname` (restricted to 256 cols)
 from .sheet import empty_cell
-from .xldate import XLDateError, xldate_as_tuple
+from .xldate import XLDateError, xldate_as_tuple, xldates_as_datetime, xldates_as_datetime64, xldates_as_iso
 
 if sys.version.startswith("IronPython"):
     # print >> sys.stderr, "...importing encodings"
@@ -475,7 +475,40 @@ class Book(BaseObject):
             except ValueError:
                 raise XLRDError('No sheet named <%r>' % sheet_name_or_index)
         self._sheet_list[sheetx] = None
-        
+
+    ##
+    # Reads a sheet a row at a time: yields (types, values) for each row, lists of the
+    # types and values of its cells as in {@link Sheet#rows_types_values}.
+    # A sheet that isn't loaded yet (see open_workbook(on_demand=True), which
+    # also works for .xlsx files) is read as it is iterated over instead of being
+    # loaded, so the memory used doesn't grow with the sheet. Its rows end at
+    # their last cell, as with open_workbook(ragged_rows=True), and the cells must
+    # be in row order, which is how Excel writes them. Don't load other sheets
+    # until the rows have been read.
+    # @param sheet_name_or_index Name or index of the sheet to read
+    def iter_sheet_rows(self, sheet_name_or_index):
+        if isinstance(sheet_name_or_index, type(1)):
+            sheetx = sheet_name_or_index
+        else:
+            try:
+                sheetx = self._sheet_names.index(sheet_name_or_index)
+            except ValueError:
+                raise XLRDError('No sheet named <%r>' % sheet_name_or_index)
+        if self._sheet_list[sheetx]:
+            return self._sheet_list[sheetx].rows_types_values()
+        if self._resources_released:
+            raise XLRDError("Can't load sheets after releasing resources.")
+        if self._x12_sheets is not None:
+            return self._x12_sheets.iter_sheet_rows(self, sheetx)
+        self._position = self._sh_abs_posn[sheetx]
+        self.getbof(XL_WORKSHEET)
+        sh = sheet.Sheet(self,
+                self._position,
+                self._sheet_names[sheetx],
+                sheetx,
+                )
+        return sh.iter_rows(self)
+
     ##
     # This method has a dual purpose. You can call it to release
     # memory-consuming objects and (possibly) a memory-mapped file
@@ -494,6 +527,8 @@ class Book(BaseObject):
         if hasattr(self.filestr, "close"):
             self.filestr.close()
         self.filestr = None
+        if self._x12_sheets is not None:
+            self._x12_sheets.close()
         self._sharedstrings = None
         self._rich_text_runlist_map = None
     
@@ -548,6 +583,7 @@ class Book(BaseObject):
         self.style_name_map = {}
         self.mem = b''
         self.filestr = b''
+        self._x12_sheets = None # the unloaded sheets of an .xlsx file opened on_demand
 
     def biff2_8_load(self, filename=None, file_contents=None,
         logfile=sys.stdout, verbosity=0, use_mmap=USE_MMAP,
@@ -680,6 +716,8 @@ class Book(BaseObject):
     def get_sheet(self, sh_number, update_pos=True):
         if self._resources_released:
             raise XLRDError("Can't load sheets after releasing resources.")
+        if self._x12_sheets is not None:
+            return self._x12_sheets.get_sheet(self, sh_number)
         if update_pos:
             self._position = self._sh_abs_posn[sh_number]
         _unused_biff_version = self.getbof(XL_WORKSHEET)
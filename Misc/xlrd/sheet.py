@@ -30,6 +30,7 @@
 from __future__ import print_function
 
 from array import array
+from collections import deque
 from struct import unpack, calcsize
 from .biffh import *
 from .timemachine import *
@@ -326,6 +327,7 @@ class Sheet(BaseObject):
         self._cell_values = []
         self._cell_types = []
         self._cell_xf_indexes = []
+        self._streamed_rows = None # rows read but not yet taken, when streaming
         self.defcolwidth = None
         self.standardwidth = None
         self.default_row_height = None
@@ -548,9 +550,103 @@ class Sheet(BaseObject):
     # Above two lines just for the docs. Here's the real McCoy:
     col = col_slice
 
+    ##
+    # Yields (types, values) for each row from start_rowx up to end_rowx, without making
+    # {@link #Cell} objects. types and values are the sheet's own sequences, not copies,
+    # so they must not be changed.
+    def rows_types_values(self, start_rowx=0, end_rowx=None):
+        if end_rowx is None or end_rowx > self.nrows:
+            end_rowx = self.nrows
+        cell_types = self._cell_types
+        cell_values = self._cell_values
+        for rowx in xrange(start_rowx, end_rowx):
+            yield cell_types[rowx], cell_values[rowx]
+
+    ##
+    # Yields (types, values) for each column from start_colx up to end_colx, as lists
+    # of the types and values of the cells in the column, without making {@link #Cell} objects.
+    # Rows shorter than the column (see open_workbook(ragged_rows=True)) give an empty cell.
+    def cols_types_values(self, start_colx=0, end_colx=None):
+        if end_colx is None or end_colx > self.ncols:
+            end_colx = self.ncols
+        rows = zip(self._cell_types, self._cell_values)
+        for colx in xrange(start_colx, end_colx):
+            types = []
+            values = []
+            for row_types, row_values in rows:
+                if colx < len(row_values):
+                    types.append(row_types[colx])
+                    values.append(row_values[colx])
+                else:
+                    types.append(XL_CELL_EMPTY)
+                    values.append(UNICODE_LITERAL(''))
+            yield types, values
+
+    ##
+    # Yields (types, values) for each row as the sheet's records are read from the book,
+    # instead of loading the sheet, so only the row being read is kept in memory.
+    # Rows end at their last cell, as with open_workbook(ragged_rows=True), and rows without
+    # cells are empty. The sheet can't be used as a loaded sheet afterwards.
+    # Use {@link Book#iter_sheet_rows}, which also handles sheets that are already loaded.
+    def iter_rows(self, bk):
+        self.start_streaming()
+        streamed_rows = self._streamed_rows
+        for _unused in self.read_records(bk):
+            while streamed_rows:
+                yield streamed_rows.popleft()
+        self.finish_streamed_rows(self._stream_rowx + 1)
+        while streamed_rows:
+            yield streamed_rows.popleft()
+
     # === Following methods are used in building the worksheet.
     # === They are not part of the API.
 
+    # Cells go to the row being read instead of the cell lists, and each row is queued
+    # in _streamed_rows once a cell of a later row arrives.
+    def start_streaming(self):
+        self.put_cell = self.put_cell_streamed
+        self._streamed_rows = deque()
+        self._stream_rowx = -1
+        self._stream_types = self.bt * 0
+        self._stream_values = []
+
+    def finish_streamed_rows(self, rowx):
+        streamed_rows = self._streamed_rows
+        if self._stream_rowx >= 0:
+            streamed_rows.append((self._stream_types, self._stream_values))
+        for _unused in xrange(self._stream_rowx + 1, rowx):
+            streamed_rows.append((self.bt * 0, []))
+        self._stream_rowx = rowx
+        self._stream_types = self.bt * 0
+        self._stream_values = []
+
+    def put_cell_streamed(self, rowx, colx, ctype, value, xf_index):
+        if ctype is None:
+            # we have a number, so look up the cell type
+            ctype = self._xf_index_to_xl_type_map[xf_index]
+        if rowx != self._stream_rowx:
+            if rowx < self._stream_rowx:
+                raise XLRDError(
+                    "Sheet %d (%r): cell (%d, %d) is after a cell of row %d; "
+                    "can't stream a sheet that isn't in row order"
+                    % (self.number, self.name, rowx, colx, self._stream_rowx))
+            self.finish_streamed_rows(rowx)
+            self.nrows = rowx + 1
+        types_row = self._stream_types
+        values_row = self._stream_values
+        num_empty = colx - len(types_row)
+        if num_empty:
+            if num_empty < 0:
+                types_row[colx] = ctype
+                values_row[colx] = value
+                return
+            types_row.extend(self.bt * num_empty)
+            values_row.extend([''] * num_empty)
+        types_row.append(ctype)
+        values_row.append(value)
+        if colx >= self.ncols:
+            self.ncols = colx + 1
+
     def tidy_dimensions(self):
         if self.verbosity >= 3:
             fprintf(self.logfile,
@@ -745,6 +841,13 @@ class Sheet(BaseObject):
     # === Methods after this line neither know nor care about how cells are stored.
 
     def read(self, bk):
+        for _unused in self.read_records(bk):
+            pass
+        return 1
+
+    # Reads the sheet's records from bk. When streaming, yields whenever rows are waiting
+    # in _streamed_rows; a loaded sheet is read without yielding.
+    def read_records(self, bk):
         global rc_stats
         DEBUG = 0
         blah = DEBUG or self.verbosity >= 2
@@ -766,7 +869,10 @@ class Sheet(BaseObject):
         rowinfo_sharing_dict = {}
         txos = {}
         eof_found = 0
+        streamed_rows = self._streamed_rows
         while 1:
+            if streamed_rows:
+                yield
             # if DEBUG: print "SHEET.READ: about to read from position %d" % bk._position
             rc, data_len, data = bk_get_record_parts()
             # if rc in rc_stats:
@@ -1463,10 +1569,10 @@ class Sheet(BaseObject):
         if not eof_found:
             raise XLRDError("Sheet %d (%r) missing EOF record" \
                 % (self.number, self.name))
-        self.tidy_dimensions()
+        if streamed_rows is None:
+            self.tidy_dimensions()
         self.update_cooked_mag_factors()
         bk._position = oldpos
-        return 1
     
     def string_record_contents(self, data):
         bv = self.biff_version
@@ -18,6 +18,8 @@
 #    Noon on Gregorian 1900-03-01 (day 61 in the 1900-based system) is JDN 2415080.0
 #    Noon on Gregorian 1904-01-02 (day  1 in the 1904-based system) is JDN 2416482.0
 
+import datetime
+
 _JDN_delta = (2415080 - 61, 2416482 - 1)
 assert _JDN_delta[1] - _JDN_delta[0] == 1462
 
@@ -90,6 +92,82 @@ def xldate_as_tuple(xldate, datemode):
     else:
         return ((yreg // 1461) - 4716, mp + 3, d, hour, minute, second)
 
+##
+# Convert many Excel dates at once: the vectorised equivalent of
+# datetime.datetime(*xldate_as_tuple(xldate, datemode)) for each xldate.
+# Needs NumPy.
+# @param xldates A sequence (or NumPy array) of Excel numbers
+# @param datemode 0: 1900-based, 1: 1904-based.
+# @return A NumPy datetime64[s] array.
+# @throws XLDateError As xldate_as_tuple, for the first number that isn't a
+# date in the datemode's calendar. Numbers below 1.0 (times without a date) raise
+# ValueError, as datetime.datetime does.
+
+def xldates_as_datetime64(xldates, datemode):
+    import numpy
+    if datemode not in (0, 1):
+        raise XLDateBadDatemode(datemode)
+    xldates = numpy.asarray(xldates, dtype=numpy.float64)
+    # The checks of xldate_as_tuple in its order, on the numbers as given: zero and
+    # negative numbers (and NaN or infinity, which int() rejects) first
+    valid = numpy.isfinite(xldates)
+    valid[valid] = xldates[valid] > 0.0
+    checked = numpy.where(valid, xldates, 0.0)
+    xldays = numpy.floor(checked)
+    # round() as xldate_as_tuple does it, halves away from zero
+    seconds = (checked - xldays) * 86400.0
+    whole = numpy.floor(seconds)
+    seconds = numpy.where(seconds - whole == 0.5, whole + 1.0, numpy.rint(seconds))
+    # 86400 seconds is the start of the next day, which is the day xldate_as_tuple
+    # checks against its limits
+    days = xldays + (seconds == 86400.0)
+    valid &= days < _XLDAYS_TOO_LARGE[datemode]
+    # Days before March 1900 are ambiguous, and day 0 is a time without a date
+    valid &= days >= (61, 1)[datemode]
+    if not valid.all():
+        xldate = float(xldates[numpy.flatnonzero(~valid)[0]])
+        datetime.datetime(*xldate_as_tuple(xldate, datemode))
+        raise XLDateError(xldate)
+    total = (xldays * 86400.0 + seconds).astype(numpy.int64)
+    zero = numpy.datetime64(("1899-12-30", "1904-01-01")[datemode], "s")
+    return zero + total.astype("timedelta64[s]")
+
+##
+# Convert many Excel dates at once to ISO 8601 text, as
+# datetime.datetime(*xldate_as_tuple(xldate, datemode)).isoformat() gives it:
+# YYYY-MM-DDTHH:MM:SS. Uses NumPy if it is installed.
+# @param xldates A sequence of Excel numbers
+# @param datemode 0: 1900-based, 1: 1904-based.
+# @return A list of str.
+# @throws XLDateError As xldates_as_datetime64.
+
+def xldates_as_iso(xldates, datemode):
+    if not len(xldates):
+        return []
+    try:
+        import numpy
+    except ImportError:
+        return [datetime.datetime(*xldate_as_tuple(xldate, datemode)).isoformat() for xldate in xldates]
+    return numpy.datetime_as_string(xldates_as_datetime64(xldates, datemode), unit="s").tolist()
+
+##
+# Convert many Excel dates at once to datetime.datetime objects, as
+# datetime.datetime(*xldate_as_tuple(xldate, datemode)) gives them.
+# Uses NumPy if it is installed.
+# @param xldates A sequence of Excel numbers
+# @param datemode 0: 1900-based, 1: 1904-based.
+# @return A list of datetime.datetime.
+# @throws XLDateError As xldates_as_datetime64.
+
+def xldates_as_datetime(xldates, datemode):
+    if not len(xldates):
+        return []
+    try:
+        import numpy
+    except ImportError:
+        return [datetime.datetime(*xldate_as_tuple(xldate, datemode)) for xldate in xldates]
+    return xldates_as_datetime64(xldates, datemode).tolist()
+
 # === conversions from date/time to xl numbers
 
 def _leap(y):
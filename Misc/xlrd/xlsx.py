@@ -522,7 +522,36 @@ class X12Sheet(X12General):
             elif elem.tag == U_SSML12 + "dimension":
                 self.do_dimension(elem)
         self.finish_off()
-        
+
+    # Yields (types, values) for each row as the sheet is parsed, without loading it
+    # (see Book.iter_sheet_rows). Rows already parsed are removed from the tree.
+    def iter_rows(self, stream):
+        sheet = self.sheet
+        sheet.start_streaming()
+        streamed_rows = sheet._streamed_rows
+        row_tag = U_SSML12 + "row"
+        sheet_data_tag = U_SSML12 + "sheetData"
+        dimension_tag = U_SSML12 + "dimension"
+        self_do_row = self.do_row
+        sheet_data = None
+        start = str("start") # cElementTree in Python 2 wants events as str
+        for event, elem in ET.iterparse(stream, events=(start, str("end"))):
+            if event == start:
+                if elem.tag == sheet_data_tag:
+                    sheet_data = elem
+            elif elem.tag == row_tag:
+                self_do_row(elem)
+                elem.clear() # destroy all child elements (cells)
+                if sheet_data is not None:
+                    sheet_data.remove(elem)
+                while streamed_rows:
+                    yield streamed_rows.popleft()
+            elif elem.tag == dimension_tag:
+                self.do_dimension(elem)
+        sheet.finish_streamed_rows(sheet._stream_rowx + 1)
+        while streamed_rows:
+            yield streamed_rows.popleft()
+
     def do_dimension(self, elem):
         ref = elem.get('ref') # example: "A1:Z99" or just "A1"
         if ref:
@@ -683,6 +712,47 @@ class X12Sheet(X12General):
         }
     augment_keys(tag2meth, U_SSML12)
 
+##
+# The sheets of an .xlsx file opened with on_demand=True, read from the zip file
+# when they are asked for.
+
+class X12OnDemandSheets(object):
+
+    def __init__(self, zf, sheet_targets, logfile=DLF, verbosity=0):
+        self.zf = zf
+        self.sheet_targets = sheet_targets
+        self.logfile = logfile
+        self.verbosity = verbosity
+
+    def new_sheet(self, bk, sheetx):
+        sheet = Sheet(bk, position=None, name=bk._sheet_names[sheetx], number=sheetx)
+        sheet.utter_max_rows = X12_MAX_ROWS
+        sheet.utter_max_cols = X12_MAX_COLS
+        return sheet
+
+    def get_sheet(self, bk, sheetx):
+        sheet = self.new_sheet(bk, sheetx)
+        load_sheet(self.zf, self.sheet_targets[sheetx], sheet, self.logfile, self.verbosity)
+        bk._sheet_list[sheetx] = sheet
+        return sheet
+
+    def iter_sheet_rows(self, bk, sheetx):
+        if not ET_has_iterparse:
+            return self.get_sheet(bk, sheetx).rows_types_values()
+        x12sheet = X12Sheet(self.new_sheet(bk, sheetx), self.logfile, self.verbosity)
+        return x12sheet.iter_rows(getzflo(self.zf, self.sheet_targets[sheetx]))
+
+    def close(self):
+        self.zf.close()
+
+def load_sheet(zf, fname, sheet, logfile=DLF, verbosity=0):
+    zflo = getzflo(zf, fname)
+    x12sheet = X12Sheet(sheet, logfile, verbosity)
+    heading = "Sheet %r (sheetx=%d) from %r" % (sheet.name, sheet.number, fname)
+    x12sheet.process_stream(zflo, heading)
+    del zflo
+    sheet.tidy_dimensions()
+
 def getzflo(zipfile, member_path):
     # GET a Zipfile File-Like Object for passing to
     # an XML parser
@@ -711,10 +781,6 @@ def open_workbook_2007_xml(
         raise NotImplementedError("formatting_info=True not yet implemented")
     bk.use_mmap = False #### Not supported initially
     bk.on_demand = on_demand
-    if on_demand:
-        if verbosity:
-            print("WARNING *** on_demand=True not yet implemented; falling back to False", file=bk.logfile)
-        bk.on_demand = False
     bk.ragged_rows = ragged_rows
 
     x12book = X12Book(bk, logfile, verbosity)
@@ -745,14 +811,13 @@ def open_workbook_2007_xml(
         x12sst.process_stream(zflo, 'SST')
         del zflo
 
+    if on_demand:
+        # Sheets are read when they are asked for
+        bk._x12_sheets = X12OnDemandSheets(zf, x12book.sheet_targets, logfile, verbosity)
+        bk._sheet_list = [None] * bk.nsheets
+        return bk
+
     for sheetx in range(bk.nsheets):
-        fname = x12book.sheet_targets[sheetx]
-        zflo = getzflo(zf, fname)
-        sheet = bk._sheet_list[sheetx]
-        x12sheet = X12Sheet(sheet, logfile, verbosity)
-        heading = "Sheet %r (sheetx=%d) from %r" % (sheet.name, sheetx, fname)
-        x12sheet.process_stream(zflo, heading)
-        del zflo
-        sheet.tidy_dimensions()
+        load_sheet(zf, x12book.sheet_targets[sheetx], bk._sheet_list[sheetx], logfile, verbosity)
 
     return bk
@@ -0,0 +1,74 @@
+"""
+Memory taken by the corrected data as a list of rows against ColumnarData, on the synthetic layer and on the
+numeric heavy layer of bench_columns.py. Sizes are counted with sys.getsizeof, so they are the same on any platform.
+
+    python benchmarks/bench_columnar.py [rows]
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import synthetic
+from bench_columns import numeric_fields, write_numeric_csv
+from usginmodels.layer import Layer
+
+def deep_size(obj, seen=None):
+    """Bytes taken by obj and everything it refers to, counting shared objects once"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(obj.__dict__, seen)
+    return size
+
+def measure(layer, path, columnar):
+    csv_file = open(path, "rb")
+    try:
+        start = time.time()
+        valid, messages, dataCorrected, long_fields, srs = layer.validate_file(csv.reader(csv_file), columnar=columnar)
+        validate_time = time.time() - start
+    finally:
+        csv_file.close()
+
+    start = time.time()
+    rows = 0
+    for row in dataCorrected[1:]:
+        rows += 1
+    return deep_size(dataCorrected), validate_time, time.time() - start, rows
+
+def compare(name, layer, path):
+    list_size, list_time, list_iterate, rows = measure(layer, path, False)
+    columnar_size, columnar_time, columnar_iterate, rows = measure(layer, path, True)
+
+    print "%s, %d rows" % (name, rows)
+    print "  list:     %7.1f MB  validate %6.2f s  iterate %5.2f s" % (list_size / 1e6, list_time, list_iterate)
+    print "  columnar: %7.1f MB  validate %6.2f s  iterate %5.2f s" % (columnar_size / 1e6, columnar_time, columnar_iterate)
+    print "  %.1fx less memory" % (float(list_size) / columnar_size)
+
+def main(n_rows=50000):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "synthetic.csv")
+        synthetic.write_csv(path, n_rows, 0.02)
+        compare("synthetic layer", synthetic.synthetic_layer(), path)
+
+        fields = numeric_fields(40)
+        path = os.path.join(temp_dir, "numeric.csv")
+        write_numeric_csv(path, fields, n_rows)
+        compare("numeric layer", Layer("BoreholeTemperature", fields, (synthetic.MODEL_URI % 0) + "1.0"), path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
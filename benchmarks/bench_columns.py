@@ -0,0 +1,72 @@
+"""
+Row path against the column path (NumPy for double fields) on a numeric heavy layer shaped like
+BoreholeTemperatures: a URI, coordinates and a run of double measurements.
+
+    python benchmarks/bench_columns.py [rows] [double fields]
+"""
+import csv
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import synthetic
+from usginmodels.layer import Layer
+
+def numeric_fields(n_doubles):
+    def field(name, field_type, optional=False):
+        return {"name": name, "type": field_type, "description": name, "optional": optional}
+
+    fields = [field("OBJECTID", "string"), field("HeaderURI", "string"), field("LatDegree", "double"),
+              field("LongDegree", "double"), field("SRS", "string"), field("MeasuredTemperature", "double", True)]
+    fields += [field("Measurement%d" % i, "double", i % 2 == 1) for i in range(n_doubles)]
+    fields.append(field("Shape", "string"))
+    return fields
+
+def write_numeric_csv(path, fields, n_rows, seed=0):
+    rand = random.Random(seed)
+    names = [f["name"] for f in fields]
+    csv_file = open(path, "wb")
+    try:
+        writer = csv.writer(csv_file)
+        writer.writerow(names)
+        for i in range(n_rows):
+            row = [str(i), "http://resources.usgin.org/uri-gin/az/well/%d/" % i, "%.5f" % rand.uniform(31, 37),
+                   "%.5f" % rand.uniform(-115, -109), "EPSG:4326", "%.2f" % rand.uniform(-10, 300)]
+            row += ["%.3f" % rand.uniform(0, 1000) if rand.random() > 0.01 else "" for name in names[6:-1]]
+            row.append("")
+            writer.writerow(row)
+    finally:
+        csv_file.close()
+
+def time_validation(layer, path, by_column):
+    csv_file = open(path, "rb")
+    try:
+        start = time.time()
+        result = layer.validate_file(csv.DictReader(csv_file), by_column=by_column)
+        return time.time() - start, result
+    finally:
+        csv_file.close()
+
+def main(n_rows=50000, n_doubles=20):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fields = numeric_fields(n_doubles)
+        layer = Layer("BoreholeTemperature", fields, (synthetic.MODEL_URI % 0) + "1.0")
+        path = os.path.join(temp_dir, "numeric.csv")
+        write_numeric_csv(path, fields, n_rows)
+
+        row_time, row_result = time_validation(layer, path, False)
+        column_time, column_result = time_validation(layer, path, True)
+
+        print "%d rows, %d double fields" % (n_rows, n_doubles + 3)
+        print "rows:    %6.2f s %8.0f rows/s" % (row_time, n_rows / row_time)
+        print "columns: %6.2f s %8.0f rows/s" % (column_time, n_rows / column_time)
+        print "speed-up %.1fx, same result: %s" % (row_time / column_time, column_result == row_result)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
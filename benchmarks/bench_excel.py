@@ -0,0 +1,143 @@
+"""
+Reading a full .xls sheet (65,536 rows, the most BIFF8 allows) through Cell objects against the bulk
+rows_types_values accessor of the vendored xlrd, and the conversions of Misc/ExcelToCsv.py built on it.
+The date cells are also converted to ISO text one at a time and by column with xlrd.xldates_as_iso.
+
+    python benchmarks/bench_excel.py [file.xls sheet]
+
+Without a file one is written with the synthetic rows, two columns of them as dates, which needs xlwt.
+"""
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import synthetic
+
+# The vendored xlrd and the conversion module live in Misc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Misc"))
+import xlrd
+import ExcelToCsv
+
+ROWS = 65536
+
+# The synthetic date columns, how their text is parsed and the Excel number format they are written with
+DATE_COLUMNS = {
+    "DrillDate": ("%Y-%m-%d", "YYYY-MM-DD"),
+    "EndDate": ("%m/%d/%Y", "M/D/YYYY")
+}
+
+def write_xls(path, n_rows=ROWS):
+    """Write the synthetic rows (header included) to a sheet named Benchmark, numbers as numbers, dates as
+    date formatted cells and no bad values, so excel_to_csv converts all of it"""
+    try:
+        import xlwt
+    except ImportError:
+        sys.exit("xlwt is needed to write the benchmark file, or pass an existing .xls file and sheet name")
+
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet("Benchmark")
+    rows = synthetic.synthetic_rows(n_rows - 1)
+    header = next(rows)
+    for colnum, name in enumerate(header):
+        sheet.write(0, colnum, name)
+
+    date_columns = {}
+    for colnum, name in enumerate(header):
+        if name in DATE_COLUMNS:
+            text_format, number_format = DATE_COLUMNS[name]
+            date_columns[colnum] = (text_format, xlwt.easyxf(num_format_str=number_format))
+
+    for rownum, row in enumerate(rows, 1):
+        for colnum, value in enumerate(row):
+            if colnum in date_columns:
+                text_format, style = date_columns[colnum]
+                sheet.write(rownum, colnum, datetime.datetime.strptime(value, text_format), style)
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                value = value.decode("utf-8")
+            sheet.write(rownum, colnum, value)
+    workbook.save(path)
+
+def cell_loop(sht, datemode):
+    """The conversion loop as it was: row_values, then a Cell for every column"""
+    csv_rows = []
+    for rownum in xrange(sht.nrows):
+        row = sht.row_values(rownum)
+        for colnum in xrange(sht.ncols):
+            cell = sht.cell(rownum, colnum)
+            try:
+                value = ExcelToCsv.cell_text(cell, datemode)
+            except UnicodeError:
+                value = ""
+            row[colnum] = "\"" + value.replace("\"", "\"\"") + "\""
+        csv_rows.append(",".join(row))
+    return csv_rows
+
+def bulk_loop(sht, datemode):
+    """The same conversion reading each row's types and values in bulk"""
+    csv_rows = []
+    for types, values in sht.rows_types_values():
+        row = []
+        for ctype, value in zip(types, values):
+            try:
+                text = ExcelToCsv.value_text(ctype, value, datemode)
+            except UnicodeError:
+                text = ""
+            row.append("\"" + text.replace("\"", "\"\"") + "\"")
+        csv_rows.append(",".join(row))
+    return csv_rows
+
+def timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+def main(path=None, sheet_name="Benchmark"):
+    temp_dir = None
+    if path is None:
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, "benchmark.xls")
+        write_xls(path)
+
+    try:
+        open_time, workbook = timed(xlrd.open_workbook, path)
+        sht = workbook.sheet_by_name(sheet_name)
+        print "%s: %d rows, %d columns, opened in %.2f s" % (os.path.basename(path), sht.nrows, sht.ncols, open_time)
+
+        access_time, cells = timed(lambda: [sht.cell(rowx, colx) for rowx in xrange(sht.nrows) for colx in xrange(sht.ncols)])
+        bulk_time, rows = timed(lambda: [zip(types, values) for types, values in sht.rows_types_values()])
+        print "cell access:  Cell objects %6.2f s, rows_types_values %6.2f s" % (access_time, bulk_time)
+        del cells, rows
+
+        cell_time, cell_rows = timed(cell_loop, sht, workbook.datemode)
+        bulk_time, bulk_rows = timed(bulk_loop, sht, workbook.datemode)
+        print "csv rows:     Cell objects %6.2f s, rows_types_values %6.2f s  (%.1fx, same: %s)" % (
+            cell_time, bulk_time, cell_time / bulk_time, cell_rows == bulk_rows)
+        del cell_rows, bulk_rows
+
+        dates = [value for types, values in sht.rows_types_values()
+                 for ctype, value in zip(types, values) if ctype == xlrd.XL_CELL_DATE and value >= 61]
+        if dates:
+            xlrd.xldates_as_iso(dates[:1], workbook.datemode)  # NumPy is imported on first use
+            cell_time, cell_dates = timed(lambda: [ExcelToCsv.cell_datetime(value, workbook.datemode).isoformat() for value in dates])
+            batch_time, batch_dates = timed(xlrd.xldates_as_iso, dates, workbook.datemode)
+            print "%d dates:  one at a time %6.2f s, xldates_as_iso %6.2f s  (%.1fx, same: %s)" % (
+                len(dates), cell_time, batch_time, cell_time / batch_time, cell_dates == batch_dates)
+            del cell_dates, batch_dates
+
+        try:
+            csv_time, csv_rows = timed(ExcelToCsv.excel_to_csv, path, sheet_name)
+            print "excel_to_csv: %6.2f s (with opening the workbook)" % csv_time
+        except ExcelToCsv.ConversionError as err:
+            print "excel_to_csv: %s" % err
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
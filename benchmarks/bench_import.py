@@ -0,0 +1,55 @@
+"""
+Cold start latency of `import usginmodels`.
+
+Each measurement runs in a fresh interpreter against a synthetic file:// registry. "eager" imports the package
+and loads the registry straight away, which is what every import used to cost. "lazy" is a bare import, which is
+all that callers like ExcelToService's sheet_names need now.
+
+    python benchmarks/bench_import.py [n_models] [repeats]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import write_registry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    ("lazy import", "import usginmodels"),
+    ("eager import", "import usginmodels; usginmodels.get_models()")
+]
+
+def time_statement(statement, env, repeats):
+    """Best wall clock time in seconds of running statement in a new interpreter"""
+    best = None
+    for i in range(repeats):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", statement], env=env, cwd=ROOT)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main(n_models=50, repeats=5):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        env = dict(os.environ)
+        env["USGINMODELS_URL"] = write_registry(os.path.join(temp_dir, "contentmodels.json"), n_models)
+        env["USGINMODELS_CACHE_DIR"] = os.path.join(temp_dir, "cache")
+
+        baseline = time_statement("pass", env, repeats)
+        print "Interpreter start up: %.1f ms" % (baseline * 1000)
+        print "Synthetic registry of %d models" % n_models
+
+        for label, statement in STATEMENTS:
+            elapsed = time_statement(statement, env, repeats)
+            print "%-14s %8.1f ms (%.1f ms over start up)" % (label, elapsed * 1000, (elapsed - baseline) * 1000)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,84 @@
+"""
+Message aggregation in Layer.validate_file on files where almost every row produces a message of its own.
+
+Every row reuses an earlier primary URI, so each row adds a distinct "URI has already been used" error. The old
+list based addMessage is timed on growing message counts to show its quadratic cost next to MessageStore, then the
+whole validation is timed on a 200k row file.
+
+    python benchmarks/bench_messages.py [rows]
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from synthetic import write_csv, synthetic_layer
+from usginmodels.messages import MessageStore, Message, ERROR, format_messages
+
+def list_add_message(row_num, valid, new_msg, messages):
+    """The list scanning addMessage that MessageStore replaced"""
+    if new_msg:
+        if "Error" in new_msg:
+            valid = False
+        match = False
+        for msg in messages:
+            if new_msg == msg[1]:
+                match = True
+                if row_num + 1 != msg[0][-1]:
+                    msg[0].append(row_num + 1)
+                    return valid, messages
+        if match == False:
+            messages.append([[row_num + 1], new_msg])
+    return valid, messages
+
+def time_aggregation(n_messages):
+    records = [Message(ERROR, "uri_used", "HeaderURI", "http://resources.usgin.org/uri-gin/az/well/%d/" % i)
+               for i in range(n_messages)]
+    distinct = [msg.text() for msg in records]
+
+    start = time.time()
+    valid, messages = True, []
+    for i, msg in enumerate(distinct):
+        valid, messages = list_add_message(i, valid, msg, messages)
+    list_time = time.time() - start
+
+    start = time.time()
+    store = MessageStore()
+    for i, msg in enumerate(records):
+        store.add(i, msg)
+    format_messages(store)
+    store_time = time.time() - start
+
+    return list_time, store_time
+
+def main(n_rows=200000):
+    print "Aggregating distinct messages"
+    print "%10s %12s %12s" % ("messages", "list (s)", "store (s)")
+    for n_messages in (2500, 5000, 10000, 20000):
+        list_time, store_time = time_aggregation(n_messages)
+        print "%10d %12.3f %12.3f" % (n_messages, list_time, store_time)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "duplicates.csv")
+        write_csv(path, n_rows, duplicate_rate=1.0)
+        layer = synthetic_layer()
+
+        csv_file = open(path, "rb")
+        try:
+            start = time.time()
+            valid, messages, dataCorrected, long_fields, srs = layer.validate_file(csv.DictReader(csv_file))
+            elapsed = time.time() - start
+        finally:
+            csv_file.close()
+
+        print
+        print "Layer.validate_file on %d rows: %.1f s, %d distinct messages, %.0f rows/s" % (
+            n_rows, elapsed, len(messages), n_rows / elapsed)
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
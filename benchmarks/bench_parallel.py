@@ -0,0 +1,47 @@
+"""
+Speed-up of validate_file's parallel mode against the number of processes.
+
+    python benchmarks/bench_parallel.py [rows] [chunk_size]
+"""
+import csv
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from synthetic import write_csv, synthetic_layer
+
+def time_validation(layer, path, processes, chunk_size):
+    csv_file = open(path, "rb")
+    try:
+        start = time.time()
+        result = layer.validate_file(csv.DictReader(csv_file), processes=processes, chunk_size=chunk_size)
+        return time.time() - start, result
+    finally:
+        csv_file.close()
+
+def main(n_rows=100000, chunk_size=5000):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "rows.csv")
+        write_csv(path, n_rows, error_rate=0.02, duplicate_rate=0.01)
+        layer = synthetic_layer()
+
+        serial_time, serial_result = time_validation(layer, path, 1, chunk_size)
+        print "%d rows, chunks of %d, %d CPUs" % (n_rows, chunk_size, multiprocessing.cpu_count())
+        print "%10s %10s %10s %10s %10s" % ("processes", "seconds", "rows/s", "speed-up", "same")
+        print "%10s %10.2f %10.0f %10.2f %10s" % ("serial", serial_time, n_rows / serial_time, 1.0, True)
+
+        processes = 2
+        while processes <= max(2, multiprocessing.cpu_count()):
+            elapsed, result = time_validation(layer, path, processes, chunk_size)
+            print "%10d %10.2f %10.0f %10.2f %10s" % (processes, elapsed, n_rows / elapsed, serial_time / elapsed,
+                                                    result == serial_result)
+            processes *= 2
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,247 @@
+"""
+The benchmark suite: Layer.validate_file on generated files of 1k rows upwards at several error densities, each
+check a Field runs on the values of a column, and format_messages. Everything uses the synthetic content model,
+so no network is needed. Results are printed as rows (or values) per second and saved as JSON, and a saved run
+can be compared against.
+
+    python benchmarks/run_benchmarks.py [--rows 1000,10000,100000,1000000] [--errors 0,0.01,0.1]
+                                        [--repeat 3] [--output results.json] [--compare earlier.json]
+                                        [--data-dir dir]
+
+Generated files are kept in --data-dir if one is given, so the 1M row file is only written once.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import synthetic
+from usginmodels.messages import format_messages
+from usginmodels.plan import get_plan, clear_plans
+from usginmodels.result_cache import get_validator_version
+from usginmodels.validation_run import ValidationRun
+
+# The rows of the file whose columns the field checks are timed on
+CHECK_ROWS = 20000
+
+def data_file(data_dir, n_rows, error_rate):
+    """The path of the generated file, writing it if it isn't there yet"""
+    path = os.path.join(data_dir, "synthetic-%d-%g.csv" % (n_rows, error_rate))
+    if not os.path.exists(path):
+        synthetic.write_csv(path, n_rows, error_rate, seed=n_rows)
+    return path
+
+def best_time(repeat, run):
+    """The fastest of repeat calls of run(), which returns its own elapsed time"""
+    return min(run() for i in range(repeat))
+
+def time_validate_file(path, repeat):
+    def run():
+        # A new layer and plan each time so the date formats learned on the last run don't carry over
+        clear_plans()
+        layer = synthetic.synthetic_layer()
+        csv_file = open(path, "rb")
+        try:
+            start = time.time()
+            layer.validate_file(csv.reader(csv_file))
+            return time.time() - start
+        finally:
+            csv_file.close()
+    return best_time(repeat, run)
+
+def time_format_messages(path, repeat):
+    """Validate the file once, then time formatting its messages. Returns (seconds, number of messages)."""
+    csv_file = open(path, "rb")
+    try:
+        run = ValidationRun(synthetic.synthetic_layer(), csv.reader(csv_file))
+        for row in run.rows():
+            pass
+    finally:
+        csv_file.close()
+    store = run.state.messages
+
+    def format_all():
+        start = time.time()
+        format_messages(store)
+        return time.time() - start
+    return best_time(repeat, format_all), len(store)
+
+def time_field_checks(path, repeat):
+    """
+    Time each check a field runs over its column of the file, in the order FieldPlan.check runs them, each check
+    being given what the one before it returned. Returns a list of (field, check, values, seconds).
+    """
+    csv_file = open(path, "rb")
+    try:
+        reader = csv.reader(csv_file)
+        fieldnames = reader.next()
+        rows = list(reader)
+    finally:
+        csv_file.close()
+
+    layer = synthetic.synthetic_layer()
+    plan = get_plan(layer)
+    results = []
+
+    for f, index in plan.bind(fieldnames):
+        if index is None:
+            continue
+        field = f.field
+        values = [row[index] for row in rows]
+
+        def timed(check, values):
+            """Time check over values, returning (seconds, what the last run of check returned for each value)"""
+            best = None
+            for i in range(repeat):
+                start = time.time()
+                returned = [check(value) for value in values]
+                elapsed = time.time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best, returned
+
+        def add(check_name, check, values):
+            seconds, returned = timed(check, values)
+            results.append((f.field_name, check_name, len(values), seconds))
+            return returned
+
+        # Values that fail the encoding check skip the rest
+        encoding = add("encoding", field.check_encoding, values)
+        values = [value for value, msg in zip(values, encoding) if not msg]
+
+        values = [data for msg, data in add("format", field.fix_format, values)]
+
+        values = [data for msg, data in add("type", f.convert, values)]
+
+        if f.is_uri:
+            def check_uri(value):
+                used_uris = set()
+                return f.field.check_uri_value(value, f.is_uri_gin, f.is_primary_uri, used_uris)
+            values = [data for msg, data, used_uris in add("uri", check_uri, values)]
+        if f.is_temp_units:
+            check_temp_units = lambda value: field.check_temp_units(value, "c")
+            values = [data for msg, data, temp_units in add("temp_units", check_temp_units, values)]
+        if f.is_srs:
+            check_srs = lambda value: field.check_srs(value, "EPSG:4326")
+            values = [data for msg, data, srs in add("srs", check_srs, values)]
+        if f.is_domain:
+            values = [data for msg, data in add("domain", field.check_domain, values)]
+
+        long_fields = {}
+        add("length", lambda value: field.check_field_length(value, long_fields), values)
+
+    return results
+
+def rate(count, seconds):
+    """count per second, or None if it took too little time to measure"""
+    return count / seconds if seconds else None
+
+def show_rate(count, seconds):
+    per_second = rate(count, seconds)
+    return "-" if per_second is None else "%.0f" % per_second
+
+def run_suite(sizes, error_rates, repeat, data_dir):
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "validator_version": get_validator_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "validate_file": [],
+        "format_messages": [],
+        "field_checks": []
+    }
+
+    print "Layer.validate_file"
+    print "%10s %8s %10s %12s" % ("rows", "errors", "seconds", "rows/s")
+    for n_rows in sizes:
+        for error_rate in error_rates:
+            path = data_file(data_dir, n_rows, error_rate)
+            seconds = time_validate_file(path, repeat)
+            results["validate_file"].append({"rows": n_rows, "error_rate": error_rate, "seconds": seconds,
+                                             "rows_per_second": rate(n_rows, seconds)})
+            print "%10d %8g %10.3f %12s" % (n_rows, error_rate, seconds, show_rate(n_rows, seconds))
+
+    print
+    print "format_messages"
+    print "%10s %8s %10s %10s %12s" % ("rows", "errors", "messages", "seconds", "messages/s")
+    for n_rows in sizes:
+        for error_rate in error_rates:
+            path = data_file(data_dir, n_rows, error_rate)
+            seconds, n_messages = time_format_messages(path, repeat)
+            results["format_messages"].append({"rows": n_rows, "error_rate": error_rate, "messages": n_messages,
+                                               "seconds": seconds, "messages_per_second": rate(n_messages, seconds)})
+            print "%10d %8g %10d %10.4f %12s" % (n_rows, error_rate, n_messages, seconds, show_rate(n_messages, seconds))
+
+    print
+    print "Field checks, %d rows" % CHECK_ROWS
+    print "%8s %-20s %-11s %10s %12s" % ("errors", "field", "check", "seconds", "values/s")
+    for error_rate in error_rates:
+        path = data_file(data_dir, CHECK_ROWS, error_rate)
+        for field_name, check, n_values, seconds in time_field_checks(path, repeat):
+            results["field_checks"].append({"rows": CHECK_ROWS, "error_rate": error_rate, "field": field_name,
+                                            "check": check, "values": n_values, "seconds": seconds,
+                                            "values_per_second": rate(n_values, seconds)})
+            print "%8g %-20s %-11s %10.4f %12s" % (error_rate, field_name, check, seconds, show_rate(n_values, seconds))
+
+    return results
+
+def compare(results, earlier):
+    """Print how much faster (above 1) or slower each result is than the same result of an earlier run"""
+    def keyed(entries, key_names):
+        return dict((tuple(entry[name] for name in key_names), entry) for entry in entries)
+
+    print
+    print "Compared with the run of %s (validator %s)" % (earlier.get("time"), earlier.get("validator_version", "")[:12])
+    for section, key_names in (("validate_file", ("rows", "error_rate")),
+                               ("format_messages", ("rows", "error_rate")),
+                               ("field_checks", ("rows", "error_rate", "field", "check"))):
+        before = keyed(earlier.get(section, []), key_names)
+        for key, entry in sorted(keyed(results[section], key_names).items()):
+            if key in before and entry["seconds"]:
+                speed_up = before[key]["seconds"] / entry["seconds"]
+                print "  %-16s %-50s %6.2fx" % (section, " ".join(str(part) for part in key), speed_up)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the usginmodels validator")
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma separated file sizes")
+    parser.add_argument("--errors", default="0,0.01,0.1", help="comma separated chances of a cell holding a bad value")
+    parser.add_argument("--repeat", type=int, default=3, help="the best of this many runs is reported")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to save the results")
+    parser.add_argument("--compare", help="results saved by an earlier run to compare against")
+    parser.add_argument("--data-dir", help="where to keep the generated files")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.rows.split(",")]
+    error_rates = [float(error_rate) for error_rate in args.errors.split(",")]
+
+    data_dir = args.data_dir or tempfile.mkdtemp()
+    if not os.path.isdir(data_dir):
+        os.makedirs(data_dir)
+    try:
+        results = run_suite(sizes, error_rates, args.repeat, data_dir)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir)
+
+    output_file = open(args.output, "w")
+    try:
+        json.dump(results, output_file, indent=1, sort_keys=True)
+    finally:
+        output_file.close()
+    print
+    print "Saved to " + args.output
+
+    if args.compare:
+        earlier_file = open(args.compare)
+        try:
+            compare(results, json.load(earlier_file))
+        finally:
+            earlier_file.close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
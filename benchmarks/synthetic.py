@@ -0,0 +1,140 @@
+"""
+Synthetic, offline content models for the benchmarks. Nothing here touches schemas.usgin.org.
+"""
+import csv
+import json
+import os
+import random
+import sys
+
+# Let the benchmarks import usginmodels from this checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODEL_URI = "http://stategeothermaldata.org/uri-gin/aasg/xmlschema/benchmark%d/"
+
+def synthetic_fields():
+    """A layer definition with string, double and dateTime fields, including the fields with special checks"""
+    def field(name, field_type, optional=False):
+        return {"name": name, "type": field_type, "description": name, "optional": optional}
+
+    return [
+        field("OBJECTID", "string"),
+        field("HeaderURI", "string"),
+        field("WellBoreURI", "string", True),
+        field("WellName", "string"),
+        field("LatDegree", "double"),
+        field("LongDegree", "double"),
+        field("SRS", "string"),
+        field("TemperatureUnits", "string", True),
+        field("MeasuredTemperature", "double", True),
+        field("Depth", "double"),
+        field("DrillDate", "dateTime", True),
+        field("EndDate", "dateTime"),
+        field("Notes", "string", True),
+        field("Shape", "string")
+    ]
+
+def synthetic_registry(n_models=1, n_versions=3):
+    """Return a contentmodels.json style list of n_models models each with n_versions versions"""
+    models = []
+    for m in range(n_models):
+        uri = MODEL_URI % m
+        versions = []
+        for v in range(n_versions):
+            versions.append({
+                "version": "1.%d" % v,
+                "uri": uri + "1.%d" % v,
+                "xsd_file_path": "",
+                "xls_file_path": "",
+                "date_created": "2013-%02d-01" % (v + 1),
+                "layers_info": {"Benchmark": synthetic_fields()}
+            })
+        models.append({
+            "title": "Benchmark %d" % m,
+            "label": "benchmark%d" % m,
+            "description": "Synthetic content model",
+            "uri": uri,
+            "date_updated": "2013-12-01",
+            "versions": versions
+        })
+
+    return models
+
+def write_registry(path, n_models=1, n_versions=3):
+    """Write a synthetic contentmodels.json to path and return its file:// url"""
+    registry_file = open(path, "w")
+    try:
+        json.dump(synthetic_registry(n_models, n_versions), registry_file)
+    finally:
+        registry_file.close()
+
+    return "file://" + path
+
+def synthetic_rows(n_rows, error_rate=0.0, duplicate_rate=0.0, seed=0):
+    """
+    Yield n_rows rows for the synthetic layer (header first). error_rate is the chance of any cell holding a bad
+    value, duplicate_rate the chance of a row reusing an earlier primary URI.
+    """
+    rand = random.Random(seed)
+    header = [f["name"] for f in synthetic_fields()]
+    yield header
+
+    bad_values = {
+        "HeaderURI": ["", "http://example.org/well/1/", "http://resources.usgin.org/uri-gin/az/1/"],
+        "WellBoreURI": ["not a uri", "http://resources.usgin.org/uri-gin/az/bore/1"],
+        "WellName": ["", " Padded ", "nil:missing", "Caf\xc3\xa9"],
+        "LatDegree": ["", "north", "91.5"],
+        "LongDegree": ["", "west", "-181.5"],
+        "SRS": ["NAD83", ""],
+        "TemperatureUnits": ["F", "K"],
+        "MeasuredTemperature": ["hot", "1200"],
+        "Depth": ["", "deep"],
+        "DrillDate": ["someday", "13/45/2001"],
+        "EndDate": ["", "never"],
+        "Notes": ["  spaced  ", "nil:missing"]
+    }
+
+    for i in range(n_rows):
+        if i and rand.random() < duplicate_rate:
+            header_uri = "http://resources.usgin.org/uri-gin/az/well/%d/" % rand.randint(0, i - 1)
+        else:
+            header_uri = "http://resources.usgin.org/uri-gin/az/well/%d/" % i
+        good = {
+            "OBJECTID": str(i),
+            "HeaderURI": header_uri,
+            "WellBoreURI": "http://resources.usgin.org/uri-gin/az/bore/%d/" % i,
+            "WellName": "Well %d" % i,
+            "LatDegree": "%.5f" % rand.uniform(31.0, 37.0),
+            "LongDegree": "%.5f" % rand.uniform(-115.0, -109.0),
+            "SRS": "EPSG:4326",
+            "TemperatureUnits": "C",
+            "MeasuredTemperature": "%.2f" % rand.uniform(10.0, 250.0),
+            "Depth": "%d" % rand.randint(10, 5000),
+            "DrillDate": "%04d-%02d-%02d" % (rand.randint(1950, 2012), rand.randint(1, 12), rand.randint(1, 28)),
+            "EndDate": "%d/%d/%04d" % (rand.randint(1, 12), rand.randint(1, 28), rand.randint(1950, 2012)),
+            "Notes": "",
+            "Shape": ""
+        }
+
+        row = []
+        for name in header:
+            value = good[name]
+            if error_rate and name in bad_values and rand.random() < error_rate:
+                value = rand.choice(bad_values[name])
+            row.append(value)
+        yield row
+
+def write_csv(path, n_rows, error_rate=0.0, duplicate_rate=0.0, seed=0):
+    """Write synthetic_rows to a CSV file"""
+    csv_file = open(path, "wb")
+    try:
+        writer = csv.writer(csv_file)
+        for row in synthetic_rows(n_rows, error_rate, duplicate_rate, seed):
+            writer.writerow(row)
+    finally:
+        csv_file.close()
+
+def synthetic_layer():
+    """A Layer built straight from the synthetic fields, no registry needed"""
+    from usginmodels.layer import Layer
+    return Layer("Benchmark", synthetic_fields(), (MODEL_URI % 0) + "1.0")
@@ -0,0 +1,159 @@
+"""
+Fixtures shared by the tests: the synthetic content model of the benchmarks and CSV files generated from it, so no
+test needs schemas.usgin.org. Run the tests from the top of the checkout with
+
+    python -m unittest discover tests
+"""
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "Misc"), os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import synthetic
+from usginmodels.plan import clear_plans
+
+# The fixture files: (rows, error rate, duplicate rate, seed)
+FIXTURES = {
+    "clean": (300, 0.0, 0.0, 1),
+    "errors": (500, 0.1, 0.05, 2),
+    "broken": (200, 0.6, 0.3, 3)
+}
+
+def layer():
+    """A new synthetic Layer, with its plan compiled afresh"""
+    clear_plans()
+    return synthetic.synthetic_layer()
+
+def use_registry(models, directory):
+    """
+    Make usginmodels load models, a contentmodels.json style list, from a file in directory with its snapshot kept
+    there too. Returns the cache it replaced, to be put back as usginmodels.cache.
+    """
+    import usginmodels
+    from usginmodels.model_cache import ModelCache
+
+    path = os.path.join(directory, "contentmodels.json")
+    registry_file = open(path, "w")
+    try:
+        json.dump(models, registry_file)
+    finally:
+        registry_file.close()
+
+    cache = usginmodels.cache
+    usginmodels.cache = ModelCache("file://" + path, directory, lazy=True)
+    return cache
+
+def read_csv(path):
+    """Return the rows of a CSV file, the header first, as a list for csv.reader to be replaced by in a test"""
+    csv_file = open(path, "rb")
+    try:
+        return list(csv.reader(csv_file))
+    finally:
+        csv_file.close()
+
+def write_csv(path, rows):
+    csv_file = open(path, "wb")
+    try:
+        csv.writer(csv_file).writerows(rows)
+    finally:
+        csv_file.close()
+
+def comparable(result):
+    """
+    A validation result in a form that compares equal for the same result, whatever the corrected data is. The
+    corrected rows are compared as text, so a NaN equals a NaN and -9999 doesn't equal -9999.0.
+    """
+    valid, messages, dataCorrected, long_fields, srs = result[:5]
+    return (valid, [(unicode(msg), msg.severity) for msg in messages], [repr(list(row)) for row in dataCorrected],
+            long_fields, srs)
+
+def column_name(colx):
+    """The letters of a column in a cell reference: A to Z, then AA"""
+    name = ""
+    colx += 1
+    while colx:
+        colx, letter = divmod(colx - 1, 26)
+        name = chr(ord("A") + letter) + name
+    return name
+
+def cell_xml(ref, value):
+    """A cell of a worksheet: text, a number, a bool, a date as a one item tuple holding its Excel number, or None"""
+    if value is None:
+        return ""
+    if isinstance(value, tuple):
+        return '<c r="%s" s="1"><v>%r</v></c>' % (ref, value[0])
+    if isinstance(value, bool):
+        return '<c r="%s" t="b"><v>%d</v></c>' % (ref, value)
+    if isinstance(value, (int, long, float)):
+        return '<c r="%s"><v>%r</v></c>' % (ref, value)
+    return '<c r="%s" t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (ref, escape(value).encode("utf-8"))
+
+def write_xlsx(path, sheets):
+    """
+    Write a workbook of the smallest xlsx that xlrd reads, so the tests don't need xlwt or Excel. sheets is a list
+    of (name, rows), see cell_xml for the values. Dates get the built in m/d/yyyy format of the 1900 date system.
+    """
+    main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    relationships = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+    workbook = zipfile.ZipFile(path, "w")
+    try:
+        workbook.writestr("[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>')
+        workbook.writestr("xl/workbook.xml",
+            '<workbook xmlns="%s" xmlns:r="%s"><sheets>%s</sheets></workbook>' % (main, relationships,
+            "".join('<sheet name="%s" sheetId="%d" r:id="rId%d"/>' % (escape(name).encode("utf-8"), i + 1, i + 1)
+                    for i, (name, rows) in enumerate(sheets))))
+        workbook.writestr("xl/_rels/workbook.xml.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">%s</Relationships>' %
+            "".join('<Relationship Id="rId%d" Type="%s/worksheet" Target="worksheets/sheet%d.xml"/>' % (i + 1, relationships, i + 1)
+                    for i in range(len(sheets))))
+        workbook.writestr("xl/styles.xml",
+            '<styleSheet xmlns="%s"><cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14" applyNumberFormat="1"/></cellXfs></styleSheet>' % main)
+
+        for i, (name, rows) in enumerate(sheets):
+            xml = ['<worksheet xmlns="%s"><sheetData>' % main]
+            for rowx, row in enumerate(rows):
+                xml.append('<row r="%d">' % (rowx + 1))
+                xml.extend(cell_xml("%s%d" % (column_name(colx), rowx + 1), value) for colx, value in enumerate(row))
+                xml.append('</row>')
+            xml.append('</sheetData></worksheet>')
+            workbook.writestr("xl/worksheets/sheet%d.xml" % (i + 1), "".join(xml))
+    finally:
+        workbook.close()
+
+class FixtureCase(unittest.TestCase):
+    """A TestCase with the fixture files written to a temporary directory, available as self.paths"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp(prefix="usginmodels-tests-")
+        cls.paths = {}
+        for name, (n_rows, error_rate, duplicate_rate, seed) in sorted(FIXTURES.items()):
+            cls.paths[name] = os.path.join(cls.directory, name + ".csv")
+            synthetic.write_csv(cls.paths[name], n_rows, error_rate, duplicate_rate, seed)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def validate(self, name, **options):
+        """Layer.validate_file on a fixture file"""
+        csv_file = open(self.paths[name], "rb")
+        try:
+            return layer().validate_file(csv.reader(csv_file), **options)
+        finally:
+            csv_file.close()
+
+    def assertSameResult(self, expected, actual):
+        self.assertEqual(comparable(expected), comparable(actual))
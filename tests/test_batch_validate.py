@@ -0,0 +1,226 @@
+"""
+BatchValidate: the jobs read from a manifest or a directory, the names of their reports, the report of each kind of
+file and the exit codes of the command, against the synthetic registry.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import support
+import synthetic
+import usginmodels
+import BatchValidate
+
+SCHEMA = "Benchmark 0 1.0"
+SCHEMA_URI = synthetic.MODEL_URI % 0 + "1.0"
+
+def text_rows(path):
+    """The rows of a CSV file as the text cells of a sheet"""
+    return [[value.decode("utf-8") for value in row] for row in support.read_csv(path)]
+
+def ascii_rows(path):
+    """The rows of a CSV file with the text that fails the encoding check made ASCII, so a sheet of it converts"""
+    return [[value.decode("utf-8").encode("ascii", "replace") for value in row] for row in support.read_csv(path)]
+
+def file_names(jobs):
+    return [os.path.basename(job.in_file) for job in jobs]
+
+class BatchValidateTest(support.FixtureCase):
+
+    @classmethod
+    def setUpClass(cls):
+        support.FixtureCase.setUpClass()
+        cls.cache = support.use_registry(synthetic.synthetic_registry(1, 2), cls.directory)
+
+        # A sheet named after the layer after one that isn't, an encoding error and a workbook with no sheets
+        cls.sheets = {
+            "clean": os.path.join(cls.directory, "clean.xlsx"),
+            "errors": os.path.join(cls.directory, "errors.xlsx"),
+            "encoding": os.path.join(cls.directory, "encoding.xlsx"),
+            "empty": os.path.join(cls.directory, "empty.xlsx")
+        }
+        support.write_xlsx(cls.sheets["clean"], [("Notes", [[u"Nothing here"]]),
+                                                 ("Benchmark", text_rows(cls.paths["clean"]))])
+        cls.paths["ascii"] = os.path.join(cls.directory, "ascii.csv")
+        support.write_csv(cls.paths["ascii"], ascii_rows(cls.paths["errors"]))
+        support.write_xlsx(cls.sheets["errors"], [("Benchmark", text_rows(cls.paths["ascii"]))])
+        encoding = text_rows(cls.paths["clean"])
+        encoding[3][encoding[0].index("Notes")] = u"Caf\xe9"
+        support.write_xlsx(cls.sheets["encoding"], [("Benchmark", encoding)])
+        support.write_xlsx(cls.sheets["empty"], [])
+
+        rows = support.read_csv(cls.paths["clean"])
+        rows[3][rows[0].index("Notes")] = "Caf\xc3\xa9"
+        cls.paths["encoding"] = os.path.join(cls.directory, "encoding.csv")
+        support.write_csv(cls.paths["encoding"], rows)
+
+    @classmethod
+    def tearDownClass(cls):
+        usginmodels.cache = cls.cache
+        support.FixtureCase.tearDownClass()
+
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="usginmodels-batch-")
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def job(self, path, sheet_name=None, quick=False):
+        return BatchValidate.Job(path, sheet_name, SCHEMA, "Benchmark", quick)
+
+    def main(self, *args):
+        """Run the command, returning its exit code and the summary it wrote to self.out_dir"""
+        out_dir = self.out_dir = os.path.join(tempfile.mkdtemp(dir=self.work), "reports")
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = StringIO()
+        try:
+            code = BatchValidate.main(list(args) + ["--out", out_dir])
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+        summary_path = os.path.join(out_dir, "summary.json")
+        if not os.path.exists(summary_path):
+            return code, None
+        summary_file = open(summary_path)
+        try:
+            return code, json.load(summary_file)
+        finally:
+            summary_file.close()
+
+    def submissions(self, *paths):
+        """A directory holding copies of paths"""
+        directory = tempfile.mkdtemp(dir=self.work)
+        for path in paths:
+            shutil.copy(path, directory)
+        return directory
+
+    def test_read_manifest(self):
+        os.makedirs(os.path.join(self.work, "sub"))
+        manifest = os.path.join(self.work, "manifest.csv")
+        support.write_csv(manifest, [
+            [" File ", "SHEET", "Schema ", " layer"],
+            ["sub/a.csv", "", SCHEMA, "Benchmark"],
+            [" b.xlsx ", " Wells ", SCHEMA_URI, " Benchmark "],
+            ["c.xlsx", "N/A", SCHEMA, "Benchmark"],
+            ["", "Wells", SCHEMA, "Benchmark"],
+            [os.path.join(self.directory, "clean.csv")]
+        ])
+
+        jobs = BatchValidate.read_manifest(manifest)
+        self.assertEqual([job.in_file for job in jobs],
+                         [os.path.join(self.work, "sub", "a.csv"), os.path.join(self.work, "b.xlsx"),
+                          os.path.join(self.work, "c.xlsx"), os.path.join(self.directory, "clean.csv")])
+        self.assertEqual([job.sheet_name for job in jobs], ["N/A", "Wells", "N/A", "N/A"])
+        self.assertEqual([(job.schema, job.layer_name) for job in jobs[:3]],
+                         [(SCHEMA, "Benchmark"), (SCHEMA_URI, "Benchmark"), (SCHEMA, "Benchmark")])
+
+    def test_read_directory(self):
+        directory = self.submissions(self.paths["clean"], self.sheets["errors"])
+        for name in ("~$errors.xlsx", "NOTES.txt", "upper.XLSX"):
+            open(os.path.join(directory, name), "w").close()
+
+        jobs = BatchValidate.read_directory(directory, SCHEMA, "Benchmark", "Wells")
+        self.assertEqual(file_names(jobs), ["clean.csv", "errors.xlsx", "upper.XLSX"])
+        self.assertEqual([job.sheet_name for job in jobs], ["N/A", "Wells", "Wells"])
+        self.assertEqual([job.sheet_name for job in BatchValidate.read_directory(directory, SCHEMA, "Benchmark")],
+                         ["N/A", "N/A", "N/A"])
+
+    def test_report_names(self):
+        jobs = [self.job("one/wells.csv"), self.job("two/wells.csv"), self.job("three/Wells.csv"),
+                self.job("summary.csv"), self.job("Summary.xlsx", "N/A"), self.job("well data.xlsx", "Sheet 1"),
+                self.job("well data.xlsx", "Sheet 1")]
+        self.assertEqual(BatchValidate.report_names(jobs),
+                         ["wells.json", "wells-2.json", "Wells-3.json", "summary-2.json", "Summary-3.json",
+                          "well_data-Sheet_1.json", "well_data-Sheet_1-2.json"])
+
+    def test_csv_reports(self):
+        report = BatchValidate.run_job(self.job(self.paths["clean"]))
+        self.assertEqual((report["status"], report["valid"], report["rows"]), ("valid", True, 300))
+        self.assertEqual(report["schema_uri"], SCHEMA_URI)
+        self.assertEqual(report["counts"]["error"], 0)
+
+        report = BatchValidate.run_job(self.job(self.paths["errors"]))
+        self.assertEqual((report["status"], report["valid"], report["rows"]), ("invalid", False, 500))
+        self.assertTrue(report["counts"]["error"] > 0)
+        self.assertEqual(len(report["messages"]), sum(report["counts"].values()))
+
+        # A bad character in a CSV file is a validation error like any other
+        report = BatchValidate.run_job(self.job(self.paths["encoding"]))
+        self.assertEqual(report["status"], "invalid")
+        self.assertTrue([m for m in report["messages"] if "unrecognized character" in m["text"]])
+
+    def test_excel_reports(self):
+        report = BatchValidate.run_job(self.job(self.sheets["clean"]))
+        self.assertEqual((report["status"], report["sheet"], report["rows"]), ("valid", "Benchmark", 300))
+
+        report = BatchValidate.run_job(self.job(self.sheets["errors"], "Benchmark"))
+        self.assertEqual((report["status"], report["rows"]), ("invalid", 500))
+        self.assertEqual(report, dict(BatchValidate.run_job(self.job(self.paths["ascii"])),
+                                      file=report["file"], sheet=report["sheet"], seconds=report["seconds"]))
+
+        # A bad character in a sheet stops the conversion
+        report = BatchValidate.run_job(self.job(self.sheets["encoding"]))
+        self.assertEqual((report["status"], report["valid"]), ("failed", False))
+        self.assertEqual((report["error_row"], report["error_column"]), (4, 13))
+        self.assertEqual(report["error_cells"], [(4, 13)])
+
+        report = BatchValidate.run_job(self.job(self.sheets["empty"]))
+        self.assertEqual((report["status"], report["sheet"]), ("failed", "N/A"))
+        self.assertEqual(report["error"], "ConversionError: The workbook has no sheets")
+
+        report = BatchValidate.run_job(self.job(self.sheets["clean"], "Nope"))
+        self.assertEqual(report["status"], "failed")
+        self.assertTrue(report["error"].startswith("SheetNotFound"))
+
+    def test_unknown_schema(self):
+        report = BatchValidate.run_job(BatchValidate.Job(self.paths["clean"], None, "Nothing 1.0", "Benchmark"))
+        self.assertEqual(report["status"], "failed")
+        report = BatchValidate.run_job(BatchValidate.Job(self.paths["clean"], None, SCHEMA, "Nope"))
+        self.assertEqual(report["status"], "failed")
+
+    def test_exit_codes(self):
+        code, summary = self.main(self.submissions(self.paths["clean"], self.sheets["clean"]),
+                                  "--schema", SCHEMA, "--layer", "Benchmark")
+        self.assertEqual(code, 0)
+        self.assertEqual((summary["total"], summary["valid"]), (2, 2))
+
+        code, summary = self.main(self.submissions(self.paths["clean"], self.paths["errors"], self.sheets["empty"]),
+                                  "--schema", SCHEMA, "--layer", "Benchmark", "--processes", "2")
+        self.assertEqual(code, 1)
+        self.assertEqual((summary["valid"], summary["invalid"], summary["failed"]), (1, 1, 1))
+        self.assertEqual([f["report"] for f in summary["files"]], ["clean.json", "empty.json", "errors.json"])
+
+        self.assertEqual(self.main(os.path.join(self.work, "missing.csv")), (2, None))
+        self.assertEqual(self.main(self.submissions(), "--schema", SCHEMA, "--layer", "Benchmark"), (2, None))
+
+    def test_quick(self):
+        manifest = os.path.join(self.work, "manifest.csv")
+        support.write_csv(manifest, [["file", "sheet", "schema", "layer"],
+                                     [self.paths["ascii"], "", SCHEMA, "Benchmark"],
+                                     [self.sheets["errors"], "Benchmark", SCHEMA, "Benchmark"]])
+        code, summary = self.main(manifest, "--quick", "--processes", "1")
+        self.assertEqual(code, 1)
+
+        reports = []
+        for entry in summary["files"]:
+            report_file = open(os.path.join(self.out_dir, entry["report"]))
+            try:
+                reports.append(json.load(report_file))
+            finally:
+                report_file.close()
+            self.assertEqual(entry["rows"], reports[-1]["estimated_rows"])
+
+        for report in reports:
+            self.assertEqual(report["status"], "invalid")
+            self.assertEqual(report["sampled"], 500)
+            self.assertTrue(0 < report["error_rate"] < 1)
+            self.assertFalse("rows" in report or "srs" in report or "long_fields" in report)
+        self.assertEqual(reports[0]["error_rate"], reports[1]["error_rate"])
+        self.assertEqual(reports[0]["messages"], reports[1]["messages"])
+
+if __name__ == "__main__":
+    unittest.main()
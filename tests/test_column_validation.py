@@ -0,0 +1,58 @@
+"""
+Validating a column at a time gives the same result as validating a row at a time, with NumPy checking the double
+columns and without it.
+"""
+import unittest
+
+import support
+from usginmodels import column_validation
+
+# Values of a double column that NumPy and float() might read differently
+DOUBLES = [
+    "1.5", " 2.5 ", "1e3", "-0", "+5", ".5", "5.", "0.1", "1.0000000000001", "12345678901234567890",
+    "inf", "-Infinity", "nan", "NaN", "0x10", "1_000", "1,5", "1.5.5", "\x001", "1\x00", "  ", "", "-9999",
+    "91.5", "-181.5", "1000.5", "Caf\xc3\xa9", "nil:missing", " 5\t", "1e400", "-1e-400"
+]
+
+def double_rows(header):
+    """Rows with each of DOUBLES in each double column, the other fields taken from a clean row"""
+    template = list(support.synthetic.synthetic_rows(1))[1]
+    columns = [i for i, name in enumerate(header) if name in ("LatDegree", "LongDegree", "MeasuredTemperature", "Depth")]
+    rows = [header]
+    for i, value in enumerate(DOUBLES):
+        row = list(template)
+        row[0] = str(i)
+        row[1] = "http://resources.usgin.org/uri-gin/az/well/%d/" % i
+        for column in columns:
+            row[column] = value
+        rows.append(row)
+    return rows
+
+class ColumnValidationTest(support.FixtureCase):
+
+    def setUp(self):
+        self.numpy = column_validation.numpy
+
+    def tearDown(self):
+        column_validation.numpy = self.numpy
+
+    def check_fixtures(self):
+        for name in sorted(self.paths):
+            self.assertSameResult(self.validate(name), self.validate(name, by_column=True))
+            self.assertSameResult(self.validate(name), self.validate(name, by_column=True, columnar=True))
+
+        header = list(support.synthetic.synthetic_rows(0))[0]
+        rows = double_rows(header)
+        self.assertSameResult(support.layer().validate_file(iter(rows)),
+                              support.layer().validate_file(iter(rows), by_column=True))
+
+    @unittest.skipIf(column_validation.import_numpy() is None, "NumPy isn't installed")
+    def test_same_as_rows_with_numpy(self):
+        self.check_fixtures()
+
+    def test_same_as_rows_without_numpy(self):
+        column_validation.numpy = None
+        self.check_fixtures()
+
+if __name__ == "__main__":
+    unittest.main()
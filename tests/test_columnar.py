@@ -0,0 +1,150 @@
+"""
+ColumnarData reads back like the list of rows it replaces: indexes, slices of slices, rows still pending and a
+pickled copy, with the doubles and dates its columns pack kept as they were given.
+"""
+import cPickle
+import unittest
+from datetime import datetime
+
+import support  # puts the checkout on sys.path
+from usginmodels.columnar import ColumnarData, DoubleColumn, DateColumn, VALUE, BLANK, INT, OTHER
+
+DOUBLES = [1.5, -9999, "", "Caf\xc3\xa9", 0.0, -0.25, float("nan"), 1e300, u"x", None]
+DATES = ["2013-01-02T03:04:05", "1969-12-31T23:59:59", "1900-01-01T00:00:00", "2013-01-02T03:04:05.500000",
+         "2013-01-02", "01/02/2013", "", "2013-02-30T00:00:00", "2013-01-02T24:00:00", "Caf\xc3\xa9"]
+STRINGS = ["Well %d" % (i % 3) for i in range(len(DATES))]
+
+class FieldStub():
+    def __init__(self, field_type):
+        self.field_type = field_type
+
+class FieldPlanStub():
+    def __init__(self, field_type):
+        self.field = FieldStub(field_type)
+
+class PlanStub():
+    """What ColumnarData needs of a LayerPlan"""
+    field_names = ["Depth", "DrillDate", "WellName"]
+    fields = [FieldPlanStub("double"), FieldPlanStub("dateTime"), FieldPlanStub("string")]
+
+def rows(n):
+    return [[DOUBLES[i % len(DOUBLES)], DATES[i % len(DATES)], STRINGS[i % len(STRINGS)]] for i in range(n)]
+
+def columnar(rows, block_size=None):
+    data = ColumnarData(PlanStub())
+    if block_size is not None:
+        data.block_size = block_size
+    data.extend(rows)
+    return data
+
+class ColumnarDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.expected = [PlanStub.field_names] + rows(25)
+
+    def assertSameRows(self, actual, expected):
+        # repr, so a NaN equals a NaN and -9999 doesn't equal -9999.0
+        self.assertEqual(repr(list(actual)), repr(list(expected)))
+
+    def check_reads(self, data):
+        expected = self.expected
+        self.assertEqual(len(data), len(expected))
+        self.assertSameRows(data, expected)
+        for i in range(-len(expected), len(expected)):
+            self.assertEqual(repr(data[i]), repr(expected[i]), i)
+        self.assertRaises(IndexError, data.__getitem__, len(expected))
+        self.assertRaises(IndexError, data.__getitem__, -len(expected) - 1)
+
+    def test_indexes(self):
+        for block_size in (1, 4, 1024):
+            self.check_reads(columnar(self.expected[1:], block_size))
+
+    def test_slices(self):
+        data = columnar(self.expected[1:], 4)
+        expected = self.expected
+        for start, stop, step in [(1, None, None), (None, None, 2), (3, 20, 3), (-5, None, None), (None, -3, None),
+                                  (20, 5, -2), (5, 2, None), (40, None, None), (0, 0, None), (None, None, -1)]:
+            index = slice(start, stop, step)
+            self.assertSameRows(data[index], expected[index])
+            self.assertEqual(len(data[index]), len(expected[index]))
+
+        # Slices of slices, as in dataCorrected[1:]
+        self.assertSameRows(data[1:][::2], expected[1:][::2])
+        self.assertSameRows(data[1:][2:10][3:], expected[1:][2:10][3:])
+        self.assertSameRows(data[2:][-3:], expected[2:][-3:])
+        self.assertSameRows(data[1:][5:5], [])
+        self.assertEqual(repr(data[1:][-1]), repr(expected[-1]))
+        self.assertEqual(repr(data[3:8][0]), repr(expected[3]))
+        self.assertRaises(IndexError, data[1:].__getitem__, len(expected) - 1)
+        self.assertRaises(IndexError, data[3:8].__getitem__, -6)
+        self.assertSameRows(data[1:][100:], [])
+
+    def test_pending_rows(self):
+        data = columnar(self.expected[1:], 10)
+        self.assertTrue(data.pending)
+        self.check_reads(data)
+
+        data = columnar(self.expected[1:], 10)
+        self.assertSameRows(data[20:], self.expected[20:])
+        data = columnar(self.expected[1:], 1024)
+        self.assertEqual(data.count, 0)
+        self.assertEqual(repr(data[-1]), repr(self.expected[-1]))
+
+        # Appending after reading
+        data.append(self.expected[1])
+        self.expected.append(self.expected[1])
+        self.check_reads(data)
+
+    def test_pickle(self):
+        data = columnar(self.expected[1:], 10)
+        copy = cPickle.loads(cPickle.dumps(data, cPickle.HIGHEST_PROTOCOL))
+        self.assertFalse(copy.pending)
+        self.check_reads(copy)
+        self.check_reads(data)
+
+    def test_header(self):
+        data = columnar([])
+        self.assertEqual(list(data), [PlanStub.field_names])
+        self.assertSameRows(data[1:], [])
+        data[0].append("changed")
+        self.assertEqual(data[0], PlanStub.field_names)
+
+class ColumnTest(unittest.TestCase):
+
+    def test_double_kinds(self):
+        column = DoubleColumn()
+        column.extend(DOUBLES)
+        self.assertEqual(list(column.kinds), [VALUE, INT, BLANK, OTHER, VALUE, VALUE, VALUE, VALUE, OTHER, OTHER])
+        self.assertEqual(repr([column.get(i) for i in range(len(DOUBLES))]), repr(DOUBLES))
+        self.assertTrue(type(column.get(1)) is int)
+        self.assertEqual(repr(column.block(0, len(DOUBLES))), repr(DOUBLES))
+        self.assertEqual(repr(column.block(2, 5)), repr(DOUBLES[2:5]))
+
+        # A block of floats only, then a block with everything
+        column = DoubleColumn()
+        column.extend([1.0, 2.5, -0.0])
+        column.extend(DOUBLES)
+        self.assertEqual(list(column.kinds[:3]), [VALUE] * 3)
+        self.assertEqual(repr(column.block(0, 3)), repr([1.0, 2.5, -0.0]))
+        self.assertEqual(repr(column.block(0, 13)), repr([1.0, 2.5, -0.0] + DOUBLES))
+
+    def test_date_kinds(self):
+        column = DateColumn()
+        column.extend(DATES)
+        self.assertEqual(list(column.kinds), [VALUE, VALUE, VALUE, OTHER, OTHER, OTHER, BLANK, OTHER, OTHER, OTHER])
+        self.assertEqual([column.get(i) for i in range(len(DATES))], DATES)
+        self.assertEqual(column.block(0, len(DATES)), DATES)
+        self.assertEqual(column.block(1, 4), DATES[1:4])
+
+    def test_get_datetime(self):
+        column = DateColumn()
+        column.extend(DATES)
+        self.assertEqual(column.get_datetime(0), datetime(2013, 1, 2, 3, 4, 5))
+        self.assertEqual(column.get_datetime(1), datetime(1969, 12, 31, 23, 59, 59))
+        self.assertEqual(column.get_datetime(2), datetime(1900, 1, 1))
+        for i in range(3, len(DATES)):
+            self.assertEqual(column.get_datetime(i), None)
+        self.assertEqual([column.get_datetime(i).isoformat() for i in range(3)], DATES[:3])
+
+if __name__ == "__main__":
+    unittest.main()
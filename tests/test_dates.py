@@ -0,0 +1,61 @@
+"""
+DateParser gives the same datetime as dateutil, or fails the same way, for the formats it knows and for the
+ones it leaves to dateutil.
+"""
+import random
+import unittest
+
+from dateutil import parser
+
+import support  # puts the checkout and the benchmarks on sys.path
+from usginmodels.dates import DateParser, DEFAULT_DATE
+
+VALUES = [
+    "2001-02-03", "2001-02-03T04:05", "2001-02-03 04:05:06", "1999-12-31T23:59:59",
+    "2/3/2001", "02/03/2001 04:05", "12/31/1999 4:05:06", "1/1/1000",
+    "2001", "1955",
+    "2001-02-30", "2/30/2001", "13/45/2001", "2001-13-01", "0999-01-01",
+    "3 Feb 2001", "February 3, 2001", "20010203", "2001/02/03", "03.02.2001", "2001-02-03T04:05:06Z",
+    "someday", "never", ""
+]
+
+def dateutil_parse(text):
+    """The datetime dateutil gives, or the class of the error it raises"""
+    try:
+        return parser.parse(text, default=DEFAULT_DATE)
+    except Exception as err:
+        return err.__class__
+
+def date_parse(date_parser, text):
+    try:
+        return date_parser.parse(text)
+    except Exception as err:
+        return err.__class__
+
+class DateParserTest(unittest.TestCase):
+
+    def test_same_as_dateutil(self):
+        date_parser = DateParser()
+        for text in VALUES:
+            self.assertEqual(date_parse(date_parser, text), dateutil_parse(text), text)
+
+    def test_order_of_values_does_not_matter(self):
+        rand = random.Random(0)
+        for i in range(20):
+            values = list(VALUES)
+            rand.shuffle(values)
+            date_parser = DateParser()
+            for text in values:
+                self.assertEqual(date_parse(date_parser, text), dateutil_parse(text), text)
+
+    def test_last_format_tried_first(self):
+        date_parser = DateParser()
+        date_parser.parse("2/3/2001")
+        first = date_parser.formats[0][0]
+        self.assertTrue(first.match("12/31/1999"))
+
+        date_parser.parse("2001-02-03")
+        self.assertFalse(date_parser.formats[0][0].match("12/31/1999"))
+
+if __name__ == "__main__":
+    unittest.main()
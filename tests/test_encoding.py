@@ -0,0 +1,34 @@
+"""
+The one-pass encoding check agrees with checking each value on its own, for text, numbers and values it can't
+remember.
+"""
+import unittest
+
+from usginmodels.encoding import EncodingChecker, encodable, plain_text
+
+VALUES = ["Well 1", u"Well 1", "", u"", "Caf\xc3\xa9", u"Caf\xe9", u"\u0100", "\xff", u"\u20ac", "tab\there",
+          12.5, 0, None, True, u"Well 1"]
+
+class EncodingTest(unittest.TestCase):
+
+    def test_checker_same_as_encodable(self):
+        for max_known in (0, 1, 4096):
+            checker = EncodingChecker(max_known)
+            for value in VALUES + VALUES:
+                self.assertEqual(checker.check(value), encodable(value), repr(value))
+            self.assertTrue(len(checker.known) <= max_known)
+
+    def test_unhashable(self):
+        self.assertEqual(EncodingChecker().check([u"a"]), encodable([u"a"]))
+
+    def test_plain_text(self):
+        self.assertTrue(plain_text(["Well 1", u"Well 2", ""]))
+        self.assertTrue(plain_text([]))
+        for value in VALUES:
+            if plain_text([value]):
+                self.assertTrue(encodable(value), repr(value))
+        self.assertFalse(plain_text(["Well 1", u"Caf\xe9"]))
+        self.assertFalse(plain_text(["Well 1", 12.5]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+The error budget: validation stops once max_errors errors or max_messages different messages have been found, the
+report ends with where it stopped, and up to there it is the same as a full run.
+"""
+import csv
+import unittest
+
+import support
+from usginmodels.messages import ERROR
+
+def comparable_rows(dataCorrected):
+    return [repr(list(row)) for row in dataCorrected]
+
+class ErrorBudgetTest(support.FixtureCase):
+
+    def test_large_budget_is_a_full_run(self):
+        for name in sorted(self.paths):
+            self.assertSameResult(self.validate(name), self.validate(name, max_errors=10 ** 6, max_messages=10 ** 6))
+
+    def test_clean_file_is_not_stopped(self):
+        self.assertSameResult(self.validate("clean"), self.validate("clean", fail_fast=True))
+
+    def test_fail_fast_stops_at_first_error(self):
+        valid, messages, dataCorrected, long_fields, srs = self.validate("errors", fail_fast=True)
+        self.assertFalse(valid)
+        self.assertEqual(messages[-1].severity, ERROR)
+        self.assertTrue(messages[-1].endswith("Validation stopped after finding 1 error. The rows after this one were not checked."))
+
+        errors = [msg for msg in messages[:-1] if msg.severity == ERROR]
+        self.assertEqual(len(errors), 1)
+
+        # The corrected data ends with the row the error was found in
+        row = int(messages[-1].split()[1])
+        self.assertEqual(len(dataCorrected), row + 1)
+        self.assertEqual(comparable_rows(dataCorrected), comparable_rows(self.validate("errors")[2][:row + 1]))
+
+    def test_max_errors(self):
+        valid, messages = self.validate("broken", max_errors=5)[:2]
+        self.assertTrue(messages[-1].endswith("Validation stopped after finding 5 errors. The rows after this one were not checked."))
+
+    def test_max_messages(self):
+        valid, messages = self.validate("errors", max_messages=4)[:2]
+
+        # The row that used up the budget is checked to the end, so it can add more than one message
+        found = len(messages) - 1
+        self.assertTrue(found >= 4)
+        self.assertTrue("after finding %d different messages" % found in messages[-1])
+
+    def test_stops_reading(self):
+        csv_file = open(self.paths["broken"], "rb")
+        try:
+            reader = csv.reader(csv_file)
+            support.layer().validate_file(reader, fail_fast=True)
+            self.assertTrue(reader.line_num < 10)
+        finally:
+            csv_file.close()
+
+    def test_same_as_full_run_up_to_the_stop(self):
+        full = self.validate("errors")[1]
+        stopped = self.validate("errors", max_messages=6)[1]
+
+        # The messages found before the stop are the first ones of the full run, found in fewer rows
+        for msg, full_msg in zip(stopped[:-1], full):
+            self.assertEqual(msg.split(" ", 2)[2], full_msg.split(" ", 2)[2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+RowStore: revalidating a file gives the same result as a full run while only checking the rows that are new or
+changed, and results are not reused for another source, header or an unreadable store.
+"""
+import shutil
+import tempfile
+import unittest
+
+import support
+from usginmodels import incremental
+from usginmodels.incremental import RowStore
+
+class RowStoreTest(support.FixtureCase):
+
+    def setUp(self):
+        self.store = RowStore(tempfile.mkdtemp(prefix="usginmodels-rows-"))
+        self.checked = 0
+        self.check_row = incremental.check_row
+
+        def check_row(plan, row, columns):
+            self.checked += 1
+            return self.check_row(plan, row, columns)
+        incremental.check_row = check_row
+
+    def tearDown(self):
+        incremental.check_row = self.check_row
+        shutil.rmtree(self.store.path, ignore_errors=True)
+
+    def revalidate(self, rows, source="fixture"):
+        """Validate rows (the header first) with the store, returning the result and how many rows were checked"""
+        self.checked = 0
+        result = support.layer().validate_file(iter(rows), row_store=self.store, source=source)
+        return result, self.checked
+
+    def assertSameAsFullRun(self, rows, result):
+        self.assertSameResult(support.layer().validate_file(iter(rows)), result)
+
+    def test_unchanged_file(self):
+        rows = support.read_csv(self.paths["errors"])
+        result, checked = self.revalidate(rows)
+        self.assertSameAsFullRun(rows, result)
+        self.assertTrue(checked > 0)
+
+        result, checked = self.revalidate(rows)
+        self.assertSameAsFullRun(rows, result)
+        self.assertEqual(checked, 0)
+
+    def test_edited_rows(self):
+        rows = support.read_csv(self.paths["errors"])
+        self.revalidate(rows)
+
+        # Change a value, duplicate a primary URI, insert and delete rows
+        rows[5][4] = "north"
+        rows[20][1] = rows[3][1]
+        rows.insert(40, list(rows[41]))
+        rows[40][3] = "New well"
+        del rows[100:110]
+
+        result, checked = self.revalidate(rows)
+        self.assertSameAsFullRun(rows, result)
+        self.assertEqual(checked, 3)
+
+    def test_field_failing_the_encoding_check(self):
+        # A value that fails the encoding check never reaches the length check, so its field may have no long_fields key
+        rows = support.read_csv(self.paths["clean"])
+        index = rows[0].index("Notes")
+        for row in rows[1:]:
+            row[index] = "Caf\xc3\xa9"
+
+        for some_rows in (rows[:2], rows):
+            expected = support.layer().validate_file(iter(some_rows))
+            self.assertFalse("Notes" in expected[3])
+            result, checked = self.revalidate(some_rows, "encoding %d" % len(some_rows))
+            self.assertSameResult(expected, result)
+
+    def test_other_source(self):
+        rows = support.read_csv(self.paths["clean"])
+        self.revalidate(rows)
+        result, checked = self.revalidate(rows, "another")
+        self.assertEqual(checked, len(rows) - 1)
+
+    def test_other_header(self):
+        rows = support.read_csv(self.paths["clean"])
+        self.revalidate(rows)
+
+        # The same fields in another order
+        reordered = [row[1:2] + row[:1] + row[2:] for row in rows]
+        result, checked = self.revalidate(reordered)
+        self.assertSameAsFullRun(reordered, result)
+        self.assertEqual(checked, len(rows) - 1)
+
+    def test_unreadable_store(self):
+        rows = support.read_csv(self.paths["broken"])
+        self.revalidate(rows)
+
+        key = self.store.key("fixture", support.layer().version_uri, "Benchmark", [name.strip() for name in rows[0]])
+        store_file = open(self.store.rows_path(key), "wb")
+        try:
+            store_file.write("not rows")
+        finally:
+            store_file.close()
+
+        result, checked = self.revalidate(rows)
+        self.assertSameAsFullRun(rows, result)
+        self.assertEqual(checked, len(rows) - 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Importing usginmodels neither fetches contentmodels.json nor reads its snapshot; the first call that needs the
+models loads them once. The import is done in a fresh interpreter with urlopen and open patched beforehand.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import support
+import synthetic
+
+# Records the fetches and the files opened in the cache directory, before, during and after the import
+SCRIPT = r"""
+import __builtin__
+import json
+import os
+import sys
+import urllib2
+from StringIO import StringIO
+
+root, cache_dir, registry = sys.argv[1:]
+events = []
+
+class Response(StringIO):
+    def info(self):
+        return {}
+
+def urlopen(request, timeout=None):
+    events.append("fetch")
+    return Response(registry)
+urllib2.urlopen = urlopen
+
+builtin_open = __builtin__.open
+def recording_open(name, *args):
+    if os.path.abspath(name).startswith(cache_dir):
+        events.append("open")
+    return builtin_open(name, *args)
+__builtin__.open = recording_open
+
+sys.path.insert(0, root)
+import usginmodels
+stages = {"import": list(events), "loaded": usginmodels.cache.last_update is not None}
+
+del events[:]
+usginmodels.get_layer("http://stategeothermaldata.org/uri-gin/aasg/xmlschema/benchmark0/1.1", "Benchmark")
+stages["first"] = list(events)
+
+del events[:]
+usginmodels.get_models()
+usginmodels.get_schema_uri("Benchmark 0 1.0")
+usginmodels.get_model("http://stategeothermaldata.org/uri-gin/aasg/xmlschema/benchmark0/")
+stages["later"] = list(events)
+
+sys.stdout.write(json.dumps(stages))
+"""
+
+class LazyImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="usginmodels-lazy-")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def run_import(self):
+        env = dict(os.environ, USGINMODELS_CACHE_DIR=self.cache_dir, USGINMODELS_URL="http://example.org/contentmodels.json")
+        process = subprocess.Popen([sys.executable, "-c", SCRIPT, support.ROOT, self.cache_dir,
+                                    json.dumps(synthetic.synthetic_registry())],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        out, err = process.communicate()
+        self.assertEqual(process.returncode, 0, err)
+        return json.loads(out)
+
+    def test_first_call_loads_once(self):
+        # No snapshot yet: the first call fetches and writes one
+        stages = self.run_import()
+        self.assertEqual(stages["import"], [])
+        self.assertFalse(stages["loaded"])
+        self.assertEqual(stages["first"].count("fetch"), 1)
+        self.assertEqual(stages["later"], [])
+        self.assertTrue(os.listdir(self.cache_dir))
+
+        # A fresh snapshot: the first call reads it once and fetches nothing
+        stages = self.run_import()
+        self.assertEqual(stages["import"], [])
+        self.assertFalse(stages["loaded"])
+        self.assertEqual(stages["first"], ["open"])
+        self.assertEqual(stages["later"], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Looking up models, versions and layers through the indexes finds what the linear scans they replaced found: the
+first match for a repeated uri or layer name, the last version for a repeated "Title version" name, and the last of
+the latest versions when their dates tie.
+"""
+import shutil
+import tempfile
+import unittest
+
+import support
+import synthetic
+import usginmodels
+from usginmodels.content_model import ContentModel
+from usginmodels.model_version import ModelVersion
+
+MODEL_URI = "http://example.org/uri-gin/dup/"
+OTHER_URI = "http://example.org/uri-gin/other/"
+
+def version(uri, number, date_created, layer_names=("Benchmark",)):
+    return {"version": number, "uri": uri + number, "date_created": date_created,
+            "layers_info": dict((name, synthetic.synthetic_fields()) for name in layer_names)}
+
+def model(uri, title, versions):
+    return {"title": title, "uri": uri, "versions": versions}
+
+# A model whose uri is repeated by the next one, a repeated version uri, dates that tie and a "Title version" name
+# used by two models
+MODELS = [
+    model(MODEL_URI, "Dup", [version(MODEL_URI, "1.0", "2013-01-01"),
+                             version(MODEL_URI, "1.0", "2013-06-01", ("Benchmark", "Second")),
+                             version(MODEL_URI, "1.1", "2013-03-01"),
+                             version(MODEL_URI, "1.2", "2013-03-01", ("Benchmark", "Third"))]),
+    model(MODEL_URI, "Dup B", [version(MODEL_URI, "2.0", "2014-01-01")]),
+    model(OTHER_URI, "Dup", [version(OTHER_URI, "1.0", "2012-01-01")])
+]
+
+class Pairs(list):
+    """(name, fields) pairs standing in for a layers_info dictionary, which can't repeat a name"""
+
+    def items(self):
+        return self
+
+class LookupTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp(prefix="usginmodels-lookups-")
+        cls.cache = support.use_registry(MODELS, cls.directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        usginmodels.cache = cls.cache
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_first_model_wins(self):
+        models = usginmodels.get_models()
+        for uri in (MODEL_URI, OTHER_URI):
+            self.assertTrue(usginmodels.get_model(uri) is [m for m in models if m.uri == uri][0])
+            self.assertTrue(usginmodels.get_model(uri + "1.0") is usginmodels.get_model(uri))
+        self.assertEqual(usginmodels.get_model(MODEL_URI).title, "Dup")
+
+    def test_first_version_wins(self):
+        dup = usginmodels.get_model(MODEL_URI)
+        for v in dup.versions:
+            self.assertTrue(usginmodels.get_version(v.uri) is [w for w in dup.versions if w.uri == v.uri][0])
+        self.assertEqual(usginmodels.get_version(MODEL_URI + "1.0").date_created.month, 1)
+
+        # The second model is never found, so neither is its version
+        self.assertRaises(usginmodels.InvalidUri, usginmodels.get_version, MODEL_URI + "2.0")
+
+    def test_first_layer_wins(self):
+        layers_info = Pairs([("Benchmark", synthetic.synthetic_fields()), ("Benchmark", synthetic.synthetic_fields()[:3])])
+        v = ModelVersion({"uri": MODEL_URI + "9.0", "layers_info": layers_info})
+        self.assertTrue(v.layers_by_name["Benchmark"] is v.layers[0])
+
+        for v in usginmodels.get_model(MODEL_URI).versions:
+            for layer in v.layers:
+                self.assertTrue(v.layers_by_name[layer.layer_name] is [l for l in v.layers if l.layer_name == layer.layer_name][0])
+
+        self.assertEqual(usginmodels.get_layer(MODEL_URI + "1.0", "Benchmark").layer_name, "Benchmark")
+        self.assertTrue(usginmodels.get_layer(MODEL_URI + "1.1") is usginmodels.get_version(MODEL_URI + "1.1").layers[0])
+        self.assertRaises(usginmodels.InvalidLayer, usginmodels.get_layer, MODEL_URI + "1.0", "Second")
+        self.assertRaises(Exception, usginmodels.get_layer, MODEL_URI + "1.2")
+
+    def test_last_schema_name_wins(self):
+        self.assertEqual(usginmodels.get_schema_uri("Dup 1.0"), OTHER_URI + "1.0")
+        self.assertEqual(usginmodels.get_schema_uri("Dup 1.1"), MODEL_URI + "1.1")
+        self.assertEqual(usginmodels.get_schema_uri("Dup B 2.0"), MODEL_URI + "2.0")
+        self.assertRaises(KeyError, usginmodels.get_schema_uri, "Dup 9.9")
+
+    def test_latest_version(self):
+        for m in usginmodels.get_models():
+            self.assertTrue(m.latest_version() is sorted(m.versions, key=lambda v: v.date_created)[-1])
+
+        # The second 1.0 is the latest, and of versions whose dates tie the last one listed is
+        self.assertTrue(usginmodels.get_version(MODEL_URI) is usginmodels.get_model(MODEL_URI).versions[1])
+        tied = MODELS[0]["versions"][2:]
+        self.assertEqual(ContentModel(model(MODEL_URI, "Tied", tied)).latest_version().version, "1.2")
+        self.assertEqual(ContentModel(model(MODEL_URI, "Tied", tied[::-1])).latest_version().version, "1.1")
+        self.assertEqual(ContentModel(model(MODEL_URI, "Empty", [])).latest_version(), None)
+
+    def test_unknown(self):
+        self.assertRaises(usginmodels.InvalidUri, usginmodels.get_model, "http://example.org/uri-gin/nothing/")
+        self.assertRaises(usginmodels.InvalidUri, usginmodels.get_version, MODEL_URI + "9.9")
+        self.assertRaises(usginmodels.InvalidLayer, usginmodels.get_layer, MODEL_URI + "1.1", "Nothing")
+
+if __name__ == "__main__":
+    unittest.main()
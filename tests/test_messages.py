@@ -0,0 +1,93 @@
+"""
+MessageStore keeps messages in the order they were first seen, each with its rows as runs, and format_messages
+turns those into the row ranges of the report.
+"""
+from itertools import count, groupby
+import random
+import unittest
+
+import support  # puts the checkout and the benchmarks on sys.path
+from bench_messages import list_add_message
+from usginmodels.messages import format_messages, Message, MessageStore, NOTICE, WARNING, ERROR
+
+BLANK = Message(WARNING, "string_blank", "WellName")
+LATITUDE = Message(ERROR, "latitude", "LatDegree", "95")
+WHITESPACE = Message(NOTICE, "whitespace", "Notes")
+
+def list_format_messages(messages):
+    """The format_messages of the list based messages, before MessageStore"""
+    messages_formatted = []
+    for msg in messages:
+        G = (list(x) for _,x in groupby(msg[0], lambda x,c=count(): next(c)-x))
+        rows_list = ",".join("-".join(map(str,(g[0],g[-1])[:len(g)])) for g in G)
+
+        if "," in rows_list or "-" in rows_list:
+            messages_formatted.append("Rows " + rows_list + " " + msg[1])
+        else:
+            messages_formatted.append("Row " + rows_list + " " + msg[1])
+
+    return messages_formatted
+
+class MessageStoreTest(unittest.TestCase):
+
+    def store(self, added):
+        store = MessageStore()
+        for row_num, msg in added:
+            store.add(row_num, msg)
+        return store
+
+    def test_order_of_first_sighting(self):
+        store = self.store([(3, LATITUDE), (0, BLANK), (1, LATITUDE), (2, WHITESPACE)])
+        self.assertEqual([msg for msg, runs in store.items()], [LATITUDE, BLANK, WHITESPACE])
+
+    def test_rows_as_runs(self):
+        store = self.store([(0, BLANK), (1, BLANK), (2, BLANK), (6, BLANK), (7, BLANK), (9, BLANK)])
+        self.assertEqual(store.items(), [(BLANK, [[1, 3], [7, 8], [10, 10]])])
+
+    def test_once_per_row(self):
+        store = self.store([(4, LATITUDE), (4, LATITUDE), (5, LATITUDE), (5, LATITUDE)])
+        self.assertEqual(store.items(), [(LATITUDE, [[5, 6]])])
+        self.assertEqual(store.errors, 2)
+
+    def test_equal_messages_group(self):
+        store = self.store([(0, Message(ERROR, "latitude", "LatDegree", "95")), (1, LATITUDE)])
+        self.assertEqual(len(store), 1)
+
+    def test_validity(self):
+        store = self.store([(0, BLANK), (1, WHITESPACE), (2, None)])
+        self.assertTrue(store.valid)
+        self.assertEqual(store.errors, 0)
+
+        store.add(3, LATITUDE)
+        self.assertFalse(store.valid)
+        self.assertEqual(store.errors, 1)
+
+    def test_format_messages(self):
+        store = self.store([(-1, Message(WARNING, "optional_missing", "Notes")), (0, BLANK), (1, BLANK), (2, BLANK),
+                            (6, BLANK), (4, LATITUDE)])
+        lines = format_messages(store)
+        self.assertEqual(lines, [
+            "Row 0 Warning! Notes was not found in the imported file but this is not a required field so ignoring.",
+            "Rows 1-3,7 Warning! WellName: Can't be blank. Changing to Missing",
+            "Row 5 Error! LatDegree: Latitude must be between -90 and 90. Change 95"
+        ])
+        self.assertEqual([line.severity for line in lines], [WARNING, WARNING, ERROR])
+
+    def test_same_as_list_messages(self):
+        rand = random.Random(0)
+        choices = [BLANK, LATITUDE, WHITESPACE, Message(ERROR, "uri_used", "HeaderURI", "http://example.org/1/")]
+        added = []
+        for row_num in range(-1, 300):
+            for i in range(rand.randint(0, 3)):
+                added.append((row_num, rand.choice(choices)))
+
+        valid, messages = True, []
+        for row_num, msg in added:
+            valid, messages = list_add_message(row_num, valid, msg.text(), messages)
+
+        store = self.store(added)
+        self.assertEqual(format_messages(store), list_format_messages(messages))
+        self.assertEqual(store.valid, valid)
+
+if __name__ == "__main__":
+    unittest.main()
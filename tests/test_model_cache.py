@@ -0,0 +1,175 @@
+"""
+The local snapshot of contentmodels.json: reused while it is fresh, revalidated with its ETag and Last-Modified once
+it is stale, and used when the server can't be reached.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import warnings
+from StringIO import StringIO
+from urllib2 import HTTPError
+
+import support  # puts the checkout and the benchmarks on sys.path
+import synthetic
+from usginmodels import model_cache
+from usginmodels.model_cache import ModelCache
+
+URL = "http://example.org/contentmodels.json"
+
+class FakeResponse(StringIO):
+
+    def __init__(self, data, headers):
+        StringIO.__init__(self, data)
+        self.headers = headers
+
+    def info(self):
+        return self.headers
+
+class FakeServer():
+    """Stands in for urlopen, answering with the registry or 304 and recording the requests"""
+
+    def __init__(self, models, etag='"v1"', last_modified="Mon, 02 Dec 2013 00:00:00 GMT"):
+        self.models = models
+        self.etag = etag
+        self.last_modified = last_modified
+        self.down = False
+        self.requests = []
+
+    def __call__(self, request, timeout=None):
+        self.requests.append(request)
+        if self.down:
+            raise IOError("connection refused")
+        if request.get_header("If-none-match") == self.etag:
+            raise HTTPError(request.get_full_url(), 304, "Not Modified", {}, None)
+        return FakeResponse(json.dumps(self.models), {"ETag": self.etag, "Last-Modified": self.last_modified})
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="usginmodels-cache-")
+        self.server = FakeServer(synthetic.synthetic_registry(1, 2))
+        self.urlopen = model_cache.urlopen
+        model_cache.urlopen = self.server
+
+    def tearDown(self):
+        model_cache.urlopen = self.urlopen
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def cache(self, ttl=3600):
+        return ModelCache(URL, self.cache_dir, ttl)
+
+    def test_first_load_writes_snapshot(self):
+        cache = self.cache()
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual([m.title for m in cache.models], ["Benchmark 0"])
+
+        snapshot = cache.read_snapshot()
+        self.assertEqual(snapshot["etag"], '"v1"')
+        self.assertEqual(snapshot["models"], self.server.models)
+
+    def test_fresh_snapshot_is_not_revalidated(self):
+        self.cache()
+        cache = self.cache()
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(len(cache.models), 1)
+
+    def test_stale_snapshot_is_revalidated(self):
+        self.cache()
+        cache = self.cache(ttl=0)
+        self.assertEqual(len(self.server.requests), 2)
+
+        request = self.server.requests[-1]
+        self.assertEqual(request.get_header("If-none-match"), '"v1"')
+        self.assertEqual(request.get_header("If-modified-since"), self.server.last_modified)
+        self.assertEqual(len(cache.models), 1)
+
+    def test_not_modified_renews_snapshot(self):
+        self.cache()
+        cache = self.cache()
+        before = cache.read_snapshot()["fetched"]
+        time.sleep(0.01)
+
+        cache.refresh(force=True)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertTrue(cache.read_snapshot()["fetched"] > before)
+
+    def test_changed_registry_replaces_snapshot(self):
+        self.cache()
+        self.server.models = synthetic.synthetic_registry(2, 1)
+        self.server.etag = '"v2"'
+
+        cache = self.cache(ttl=0)
+        self.assertEqual(len(cache.models), 2)
+        self.assertEqual(cache.read_snapshot()["etag"], '"v2"')
+
+    def test_server_down_uses_stale_snapshot(self):
+        self.cache()
+        self.server.down = True
+        cache = self.cache(ttl=0)
+        self.assertEqual(len(cache.models), 1)
+
+    def test_server_down_without_snapshot_fails(self):
+        self.server.down = True
+        self.assertRaises(IOError, self.cache)
+
+    def test_lazy_cache_loads_on_first_use(self):
+        cache = ModelCache(URL, self.cache_dir, 3600, lazy=True)
+        self.assertEqual(self.server.requests, [])
+        cache.load()
+        cache.load()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_environment_ttl(self):
+        saved = os.environ.get("USGINMODELS_CACHE_TTL")
+        try:
+            # A bad value falls back to a day, 0 makes every snapshot stale
+            os.environ["USGINMODELS_CACHE_TTL"] = "a day"
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                ModelCache(URL, self.cache_dir)
+                ModelCache(URL, self.cache_dir)
+            self.assertEqual(len(self.server.requests), 1)
+
+            os.environ["USGINMODELS_CACHE_TTL"] = "0"
+            ModelCache(URL, self.cache_dir)
+            self.assertEqual(len(self.server.requests), 2)
+
+            # A ttl that is given wins
+            ModelCache(URL, self.cache_dir, 3600)
+            self.assertEqual(len(self.server.requests), 2)
+        finally:
+            if saved is None:
+                os.environ.pop("USGINMODELS_CACHE_TTL", None)
+            else:
+                os.environ["USGINMODELS_CACHE_TTL"] = saved
+
+class TtlTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = os.environ.get("USGINMODELS_CACHE_TTL")
+
+    def tearDown(self):
+        if self.saved is None:
+            os.environ.pop("USGINMODELS_CACHE_TTL", None)
+        else:
+            os.environ["USGINMODELS_CACHE_TTL"] = self.saved
+
+    def test_read_when_used(self):
+        os.environ["USGINMODELS_CACHE_TTL"] = "60"
+        self.assertEqual(model_cache.env_int("USGINMODELS_CACHE_TTL", 5), 60)
+        os.environ.pop("USGINMODELS_CACHE_TTL")
+        self.assertEqual(model_cache.env_int("USGINMODELS_CACHE_TTL", 5), 5)
+
+    def test_not_a_number(self):
+        os.environ["USGINMODELS_CACHE_TTL"] = "a day"
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertEqual(model_cache.env_int("USGINMODELS_CACHE_TTL", 5), 5)
+        self.assertEqual(len(caught), 1)
+        self.assertTrue("USGINMODELS_CACHE_TTL" in str(caught[0].message))
+
+if __name__ == "__main__":
+    unittest.main()
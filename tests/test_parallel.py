@@ -0,0 +1,53 @@
+"""
+Validation across processes gives the same result as validating a row at a time, whatever the chunk size, with
+duplicate URIs and changed units and coordinate systems found across chunks.
+"""
+import multiprocessing
+import unittest
+
+import support
+from usginmodels.parallel import imap_window, read_chunks
+
+def square(x):
+    return x * x
+
+class ParallelTest(support.FixtureCase):
+
+    def test_same_as_serial(self):
+        for name in sorted(self.paths):
+            expected = self.validate(name)
+            for chunk_size in (1, 7, 64, 5000):
+                self.assertSameResult(expected, self.validate(name, processes=2, chunk_size=chunk_size))
+
+    def test_columnar(self):
+        expected = self.validate("errors")
+        self.assertSameResult(expected, self.validate("errors", processes=2, chunk_size=50, columnar=True))
+
+    def test_read_chunks(self):
+        chunks = list(read_chunks(iter(range(10)), 4))
+        self.assertEqual(chunks, [(0, [0, 1, 2, 3]), (4, [4, 5, 6, 7]), (8, [8, 9])])
+        self.assertEqual(list(read_chunks(iter([]), 4)), [])
+
+    def test_window_keeps_order_and_bounds_read_ahead(self):
+        taken = []
+        def items():
+            for i in range(20):
+                taken.append(i)
+                yield i
+
+        pool = multiprocessing.Pool(2)
+        try:
+            results = []
+            for result in imap_window(pool, square, items(), 3):
+                # Only the window is taken ahead of the result handed out
+                self.assertTrue(len(taken) <= len(results) + 3)
+                results.append(result)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.assertEqual(results, [i * i for i in range(20)])
+
+if __name__ == "__main__":
+    unittest.main()
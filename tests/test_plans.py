@@ -0,0 +1,74 @@
+"""
+Compiled plans are reused for each (version uri, layer name) until the models are refreshed or clear_plans is
+called. A layer with the same key but other fields gets the plan compiled for the first one until then, which is
+why support.layer() clears the plans.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import support  # puts the checkout and the benchmarks on sys.path
+import synthetic
+from usginmodels.layer import Layer
+from usginmodels.model_cache import ModelCache
+from usginmodels.plan import get_plan, clear_plans
+
+VERSION_URI = synthetic.MODEL_URI % 0 + "1.0"
+
+class PlanTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_plans()
+
+    def tearDown(self):
+        clear_plans()
+
+    def test_reused(self):
+        layer = synthetic.synthetic_layer()
+        self.assertTrue(get_plan(layer) is get_plan(layer))
+        self.assertTrue(get_plan(synthetic.synthetic_layer()) is get_plan(layer))
+
+        other = Layer("Other", synthetic.synthetic_fields(), VERSION_URI)
+        self.assertFalse(get_plan(other) is get_plan(layer))
+
+    def test_not_reused_without_a_version(self):
+        layer = Layer("Benchmark", synthetic.synthetic_fields())
+        self.assertFalse(get_plan(layer) is get_plan(layer))
+
+    def test_refresh(self):
+        directory = tempfile.mkdtemp(prefix="usginmodels-plans-")
+        try:
+            url = synthetic.write_registry(os.path.join(directory, "contentmodels.json"))
+            cache = ModelCache(url, directory)
+            layer = cache.models[0].versions[0].layers[0]
+            plan = get_plan(layer)
+            self.assertTrue(get_plan(layer) is plan)
+
+            cache.refresh(force=True)
+            self.assertFalse(get_plan(layer) is plan)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_same_key_other_fields(self):
+        layer = synthetic.synthetic_layer()
+        plan = get_plan(layer)
+
+        # Without Notes, the field before Shape
+        fields = synthetic.synthetic_fields()
+        fewer = Layer("Benchmark", fields[:-2] + fields[-1:], VERSION_URI)
+        self.assertTrue(get_plan(fewer) is plan)
+        self.assertTrue("Notes" in get_plan(fewer).field_names)
+
+        # The stale plan reports Notes missing from a file of the new layer
+        rows = list(synthetic.synthetic_rows(10))
+        index = rows[0].index("Notes")
+        rows = [row[:index] + row[index + 1:] for row in rows]
+        self.assertTrue([msg for msg in fewer.validate_file(iter(rows))[1] if "Notes" in msg])
+
+        clear_plans()
+        self.assertEqual(get_plan(fewer).field_names, [f.field_name for f in fewer.fields[1:-1]])
+        self.assertFalse([msg for msg in fewer.validate_file(iter(rows))[1] if "Notes" in msg])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+A profiled run gives the result of an ordinary one, with a ValidationStats counting every check it timed.
+"""
+import unittest
+
+import support
+from usginmodels.profiling import CHECKS, ValidationStats
+
+class ProfilingTest(support.FixtureCase):
+
+    def test_same_as_validate_file(self):
+        for name in sorted(self.paths):
+            result = self.validate(name, profile=True)
+            stats = result[-1]
+            self.assertSameResult(self.validate(name), result[:-1])
+            self.assertTrue(isinstance(stats, ValidationStats))
+            self.assertEqual(stats.rows, len(support.read_csv(self.paths[name])) - 1)
+
+    def test_counts(self):
+        stats = self.validate("errors", profile=True)[-1]
+        rows = len(support.read_csv(self.paths["errors"])) - 1
+        header = support.read_csv(self.paths["errors"])[0]
+
+        # Each value of a field in the file goes through the encoding check once
+        encoding = [(field_name, calls) for field_name, check, calls, hits, seconds in stats.items()
+                    if check == "encoding"]
+        self.assertTrue(encoding)
+        self.assertEqual(set(calls for field_name, calls in encoding), set([rows]))
+        self.assertTrue(set(field_name for field_name, calls in encoding) <= set(header))
+
+        by_check = stats.by_check()
+        self.assertTrue(set(by_check) <= set(CHECKS))
+        self.assertTrue(all(hits <= calls for calls, hits, seconds in by_check.values()))
+        self.assertTrue(sum(hits for calls, hits, seconds in by_check.values()) > 0)
+        self.assertEqual(sum(calls for calls, hits, seconds in stats.by_field().values()),
+                         sum(calls for calls, hits, seconds in by_check.values()))
+        self.assertTrue(0 <= stats.check_seconds() <= stats.seconds)
+        self.assertTrue(stats.report(top=5)[0].startswith("%d rows" % rows))
+
+if __name__ == "__main__":
+    unittest.main()
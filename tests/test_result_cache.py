@@ -0,0 +1,128 @@
+"""
+ResultCache: a result is found again under the key of the same input, any change to the file, sheet, layer or
+reader gives a new key, and the least recently used results are evicted past max_bytes.
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import warnings
+
+import support
+from usginmodels import result_cache
+from usginmodels.result_cache import ResultCache
+
+VERSION_URI = "http://stategeothermaldata.org/uri-gin/aasg/xmlschema/benchmark0/1.0"
+
+class ResultCacheTest(support.FixtureCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="usginmodels-results-")
+        self.cache = ResultCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def copy(self, name):
+        """A copy of a fixture file that a test can change"""
+        path = os.path.join(self.cache_dir, name + ".csv")
+        shutil.copy(self.paths[name], path)
+        return path
+
+    def test_round_trip(self):
+        result = self.validate("errors")
+        key = self.cache.key(self.paths["errors"], "", VERSION_URI, "Benchmark")
+        self.assertEqual(self.cache.get(key), None)
+
+        self.cache.put(key, result)
+        cached = self.cache.get(key)
+        self.assertSameResult(result, cached)
+        self.assertEqual([msg.severity for msg in cached[1]], [msg.severity for msg in result[1]])
+
+    def test_key_changes_with_the_input(self):
+        path = self.copy("clean")
+        key = self.cache.key(path, "", VERSION_URI, "Benchmark")
+        self.assertEqual(key, self.cache.key(path, "", VERSION_URI, "Benchmark"))
+
+        self.assertNotEqual(key, self.cache.key(path, "Sheet1", VERSION_URI, "Benchmark"))
+        self.assertNotEqual(key, self.cache.key(path, "", VERSION_URI[:-1] + "1", "Benchmark"))
+        self.assertNotEqual(key, self.cache.key(path, "", VERSION_URI, "Other"))
+        self.assertNotEqual(key, self.cache.key(path, "", VERSION_URI, "Benchmark", "reader 2"))
+
+        # Another version of the validator
+        validator_version = result_cache.get_validator_version()
+        result_cache.validator_version = "changed"
+        try:
+            self.assertNotEqual(key, self.cache.key(path, "", VERSION_URI, "Benchmark"))
+        finally:
+            result_cache.validator_version = validator_version
+
+        csv_file = open(path, "ab")
+        try:
+            csv_file.write("\r\n")
+        finally:
+            csv_file.close()
+        self.assertNotEqual(key, self.cache.key(path, "", VERSION_URI, "Benchmark"))
+
+    def test_unreadable_result_is_a_miss(self):
+        key = self.cache.key(self.paths["clean"], "", VERSION_URI, "Benchmark")
+        self.cache.put(key, self.validate("clean"))
+
+        result_file = open(self.cache.result_path(key), "wb")
+        try:
+            result_file.write("not a result")
+        finally:
+            result_file.close()
+        self.assertEqual(self.cache.get(key), None)
+
+    def test_least_recently_used_are_evicted(self):
+        result = self.validate("errors")
+        keys = [self.cache.key(self.paths["errors"], "", VERSION_URI, "Benchmark", str(i)) for i in range(3)]
+        self.cache.put(keys[0], result)
+        self.cache.max_bytes = 2 * os.path.getsize(self.cache.result_path(keys[0])) + 1
+
+        self.cache.put(keys[1], result)
+        past = time.time() - 60
+        os.utime(self.cache.result_path(keys[0]), (past, past))
+        os.utime(self.cache.result_path(keys[1]), (past - 60, past - 60))
+
+        # Reading a result marks it as recently used
+        self.assertNotEqual(self.cache.get(keys[1]), None)
+
+        self.cache.put(keys[2], result)
+        self.assertEqual(self.cache.get(keys[0]), None)
+        self.assertNotEqual(self.cache.get(keys[1]), None)
+        self.assertNotEqual(self.cache.get(keys[2]), None)
+
+    def test_max_bytes_from_the_environment(self):
+        saved = os.environ.get("USGINMODELS_RESULT_CACHE_BYTES")
+        try:
+            os.environ["USGINMODELS_RESULT_CACHE_BYTES"] = "10"
+            self.assertEqual(ResultCache(self.cache_dir).get_max_bytes(), 10)
+            self.assertEqual(ResultCache(self.cache_dir, 20).get_max_bytes(), 20)
+
+            # Too small for any result, so nothing is stored
+            key = self.cache.key(self.paths["clean"], "", VERSION_URI, "Benchmark")
+            self.cache.put(key, self.validate("clean"))
+            self.assertEqual(self.cache.get(key), None)
+
+            os.environ["USGINMODELS_RESULT_CACHE_BYTES"] = "lots"
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                self.assertEqual(self.cache.get_max_bytes(), ResultCache.default_max_bytes)
+            self.assertEqual(len(caught), 1)
+        finally:
+            if saved is None:
+                os.environ.pop("USGINMODELS_RESULT_CACHE_BYTES", None)
+            else:
+                os.environ["USGINMODELS_RESULT_CACHE_BYTES"] = saved
+
+    def test_clear(self):
+        key = self.cache.key(self.paths["clean"], "", VERSION_URI, "Benchmark")
+        self.cache.put(key, self.validate("clean"))
+        self.cache.clear()
+        self.assertEqual(self.cache.get(key), None)
+
+if __name__ == "__main__":
+    unittest.main()
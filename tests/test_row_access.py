@@ -0,0 +1,35 @@
+"""
+Rows are read as lists with the header resolved to column indexes; a csv.DictReader still gives the same result
+as a csv.reader, in every validation mode, with the fields in any order.
+"""
+import csv
+import unittest
+
+import support
+
+class RowAccessTest(support.FixtureCase):
+
+    def validate_dicts(self, name, **options):
+        csv_file = open(self.paths[name], "rb")
+        try:
+            return support.layer().validate_file(csv.DictReader(csv_file), **options)
+        finally:
+            csv_file.close()
+
+    def test_dict_reader_same_as_reader(self):
+        for name in sorted(self.paths):
+            for options in [{}, dict(by_column=True), dict(processes=2, chunk_size=100)]:
+                self.assertSameResult(self.validate(name, **options), self.validate_dicts(name, **options))
+
+    def test_fields_in_any_order(self):
+        rows = support.read_csv(self.paths["errors"])
+        order = range(len(rows[0]))[::-1]
+        reordered = [[row[i] for i in order] for row in rows]
+
+        expected = support.layer().validate_file(iter(rows))
+        actual = support.layer().validate_file(iter(reordered))
+        self.assertEqual((actual[0], actual[1]), (expected[0], expected[1]))
+        self.assertEqual(repr(list(actual[2])), repr(list(expected[2])))
+
+if __name__ == "__main__":
+    unittest.main()
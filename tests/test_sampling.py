@@ -0,0 +1,108 @@
+"""
+The quick check: which rows are sampled, how a CSV file's sample is read, and that a file small enough to be
+sampled whole gets the messages and error rate of a full run, from a CSV file or a sheet.
+"""
+import os
+import unittest
+
+import support
+import synthetic
+import ExcelToCsv
+from usginmodels import sampling
+
+def message_texts(lines):
+    """The text of report lines without their rows or sample counts"""
+    return sorted(set(line.split(" ", 2)[2] if line.startswith("Row") else line.rsplit(" (", 1)[0] for line in lines))
+
+class SampleIndexesTest(unittest.TestCase):
+
+    def test_small_file_is_sampled_whole(self):
+        self.assertEqual(sampling.sample_indexes(10, 2, 2, 10), range(10))
+        self.assertEqual(sampling.sample_indexes(0), [])
+
+    def test_head_strides_and_tail(self):
+        indexes = sampling.sample_indexes(10000, 100, 50, 200)
+        self.assertEqual(len(indexes), 350)
+        self.assertEqual(indexes[:100], range(100))
+        self.assertEqual(indexes[-50:], range(9950, 10000))
+        self.assertEqual(indexes, sorted(set(indexes)))
+
+    def test_same_for_the_same_seed(self):
+        self.assertEqual(sampling.sample_indexes(10000, seed=3), sampling.sample_indexes(10000, seed=3))
+        self.assertNotEqual(sampling.sample_indexes(10000, seed=3), sampling.sample_indexes(10000, seed=4))
+
+class QuickCheckTest(support.FixtureCase):
+
+    @classmethod
+    def setUpClass(cls):
+        support.FixtureCase.setUpClass()
+        cls.large = os.path.join(cls.directory, "large.csv")
+        synthetic.write_csv(cls.large, 5000, 0.05, 0.01, 4)
+
+    def quick_check_file(self, path, **options):
+        csv_file = open(path, "rb")
+        try:
+            fieldnames, rows, estimated_rows = sampling.read_csv_sample(csv_file, **options)
+        finally:
+            csv_file.close()
+        return support.layer().quick_check(fieldnames, rows, estimated_rows)
+
+    def error_rate(self, name):
+        """The share of the rows of a fixture file with an error, from a full run"""
+        run = support.layer().iter_validate(iter(support.read_csv(self.paths[name])))
+        rows = [[msg for msg in row_messages if msg.startswith("Error!")] for row_num, rowCorrected, row_messages in run]
+        return float(len([errors for errors in rows if errors])) / len(rows)
+
+    def test_small_file_as_full_run(self):
+        for name in sorted(self.paths):
+            valid, messages = self.validate(name)[:2]
+            check = self.quick_check_file(self.paths[name])
+
+            self.assertEqual(check.sampled, len(support.read_csv(self.paths[name])) - 1)
+            self.assertEqual(check.valid, valid)
+            self.assertEqual(message_texts(check.messages), message_texts(messages))
+            self.assertAlmostEqual(check.error_rate, self.error_rate(name))
+
+    def test_csv_sample(self):
+        rows = support.read_csv(self.large)
+        csv_file = open(self.large, "rb")
+        try:
+            fieldnames, sample, estimated_rows = sampling.read_csv_sample(csv_file, 100, 50, 200)
+        finally:
+            csv_file.close()
+
+        self.assertEqual(fieldnames, rows[0])
+        self.assertEqual(sample[:100], rows[1:101])
+        self.assertEqual(sample[-50:], rows[-50:])
+        self.assertTrue(150 < len(sample) <= 350)
+        self.assertTrue(4500 < estimated_rows < 5500)
+
+        # Every sampled row is a row of the file
+        self.assertTrue(all(row in rows for row in sample[100:-50]))
+
+    def test_missing_field(self):
+        rows = support.read_csv(self.paths["clean"])
+        index = rows[0].index("WellName")
+        rows = [row[:index] + row[index + 1:] for row in rows]
+        check = support.layer().quick_check(rows[0], rows[1:])
+
+        self.assertFalse(check.valid)
+        self.assertEqual(check.header_messages, ["Error! WellName is a required field but was not found in the imported file."])
+        self.assertEqual(check.sampled, len(rows) - 1)
+
+    def test_sheet_as_csv(self):
+        for name in sorted(self.paths):
+            rows = support.read_csv(self.paths[name])
+            path = os.path.join(self.directory, name + ".xlsx")
+            support.write_xlsx(path, [("Wells", [[value.decode("utf-8") for value in row] for row in rows])])
+
+            expected = self.quick_check_file(self.paths[name])
+            check = ExcelToCsv.quick_check_excel(path, "Wells", support.layer())
+            self.assertEqual((check.valid, check.sampled, check.error_rate, check.estimated_rows),
+                             (expected.valid, expected.sampled, expected.error_rate, expected.estimated_rows))
+            self.assertEqual(check.header_messages + check.messages, expected.header_messages + expected.messages)
+
+        self.assertRaises(ExcelToCsv.SheetNotFound, ExcelToCsv.quick_check_excel, path, "Nope", support.layer())
+
+if __name__ == "__main__":
+    unittest.main()
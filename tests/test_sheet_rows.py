@@ -0,0 +1,140 @@
+"""
+Validating the typed values of a sheet gives the same result as validating the CSV text excel_to_csv writes for
+it, with numbers in double fields and dates in dateTime fields.
+"""
+import csv
+import datetime
+import os
+import unittest
+
+import support
+import xlrd
+import ExcelToCsv
+
+EXCEL_ZERO = datetime.datetime(1899, 12, 30)
+
+def sheet_value(text, field_type):
+    """The cell a value of a fixture file is typed into: a number or date where Excel would make one, or text"""
+    if field_type == "double":
+        try:
+            return float(text)
+        except ValueError:
+            pass
+    if field_type == "dateTime":
+        for date_format in ("%Y-%m-%d", "%m/%d/%Y"):
+            try:
+                date = datetime.datetime.strptime(text, date_format)
+            except ValueError:
+                continue
+            return ((date - EXCEL_ZERO).days,)
+    return text.decode("utf-8")
+
+def write_sheet(csv_path, xlsx_path):
+    """
+    Write the rows of a fixture file to a workbook: to the sheet Raw as they are and to the sheet Wells with the
+    text that fails the encoding check made ASCII, so it can be converted
+    """
+    rows = support.read_csv(csv_path)
+    field_types = dict((f.field_name, f.field_type) for f in support.layer().fields)
+    types = [field_types.get(name, "") for name in rows[0]]
+    raw = [[name.decode("utf-8") for name in rows[0]]]
+    raw.extend([sheet_value(value, field_type) for value, field_type in zip(row, types)] for row in rows[1:])
+    wells = [[value.encode("ascii", "replace").decode("ascii") if isinstance(value, unicode) else value for value in row]
+             for row in raw]
+    support.write_xlsx(xlsx_path, [("Wells", wells), ("Raw", raw)])
+
+class SheetRowsTest(support.FixtureCase):
+
+    @classmethod
+    def setUpClass(cls):
+        support.FixtureCase.setUpClass()
+        cls.sheets = {}
+        for name in cls.paths:
+            cls.sheets[name] = os.path.join(cls.directory, name + ".xlsx")
+            write_sheet(cls.paths[name], cls.sheets[name])
+
+    def validate_text(self, name, **options):
+        """Validate the CSV text of a sheet, the way ExcelToService used to"""
+        lines = ExcelToCsv.excel_to_csv(self.sheets[name], "Wells")
+        return support.layer().validate_file(csv.reader(lines), **options)
+
+    def validate_sheet(self, name, **options):
+        rows = ExcelToCsv.sheet_rows(self.sheets[name], "Wells", support.layer())
+        return support.layer().validate_file(iter(rows), **options)
+
+    def test_same_as_text(self):
+        for name in sorted(self.sheets):
+            expected = self.validate_text(name)
+            self.assertSameResult(expected, self.validate_sheet(name))
+            self.assertSameResult(expected, self.validate_sheet(name, by_column=True))
+            self.assertSameResult(expected, self.validate_sheet(name, processes=2, chunk_size=100))
+            self.assertSameResult(expected, self.validate_sheet(name, columnar=True))
+
+    def test_same_encoding_error_as_text(self):
+        for name in ("errors", "broken"):
+            try:
+                ExcelToCsv.excel_to_csv(self.sheets[name], "Raw")
+            except ExcelToCsv.CellEncodingError as err:
+                expected = (str(err), err.cells)
+            else:
+                self.fail("no CellEncodingError")
+
+            try:
+                ExcelToCsv.sheet_rows(self.sheets[name], "Raw", support.layer())
+            except ExcelToCsv.CellEncodingError as err:
+                self.assertEqual((str(err), err.cells), expected)
+            else:
+                self.fail("no CellEncodingError")
+
+    def test_typed_values(self):
+        rows = ExcelToCsv.sheet_rows(self.sheets["clean"], "Wells", support.layer())
+        header = rows[0]
+        row = dict(zip(header, rows[1]))
+        self.assertTrue(isinstance(row["Depth"], float))
+        self.assertTrue(isinstance(row["EndDate"], datetime.datetime))
+        self.assertTrue(isinstance(row["WellName"], str))
+        self.assertTrue(all(len(row) == len(header) for row in rows))
+
+    def test_unknown_sheet(self):
+        self.assertRaises(ExcelToCsv.SheetNotFound, ExcelToCsv.sheet_rows, self.sheets["clean"], "Nope", support.layer())
+
+    def test_streamed_as_loaded(self):
+        # iter_sheet_rows reads the sheet as it goes, the rows of a loaded sheet must come out the same
+        book = xlrd.open_workbook(self.sheets["errors"])
+        loaded = list(ExcelToCsv.typed_rows(book, book.sheet_by_name("Wells").rows_types_values(), support.layer()))
+        streamed = ExcelToCsv.sheet_rows(self.sheets["errors"], "Wells", support.layer())
+        self.assertEqual(repr(streamed), repr(loaded))
+
+    def test_date_blocks(self):
+        expected = ExcelToCsv.sheet_rows(self.sheets["errors"], "Wells", support.layer())
+        date_block = ExcelToCsv.DATE_BLOCK
+        try:
+            for block in (1, 7, 10 ** 6):
+                ExcelToCsv.DATE_BLOCK = block
+                rows = ExcelToCsv.sheet_rows(self.sheets["errors"], "Wells", support.layer())
+                self.assertEqual(repr(rows), repr(expected))
+        finally:
+            ExcelToCsv.DATE_BLOCK = date_block
+
+    def test_streamed_validation(self):
+        layer = support.layer()
+        expected = self.validate_sheet("errors")
+        run = layer.iter_validate(ExcelToCsv.iter_sheet_rows(self.sheets["errors"], "Wells", layer))
+        rows = [rowCorrected for row_num, rowCorrected, messages in run]
+        self.assertEqual(repr(rows), repr(expected[2][1:]))
+        self.assertEqual(run.summary.messages, expected[1])
+
+    def test_encoding_error_after_the_good_rows(self):
+        rows = ExcelToCsv.iter_sheet_rows(self.sheets["errors"], "Raw", support.layer())
+        read = []
+        try:
+            for row in rows:
+                read.append(row)
+        except ExcelToCsv.CellEncodingError as err:
+            # The rows stop before the first one with a cell that failed
+            self.assertTrue(len(read) < err.row)
+        else:
+            self.fail("no CellEncodingError")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+The URI registry: a valid file registers its primary URIs, a file from another source that reuses them gets an
+error on each of those rows in every validation mode, and an invalid file registers nothing.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+from usginmodels.uri_registry import UriRegistry
+
+MODEL_URI = "http://example.org/uri-gin/model/"
+
+class UriRegistryTest(support.FixtureCase):
+
+    def setUp(self):
+        self.registry_directory = tempfile.mkdtemp(prefix="usginmodels-registry-")
+        self.registry = UriRegistry(os.path.join(self.registry_directory, "uris.sqlite"))
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.registry_directory, ignore_errors=True)
+
+    def test_find_and_register(self):
+        registry = self.registry
+        registry.register(MODEL_URI, "Wells", ["a/1", "a/2", "a/2"], "first.xlsx")
+        self.assertEqual(registry.find_collisions(MODEL_URI, "Wells", ["a/2", "a/3"], "second.xlsx"), {"a/2": "first.xlsx"})
+        self.assertEqual(registry.find_collisions(MODEL_URI, "Wells", ["a/2"], "first.xlsx"), {})
+        self.assertEqual(registry.find_collisions(MODEL_URI, "Other", ["a/2"], "second.xlsx"), {})
+
+        # A source submitting again replaces what it submitted before
+        registry.register(MODEL_URI, "Wells", ["a/3"], "first.xlsx")
+        self.assertEqual(registry.find_collisions(MODEL_URI, "Wells", ["a/1", "a/2", "a/3"], "second.xlsx"),
+                         {"a/3": "first.xlsx"})
+
+        registry.forget(MODEL_URI, "Wells", "first.xlsx")
+        self.assertEqual(registry.find_collisions(MODEL_URI, "Wells", ["a/3"], "second.xlsx"), {})
+
+    def test_reused_in_another_file(self):
+        first = self.validate("clean", uri_registry=self.registry, source="first.csv")
+        self.assertTrue(first[0])
+        self.assertSameResult(first, self.validate("clean", uri_registry=self.registry, source="first.csv"))
+
+        expected = self.validate("clean", uri_registry=self.registry, source="second.csv")
+        self.assertFalse(expected[0])
+        self.assertTrue([line for line in expected[1] if "already been used in first.csv" in line])
+
+        for options in [dict(by_column=True), dict(processes=2, chunk_size=100), dict(columnar=True)]:
+            actual = self.validate("clean", uri_registry=self.registry, source="second.csv", **options)
+            self.assertSameResult(expected, actual)
+
+    def test_invalid_file_not_registered(self):
+        self.assertFalse(self.validate("broken", uri_registry=self.registry, source="broken.csv")[0])
+        self.assertEqual(self.registry.connection.execute("SELECT COUNT(*) FROM uris").fetchone()[0], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+ValidationRun streams the corrected rows with the messages of each row and ends with the same summary as
+Layer.validate_file.
+"""
+import csv
+import unittest
+
+import support
+
+def without_field(rows, name):
+    """The rows with a field left out"""
+    index = rows[0].index(name)
+    return [row[:index] + row[index + 1:] for row in rows]
+
+class ValidationRunTest(support.FixtureCase):
+
+    def run_rows(self, rows):
+        """Iterate a run over rows, returning it and what it yielded"""
+        run = support.layer().iter_validate(iter(rows))
+        return run, list(run)
+
+    def test_same_as_validate_file(self):
+        for name in sorted(self.paths):
+            rows = support.read_csv(self.paths[name])
+            valid, messages, dataCorrected, long_fields, srs = support.layer().validate_file(iter(rows))
+            run, yielded = self.run_rows(rows)
+
+            self.assertEqual([row_num for row_num, rowCorrected, row_messages in yielded], range(1, len(rows)))
+            self.assertEqual(repr([rowCorrected for row_num, rowCorrected, row_messages in yielded]),
+                             repr(list(dataCorrected[1:])))
+            self.assertEqual(run.header, dataCorrected[0])
+
+            summary = run.summary
+            self.assertEqual((summary.valid, summary.messages, summary.long_fields, summary.srs, summary.rows),
+                             (valid, messages, long_fields, srs, len(rows) - 1))
+
+    def test_row_messages(self):
+        rows = support.read_csv(self.paths["errors"])
+        run, yielded = self.run_rows(rows)
+
+        # Each message of the summary is found in the rows it lists
+        for line in run.summary.messages:
+            text = line.split(" ", 2)[2]
+            found = [row_num for row_num, rowCorrected, row_messages in yielded if text in row_messages]
+            self.assertTrue(found, text)
+
+    def test_header_messages_once(self):
+        rows = without_field(support.read_csv(self.paths["clean"]), "Notes")
+        run, yielded = self.run_rows(rows)
+
+        missing = [row_num for row_num, rowCorrected, row_messages in yielded
+                   if [msg for msg in row_messages if "Notes was not found" in msg]]
+        self.assertEqual(missing, [1])
+        self.assertEqual(len(run.summary.messages), 1)
+
+    def test_required_field_missing(self):
+        rows = without_field(support.read_csv(self.paths["clean"]), "WellName")
+        run, yielded = self.run_rows(rows)
+        self.assertEqual(yielded, [])
+        self.assertTrue(run.summary.stopped)
+        self.assertFalse(run.summary.valid)
+
+    def test_reads_as_it_goes(self):
+        csv_file = open(self.paths["clean"], "rb")
+        try:
+            reader = csv.reader(csv_file)
+            run = iter(support.layer().iter_validate(reader))
+            next(run)
+            self.assertEqual(reader.line_num, 2)
+        finally:
+            csv_file.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Converting many Excel dates at once gives what converting them one at a time with xldate_as_tuple gives, and
+fails the same way, with NumPy and without it.
+"""
+import datetime
+import random
+import sys
+import unittest
+
+import support  # puts the checkout and the benchmarks on sys.path
+import xlrd
+import ExcelToCsv
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def one_at_a_time(xldates, datemode):
+    return [datetime.datetime(*xlrd.xldate_as_tuple(xldate, datemode)) for xldate in xldates]
+
+def error_class(convert, *args):
+    try:
+        convert(*args)
+    except Exception as err:
+        return err.__class__
+    return None
+
+def dates(datemode, n=2000, seed=0):
+    """Excel dates from the first valid day to the last, with times including those that round to midnight"""
+    rand = random.Random(seed)
+    first = (61, 1)[datemode]
+    last = (2958466, 2957004)[datemode] - 1
+    values = [float(first), last + 0.999994, 61.5, 40000.0, 40000 + 0.5 / 86400, 40000 + 1.5 / 86400,
+              40000 + 86399.5 / 86400, 40000.999999]
+    values.extend(rand.uniform(first, last) for i in range(n))
+    values.extend(rand.randint(first, last) + rand.randint(0, 86400) / 86400.0 for i in range(n))
+    return values
+
+def boundaries(datemode):
+    """Numbers on and either side of where xldate_as_tuple starts or stops taking them, and a second either side"""
+    values = []
+    for edge in (0.0, 1.0, 60.0, 61.0, (2958466, 2957004)[datemode] - 1.0, (2958466, 2957004)[datemode]):
+        for offset in (0.0, 1e-12, 0.49 / 86400, 0.5 / 86400, 0.51 / 86400, 1.0 / 86400):
+            values.extend([edge + offset, edge - offset])
+    return values + [float("nan"), float("inf")]
+
+class XldateTest(unittest.TestCase):
+
+    def check_dates(self):
+        for datemode in (0, 1):
+            values = dates(datemode)
+            expected = one_at_a_time(values, datemode)
+            self.assertEqual(xlrd.xldates_as_datetime(values, datemode), expected)
+            self.assertEqual(xlrd.xldates_as_iso(values, datemode), [date.isoformat() for date in expected])
+
+        self.assertEqual(xlrd.xldates_as_datetime([], 0), [])
+        self.assertEqual(xlrd.xldates_as_iso([], 0), [])
+
+    def check_errors(self):
+        for datemode, xldate in [(0, 30.0), (0, 60.5), (0, -1.0), (1, -1.0), (0, 0.5), (0, 2958466.0),
+                                 (1, 2957004.0), (2, 40000.0)]:
+            expected = error_class(xlrd.xldate_as_tuple, xldate, datemode) or error_class(one_at_a_time, [xldate], datemode)
+            self.assertNotEqual(expected, None)
+            for convert in (xlrd.xldates_as_datetime, xlrd.xldates_as_iso):
+                self.assertEqual(error_class(convert, [40000.0, xldate], datemode), expected, (datemode, xldate))
+
+    def check_boundaries(self):
+        for datemode in (0, 1):
+            for xldate in boundaries(datemode):
+                expected = error_class(one_at_a_time, [xldate], datemode)
+                for convert in (xlrd.xldates_as_datetime, xlrd.xldates_as_iso):
+                    self.assertEqual(error_class(convert, [40000.0, xldate], datemode), expected, (datemode, repr(xldate)))
+                if expected is None:
+                    self.assertEqual(xlrd.xldates_as_datetime([xldate], datemode), one_at_a_time([xldate], datemode))
+
+    @unittest.skipIf(numpy is None, "NumPy isn't installed")
+    def test_with_numpy(self):
+        self.check_dates()
+        self.check_errors()
+        self.check_boundaries()
+
+    def test_without_numpy(self):
+        saved = sys.modules.get("numpy")
+        sys.modules["numpy"] = None
+        try:
+            self.check_dates()
+            self.check_errors()
+            self.check_boundaries()
+        finally:
+            if saved is None:
+                del sys.modules["numpy"]
+            else:
+                sys.modules["numpy"] = saved
+
+    def test_cells_datetime(self):
+        # Dates before March 1900 aren't converted by xlrd
+        values = [1.0, 30.25, 60.0, 60.999988, 61.0, 40000.5, 2.5, 45000.75]
+        self.assertEqual(ExcelToCsv.cells_datetime(values, 0), [ExcelToCsv.cell_datetime(value, 0) for value in values])
+        self.assertEqual(ExcelToCsv.dates_text(values, 0),
+                         [ExcelToCsv.cell_datetime(value, 0).isoformat() for value in values])
+
+if __name__ == "__main__":
+    unittest.main()
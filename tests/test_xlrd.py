@@ -0,0 +1,78 @@
+"""
+The bulk accessors of xlrd's Sheet give what the row and column accessors give, and excel_to_csv, which reads a
+sheet through them, writes the same lines as converting it a cell at a time.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+import xlrd
+import ExcelToCsv
+
+ROWS = [
+    [u"HeaderURI", u"WellName", u"Depth", u"Flowing", u"DrillDate", u"Notes"],
+    [u"http://resources.usgin.org/uri-gin/az/well/1/", u"Well \"1\"", 100, True, (40000.5,), u"Cafe"],
+    [u"http://resources.usgin.org/uri-gin/az/well/2/", u"Well 2", 12.25, False, (30.0,), None],
+    [u"http://resources.usgin.org/uri-gin/az/well/3/", None, -3, None, (60.999988,), u"  spaced  "],
+    [u"http://resources.usgin.org/uri-gin/az/well/4/", u"Well 4", 1e20, True, (2958465.0,)],
+    [],
+    [u"http://resources.usgin.org/uri-gin/az/well/6/", u"Well 6", 0.1, False, (61.0,), u"last"]
+]
+
+class XlrdTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="usginmodels-xlrd-")
+        self.path = os.path.join(self.directory, "wells.xlsx")
+        support.write_xlsx(self.path, [("Wells", ROWS), ("Bad", [[u"Name"], [u"ok"], [u"\u0100"], [u"ok"], [u"Caf\xe9"]])])
+        self.book = xlrd.open_workbook(self.path)
+        self.sheet = self.book.sheet_by_name("Wells")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_rows_types_values(self):
+        sheet = self.sheet
+        expected = [(list(sheet.row_types(rowx)), sheet.row_values(rowx)) for rowx in range(sheet.nrows)]
+        rows = [(list(types), values) for types, values in sheet.rows_types_values()]
+        self.assertEqual(rows, expected)
+
+        rows = [(list(types), values) for types, values in sheet.rows_types_values(2, 4)]
+        self.assertEqual(rows, expected[2:4])
+        self.assertEqual(len(list(sheet.rows_types_values(3, 100))), sheet.nrows - 3)
+
+    def test_cols_types_values(self):
+        sheet = self.sheet
+        expected = [(sheet.col_types(colx), sheet.col_values(colx)) for colx in range(sheet.ncols)]
+        columns = [(list(types), values) for types, values in sheet.cols_types_values()]
+        self.assertEqual(columns, expected)
+
+        columns = [(list(types), values) for types, values in sheet.cols_types_values(1, 3)]
+        self.assertEqual(columns, expected[1:3])
+
+    def test_excel_to_csv_same_as_cell_at_a_time(self):
+        sheet = self.sheet
+        expected = []
+        for rowx in range(sheet.nrows):
+            cells = ["\"" + ExcelToCsv.cell_text(cell, self.book.datemode).replace("\"", "\"\"") + "\""
+                     for cell in sheet.row(rowx)]
+            expected.append(",".join(cells))
+
+        self.assertEqual(ExcelToCsv.excel_to_csv(self.path, "Wells"), expected)
+
+    def test_excel_to_csv_reports_every_bad_cell(self):
+        try:
+            ExcelToCsv.excel_to_csv(self.path, "Bad")
+        except ExcelToCsv.CellEncodingError as err:
+            self.assertEqual((err.row, err.column), (3, 1))
+            self.assertEqual(err.cells, [(3, 1), (5, 1)])
+        else:
+            self.fail("no CellEncodingError")
+
+    def test_excel_to_csv_unknown_sheet(self):
+        self.assertRaises(ExcelToCsv.SheetNotFound, ExcelToCsv.excel_to_csv, self.path, "Nope")
+
+if __name__ == "__main__":
+    unittest.main()
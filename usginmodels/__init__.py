@@ -4,20 +4,25 @@ Here we get to define a public API people can use when they `import usginmodels`
 import re
 import csv
 import data
+import sampling
 from exceptions import *
 from exceptions import InvalidUri, InvalidLayer
+from messages import NOTICE, WARNING, ERROR
 from model_cache import ModelCache
+from uri_registry import UriRegistry
+from result_cache import ResultCache
+from incremental import RowStore
 
-cache = ModelCache()
-cache.refresh()
+# Nothing is fetched until the models are first needed, so importing the package is cheap
+cache = ModelCache(lazy=True)
 
 def refresh():
     """Check http://schemas.usgin.org/contentmodels.json for the most up-to-date description of available content models"""
-    cache.refresh()
+    cache.refresh(force=True)
 
 def get_models():
     """Return a List of ContentModel objects"""
-    return cache.models
+    return cache.load().models
 
 def get_uris(uri):
     """Given a URI return the uri of the Model and the uri of the Version, if known"""
@@ -45,16 +50,15 @@ def get_uris(uri):
 def get_model(uri):
     """Given a URI return the Model object"""
 
-    # Find the Models in the cache whose uri matches the given model uri
+    # Find the Model in the cache whose uri matches the given model uri
     model_uri, version_uri = get_uris(uri)
-    model_matches = [m for m in cache.models if m.uri == model_uri]
+    model = cache.load().models_by_uri.get(model_uri)
 
     # If there are no matches, raise an exception
-    if len(model_matches) == 0:
+    if model is None:
         raise InvalidUri(uri)
 
-    # If there is more than one model, we'll just take the first one
-    return model_matches[0]
+    return model
 
 def get_version(uri):
     """Given a URI return the Version object"""
@@ -67,14 +71,12 @@ def get_version(uri):
     if version_uri == "":
         version = model.latest_version()
     else:
-        version_matches = [v for v in model.versions if v.uri == version_uri]
+        version = model.versions_by_uri.get(version_uri)
 
         # If there are no matches, raise an exception
-        if len(version_matches) == 0:
+        if version is None:
             raise InvalidUri(version_uri)
 
-        version = version_matches[0]
-
     return version
 
 def get_layer(uri, layer_name = ""):
@@ -92,22 +94,70 @@ def get_layer(uri, layer_name = ""):
         else:
             raise Exception("Multilayer Model: Specify a layer.")
     else:
-        layer_matches = [l for l in version.layers if l.layer_name == layer_name]
+        layer = version.layers_by_name.get(layer_name)
 
         # If there are no matches, raise an exception
-        if len(layer_matches) == 0:
+        if layer is None:
             raise InvalidLayer(layer_name)
 
-        # If there is more than one layer, we'll just take the first one
-        layer = layer_matches[0]
-
     return layer
 
-def validate_file(csv_file, uri, layer_name = ""):
-    """Return boolean and validation errors"""
+def get_schema_uri(schema_name):
+    """Given the name of a schema as "Title version" return the uri of the Version"""
+    return cache.load().schema_uris[schema_name]
+
+def validate_file(csv_file, uri, layer_name = "", uri_registry = None, source = None, **options):
+    """
+    Return boolean and validation errors. Pass a UriRegistry to also check the primary URIs against earlier
+    submissions, source (default the file name) identifies this submission in the registry. The other options
+    go to Layer.validate_file: processes and chunk_size to split the rows across a process pool, by_column to
+    validate a column at a time, max_errors, max_messages or fail_fast to stop early on a bad file, and
+    row_store, a RowStore, to only check the rows that changed since the last run of source.
+    """
+    layer = get_layer(uri, layer_name)
+    csv_text = csv.reader(csv_file)
+    if source is None:
+        source = getattr(csv_file, "name", "")
+    return layer.validate_file(csv_text, uri_registry, source, **options)
+
+def validate_rows(rows, uri, layer_name = "", uri_registry = None, source = "", **options):
+    """
+    validate_file for rows that are already split into lists of values, the field names first, such as the rows
+    of a spreadsheet. Values are text, or floats for double fields and datetimes for dateTime fields, which skip
+    the text checks. Takes the same options as validate_file.
+    """
+    layer = get_layer(uri, layer_name)
+    return layer.validate_file(iter(rows), uri_registry, source, **options)
+
+def iter_validate_file(csv_file, uri, layer_name = "", uri_registry = None, source = None, **options):
+    """
+    Validate as a stream. Returns a ValidationRun: iterating it yields (row number, corrected row, messages for
+    the row) as the file is read, and its summary has valid, messages, srs and long_fields once it is exhausted.
+    max_errors, max_messages and fail_fast work as in validate_file.
+    """
+    layer = get_layer(uri, layer_name)
+    csv_text = csv.reader(csv_file)
+    if source is None:
+        source = getattr(csv_file, "name", "")
+    return layer.iter_validate(csv_text, uri_registry, source, **options)
+
+def iter_validate_rows(rows, uri, layer_name = "", uri_registry = None, source = "", **options):
+    """
+    iter_validate_file for rows of values, as validate_rows takes them. With rows that are read as they are asked
+    for, such as those of ExcelToCsv.iter_sheet_rows, memory doesn't grow with the size of the file.
+    """
+    layer = get_layer(uri, layer_name)
+    return layer.iter_validate(iter(rows), uri_registry, source, **options)
+
+def quick_check_file(csv_file, uri, layer_name = "", head = sampling.HEAD, tail = sampling.TAIL, samples = sampling.SAMPLES, seed = 0):
+    """
+    Check the header and a sample of rows of a csv file: the first head rows, the last tail rows and samples
+    rows at a random stride in between, the same rows for the same seed. Returns a QuickCheck with the
+    messages and the estimated error rate of the file.
+    """
     layer = get_layer(uri, layer_name)
-    csv_text = csv.DictReader(csv_file)
-    return layer.validate_file(csv_text)
+    fieldnames, rows, estimated_rows = sampling.read_csv_sample(csv_file, head, tail, samples, seed)
+    return layer.quick_check(fieldnames, rows, estimated_rows)
 
 def get_service_name(version_uri):
     this_data = data.get_service_names()
@@ -0,0 +1,209 @@
+"""
+Validation a column at a time. Double fields are checked over the whole column with NumPy: conversion to float,
+the -9999 substitution for blanks and check_domain's range checks. The other fields go through the same per value
+checks as the row path. Each column's messages are tagged with their row and put back in row order before they
+are stored, with the checks that depend on earlier rows settled as they are for parallel chunks, so the result is
+the same as validating row by row.
+
+Only the double fields are faster than on the row path, several times over, so a layer that is mostly doubles
+validates about twice as fast and one that is mostly text and dates takes about as long as it does row by row.
+"""
+from operator import itemgetter
+
+from columnar import corrected_data
+from encoding import plain_text
+from messages import format_messages, Message, NOTICE
+from plan import get_plan, read_rows, ValidationState, ChunkState
+
+# The ranges check_domain allows for each field. Values outside them are passed to check_domain, which has the
+# final say, so these only need to include every value it accepts.
+DOMAIN_RANGES = {
+    "LatDegree": (-90, 90),
+    "LatDegreeWGS84": (-90, 90),
+    "LongDegree": (-180, 180),
+    "LongDegreeWGS84": (-180, 180),
+    "MaximumRecordedTemperature": (0, 999),
+    "MeasuredTemperature": (0, 999),
+    "CorrectedTemperature": (0, 999),
+    "Temperature": (0, 999)
+}
+
+# The values of a column whose encoding is checked together, so a few values that fail don't slow down the rest
+ENCODING_BLOCK = 256
+
+# NumPy is imported the first time a column is checked, so importing usginmodels doesn't load it. False until then
+# and None if it isn't installed.
+numpy = False
+
+def import_numpy():
+    """Return NumPy, or None if it isn't installed, importing it the first time"""
+    global numpy
+    if numpy is False:
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        numpy = module
+    return numpy
+
+class ColumnState(ChunkState):
+    """A ChunkState whose events also record which field they came from"""
+
+    field_index = 0
+
+    def add_event(self, row_num, msg):
+        if msg:
+            self.events.append((row_num, self.field_index, row_num, msg))
+
+    def add_row_event(self, row, row_num, msg):
+        """An event for the given row whose message is numbered row_num"""
+        self.events.append((row, self.field_index, row_num, msg))
+
+def is_plain_text(value):
+    """Whether the value is a str the encoding check will pass, and that a fixed width NumPy string keeps as it is"""
+    if type(value) is not str or "\0" in value:
+        return False
+    try:
+        value.decode("ascii")
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def check_column(f, values, state):
+    """Run the checks for one field over a column of values, returning the corrected values"""
+    if f.field.field_type == "double" and not (f.is_uri or f.is_temp_units or f.is_srs) and import_numpy() is not None:
+        return check_double_column(f, values, state)
+
+    # A block of plain text passes the encoding check as a whole, otherwise each value of the block is checked
+    check = f.check
+    corrected = []
+    for start in xrange(0, len(values), ENCODING_BLOCK):
+        block = values[start:start + ENCODING_BLOCK]
+        encoded = plain_text(block)
+        corrected.extend([check(value, i, state, encoded) for i, value in enumerate(block, start)])
+    return corrected
+
+def check_double_column(f, values, state):
+    """The checks for a double field, with NumPy doing the work for the values that are plain text"""
+    # Anything that isn't plain text goes through the per value checks
+    try:
+        joined = "".join(values)
+        plain = type(joined) is str and "\0" not in joined
+        if plain:
+            joined.decode("ascii")
+    except (TypeError, UnicodeDecodeError):
+        plain = False
+    if plain:
+        rows = numpy.arange(len(values))
+        corrected = None
+    else:
+        rows = numpy.array([i for i, value in enumerate(values) if is_plain_text(value)], dtype=int)
+        corrected = list(values)
+        for i, value in enumerate(values):
+            if not is_plain_text(value):
+                corrected[i] = f.check(value, i, state)
+        values = [values[i] for i in rows]
+
+    if len(rows) == 0:
+        return corrected or []
+    state.long_fields.setdefault(f.field_name, False)
+
+    # Fix minor formatting issues, whitespace and nil:missing, on an array of fixed width strings
+    raw = numpy.array(values, dtype=str)
+    data = numpy.char.strip(raw)
+    nil = data == "nil:missing"
+    for i in rows[nil]:
+        state.add_row_event(i, i, Message(NOTICE, "nil_missing", f.field_name))
+    for i in rows[(raw != data) & ~nil]:
+        state.add_row_event(i, i, Message(NOTICE, "whitespace", f.field_name))
+
+    # Convert everything that isn't blank to float in one go. If something won't convert find out what.
+    converted = (data != "") & ~nil
+    candidates = numpy.flatnonzero(converted)
+    try:
+        floats = data[candidates].astype(numpy.float64)
+    except ValueError:
+        floats = numpy.zeros(len(candidates))
+        for j, value in enumerate(data[candidates].tolist()):
+            try:
+                floats[j] = float(value)
+            except:
+                converted[candidates[j]] = False
+        floats = floats[converted[candidates]]
+    result = numpy.zeros(len(data))
+    result[converted] = floats
+    result = result.tolist()
+
+    # Blanks and values that aren't numbers get the row path's type check for their message and replacement
+    for j in numpy.flatnonzero(~converted):
+        msg, result[j] = f.convert("Missing" if nil[j] else str(data[j]))
+        if msg:
+            state.add_row_event(rows[j], rows[j], msg)
+
+    # Range checks, only passing check_domain the values that might fail
+    if f.is_domain:
+        check_domain = f.field.check_domain
+        limits = DOMAIN_RANGES.get(f.field_name)
+        if limits is None:
+            suspects = numpy.arange(len(data))
+        else:
+            low, high = limits
+            outside = numpy.ones(len(data), dtype=bool)
+            # NaN is outside every range
+            with numpy.errstate(invalid="ignore"):
+                outside[converted] = ~((floats >= low) & (floats <= high))
+            suspects = numpy.flatnonzero(outside)
+        for j in suspects:
+            msg, result[j] = check_domain(result[j])
+            if msg:
+                state.add_row_event(rows[j], rows[j], msg)
+
+    if corrected is None:
+        return result
+
+    for j, i in enumerate(rows):
+        corrected[i] = result[j]
+
+    return corrected
+
+def validate_columns(layer, csv_text, uri_registry=None, source="", columnar=False):
+    """Layer.validate_file a column at a time"""
+    plan = get_plan(layer)
+
+    fieldnames, rows = read_rows(csv_text)
+    columns = plan.bind(fieldnames)
+    state = ValidationState(track_uris=uri_registry is not None)
+
+    # If a required field is missing no rows are validated
+    if not plan.check_header(columns, state):
+        return False, format_messages(state.messages), [], {}, ""
+
+    rows = list(rows)
+    column_state = ColumnState()
+    corrected_columns = []
+
+    for f, index in columns:
+        column_state.field_index = f.index
+        if index is None:
+            values = [""] * len(rows)
+            if rows:
+                column_state.add_row_event(0, -1, f.missing_message())
+        else:
+            values = [row[index] for row in rows]
+        corrected_columns.append(check_column(f, values, column_state))
+    del rows
+
+    # Back into the order the row path would have found the messages in. The sort is stable so a value's
+    # messages stay in the order of its checks.
+    events = column_state.events
+    events.sort(key=itemgetter(0, 1))
+
+    state.merge(plan, [(row_num, msg) for row, field_index, row_num, msg in events], column_state.long_fields)
+
+    if uri_registry is not None:
+        layer.check_uri_registry(plan, state, uri_registry, source)
+
+    dataCorrected = corrected_data(plan, columnar)
+    dataCorrected.extend(list(row) for row in zip(*corrected_columns))
+
+    return state.messages.valid, format_messages(state.messages), dataCorrected, state.long_fields, state.srs
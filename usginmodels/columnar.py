@@ -0,0 +1,310 @@
+"""
+Corrected data stored a column at a time. Doubles go in an array of C doubles with a byte per value saying whether
+it is a float, a blank or the int -9999, dateTimes in an array of seconds since 1970, and repeated strings share one
+object. A row of the list based dataCorrected costs a list plus a boxed object per value, which for a large sheet is
+most of the memory validation uses.
+
+ColumnarData behaves like the list it replaces: item 0 is the header, the other items and slices are rows, so
+writers such as InsertData(table, dataCorrected[1:], fields) work unchanged.
+"""
+from array import array
+from datetime import date, datetime
+from itertools import izip
+
+# Kinds of value in a DoubleColumn or DateColumn
+VALUE = 0
+BLANK = 1
+INT = 2
+OTHER = 3
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def corrected_data(plan, columnar=False):
+    """An empty dataCorrected for the plan: a list holding the header row, or ColumnarData"""
+    if columnar:
+        return ColumnarData(plan)
+    return [list(plan.field_names)]
+
+class DoubleColumn():
+    """The values of a double field: floats, blanks and -9999"""
+
+    def __init__(self):
+        self.values = array("d")
+        self.kinds = bytearray()
+
+        # Anything else, such as a value that failed the encoding check, by row
+        self.other = {}
+
+    def extend(self, values):
+        types = set(map(type, values))
+        if types == set([float]):
+            self.values.extend(values)
+            self.kinds.extend(bytearray(len(values)))
+            return
+
+        for value in values:
+            if type(value) is float:
+                self.values.append(value)
+                self.kinds.append(VALUE)
+            elif type(value) is int:
+                self.values.append(value)
+                self.kinds.append(INT)
+            elif value == "" and type(value) is str:
+                self.values.append(0.0)
+                self.kinds.append(BLANK)
+            else:
+                self.other[len(self.kinds)] = value
+                self.values.append(0.0)
+                self.kinds.append(OTHER)
+
+    def get(self, i, kind=None, value=None):
+        if kind is None:
+            kind = self.kinds[i]
+            value = self.values[i]
+        if kind == VALUE:
+            return value
+        elif kind == INT:
+            return int(value)
+        elif kind == BLANK:
+            return ""
+        return self.other[i]
+
+    def block(self, start, stop):
+        """The values from start to stop as a list"""
+        values = self.values[start:stop].tolist()
+        kinds = self.kinds[start:stop]
+        if kinds.count(chr(VALUE)) != len(kinds):
+            for j, kind in enumerate(kinds):
+                if kind != VALUE:
+                    values[j] = self.get(start + j, kind, values[j])
+        return values
+
+class DateColumn():
+    """The values of a dateTime field: ISO dates without fractions of a second are kept as seconds since 1970"""
+
+    def __init__(self):
+        self.values = array("d")
+        self.kinds = bytearray()
+        self.other = {}
+
+    def extend(self, values):
+        for value in values:
+            seconds = to_seconds(value)
+            if seconds is not None:
+                self.values.append(seconds)
+                self.kinds.append(VALUE)
+            elif value == "" and type(value) is str:
+                self.values.append(0.0)
+                self.kinds.append(BLANK)
+            else:
+                self.other[len(self.kinds)] = value
+                self.values.append(0.0)
+                self.kinds.append(OTHER)
+
+    def get(self, i, kind=None, value=None):
+        if kind is None:
+            kind = self.kinds[i]
+            value = self.values[i]
+        if kind == VALUE:
+            return to_iso(value)
+        elif kind == BLANK:
+            return ""
+        return self.other[i]
+
+    def get_datetime(self, i):
+        """The value as a datetime, or None if it isn't a date"""
+        if self.kinds[i] != VALUE:
+            return None
+        days, seconds = divmod(int(self.values[i]), 86400)
+        hour, seconds = divmod(seconds, 3600)
+        minute, second = divmod(seconds, 60)
+        day = date.fromordinal(days + EPOCH_ORDINAL)
+        return datetime(day.year, day.month, day.day, hour, minute, second)
+
+    def block(self, start, stop):
+        get = self.get
+        return [get(i, kind, value) for i, kind, value in
+                izip(xrange(start, stop), self.kinds[start:stop], self.values[start:stop])]
+
+class StringColumn():
+    """The values of a string field, or of a field of unknown type. Equal strings share one object."""
+
+    # Strings seen recently, so repeated values are stored once. Cleared when full so unique values don't pile up.
+    cache_size = 4096
+
+    def __init__(self):
+        self.values = []
+        self.seen = {}
+
+    def extend(self, values):
+        if len(self.seen) >= self.cache_size:
+            self.seen.clear()
+        share = self.seen.setdefault
+        self.values.extend([share(value, value) if type(value) is str else value for value in values])
+
+    def get(self, i):
+        return self.values[i]
+
+    def block(self, start, stop):
+        return self.values[start:stop]
+
+# The days since 1970 of recent dates and the text of recent days, so dates that repeat are converted once
+days_cache = {}
+day_text_cache = {}
+
+def to_seconds(value):
+    """Seconds since 1970 for an ISO date of the form YYYY-MM-DDTHH:MM:SS, otherwise None"""
+    if type(value) is not str or len(value) != 19 or value[10] != "T" or value[13] != ":" or value[16] != ":":
+        return None
+
+    days = days_cache.get(value[0:10])
+    if days is None:
+        if value[4] != "-" or value[7] != "-" or not (value[0:4] + value[5:7] + value[8:10]).isdigit():
+            return None
+        try:
+            days = date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal() - EPOCH_ORDINAL
+        except ValueError:
+            return None
+        if len(days_cache) >= 4096:
+            days_cache.clear()
+        days_cache[value[0:10]] = days
+
+    time_text = value[11:13] + value[14:16] + value[17:19]
+    if not time_text.isdigit():
+        return None
+    hour, minute, second = int(time_text[0:2]), int(time_text[2:4]), int(time_text[4:6])
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+
+    return float(days * 86400 + hour * 3600 + minute * 60 + second)
+
+def to_iso(seconds):
+    """The ISO date, as datetime.isoformat writes it, for seconds since 1970"""
+    days, seconds = divmod(int(seconds), 86400)
+
+    day_text = day_text_cache.get(days)
+    if day_text is None:
+        day = date.fromordinal(days + EPOCH_ORDINAL)
+        day_text = "%04d-%02d-%02dT" % (day.year, day.month, day.day)
+        if len(day_text_cache) >= 4096:
+            day_text_cache.clear()
+        day_text_cache[days] = day_text
+
+    hour, seconds = divmod(seconds, 3600)
+    minute, second = divmod(seconds, 60)
+    return day_text + "%02d:%02d:%02d" % (hour, minute, second)
+
+class ColumnarData():
+
+    # Rows are added to the columns this many at a time, and read back this many at a time
+    block_size = 1024
+
+    def __init__(self, plan):
+        self.header = list(plan.field_names)
+        self.columns = []
+        for f in plan.fields:
+            if f.field.field_type == "double":
+                self.columns.append(DoubleColumn())
+            elif f.field.field_type == "dateTime":
+                self.columns.append(DateColumn())
+            else:
+                self.columns.append(StringColumn())
+        self.count = 0
+
+        # Rows not yet added to the columns
+        self.pending = []
+
+    def append(self, row):
+        """Add a corrected row"""
+        self.pending.append(row)
+        if len(self.pending) >= self.block_size:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def flush(self):
+        """Add the pending rows to the columns"""
+        if not self.pending:
+            return
+        for column, values in izip(self.columns, izip(*self.pending)):
+            column.extend(values)
+        self.count += len(self.pending)
+        self.pending = []
+
+    def __len__(self):
+        """The number of rows, counting the header as the list based dataCorrected does"""
+        return self.count + len(self.pending) + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in xrange(start, stop, step)]
+            return RowView(self, start, max(start, stop))
+
+        if index < 0:
+            index += len(self)
+        if index == 0:
+            return list(self.header)
+        if not 0 < index < len(self):
+            raise IndexError("row index out of range")
+        self.flush()
+        return [column.get(index - 1) for column in self.columns]
+
+    def __iter__(self):
+        return iter(RowView(self, 0, len(self)))
+
+    def __getstate__(self):
+        self.flush()
+        return self.__dict__
+
+    def rows(self, start=0, stop=None):
+        """Iterate over the corrected rows (without the header) from start to stop as lists"""
+        self.flush()
+        if stop is None:
+            stop = self.count
+        for block_start in xrange(start, stop, self.block_size):
+            block_stop = min(block_start + self.block_size, stop)
+            for values in izip(*[column.block(block_start, block_stop) for column in self.columns]):
+                yield list(values)
+
+    def column(self, name):
+        """The column of a field"""
+        self.flush()
+        return self.columns[self.header.index(name)]
+
+class RowView():
+    """Rows start to stop of ColumnarData, counting the header as row 0"""
+
+    def __init__(self, data, start, stop):
+        self.data = data
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        if self.start == self.stop:
+            return
+        start = self.start
+        if start == 0:
+            yield list(self.data.header)
+            start = 1
+        for row in self.data.rows(start - 1, self.stop - 1):
+            yield row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in xrange(start, stop, step)]
+            return RowView(self.data, self.start + start, self.start + max(start, stop))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return self.data[self.start + index]
@@ -12,6 +12,8 @@ class ContentModel():
     uri = ""
     date_updated = datetime(1900, 1, 1)
     versions = []
+    versions_by_uri = {}
+    latest = None
 
     def __init__(self, model_dict):
         self.title = model_dict.get("title", "")
@@ -22,15 +24,19 @@ class ContentModel():
         self.date_updated = date_parser.parse(model_dict.get("date_updated", self.date_updated.isoformat()))
         self.versions = [ModelVersion(v) for v in model_dict.get("versions", [])]
 
+        # Index the versions by uri, keeping the first one if a uri is repeated
+        self.versions_by_uri = {}
+        for v in self.versions:
+            self.versions_by_uri.setdefault(v.uri, v)
+
+        sorted_versions = sorted(self.versions, key=lambda v: v.date_created)
+        self.latest = sorted_versions[-1] if sorted_versions else None
+
     def latest_version(self):
         """
         Return the latest version
         """
-        sorted_versions = sorted(self.versions, key=lambda v: v.date_created)
-        if len(sorted_versions) == 0:
-            return None
-
-        return sorted_versions[-1]
+        return self.latest
 
     def is_version_valid(self, version_id_or_uri):
         """
@@ -0,0 +1,58 @@
+"""
+Fast parsing of the dateTime formats that turn up most, with dateutil for everything else. A DateParser belongs
+to one field and tries the format that last matched first, so once it has seen a value a column in a single
+format costs one regular expression match per cell.
+"""
+import datetime
+import re
+
+from dateutil import parser
+
+# Date components missing from a value are taken from here
+DEFAULT_DATE = datetime.datetime(1901, 01, 01, 00, 00, 00)
+
+# Four digit years from 1000 on, dateutil treats shorter years relative to the current century
+YEAR = r"([1-9]\d{3})"
+TIME = r"(\d{1,2}):(\d{2})(?::(\d{2}))?"
+
+# Each format is a regular expression and the positions of year, month, day, hour, minute, second among its groups
+FORMATS = [
+    # 2001-02-03, 2001-02-03T04:05, 2001-02-03 04:05:06
+    (re.compile(YEAR + r"-(\d{2})-(\d{2})(?:[T ]" + TIME + r")?$"), (0, 1, 2, 3, 4, 5)),
+    # 2/3/2001, 02/03/2001 04:05, 2/3/2001 4:05:06 (month first)
+    (re.compile(r"(\d{1,2})/(\d{1,2})/" + YEAR + r"(?: " + TIME + r")?$"), (2, 0, 1, 3, 4, 5)),
+    # 2001
+    (re.compile(YEAR + r"$"), (0, None, None, None, None, None))
+]
+
+class DateParser():
+
+    def __init__(self):
+        self.formats = list(FORMATS)
+
+    def parse(self, text):
+        """Parse text the way dateutil.parser.parse(text, default=DEFAULT_DATE) does"""
+        for i, (pattern, positions) in enumerate(self.formats):
+            match = pattern.match(text)
+            if match is None:
+                continue
+
+            groups = match.groups()
+            components = [DEFAULT_DATE.year, DEFAULT_DATE.month, DEFAULT_DATE.day, 0, 0, 0]
+            for c, position in enumerate(positions):
+                if position is not None and groups[position] is not None:
+                    components[c] = int(groups[position])
+
+            # An impossible date like 2001-02-30 is left for dateutil to reject or reinterpret
+            try:
+                value = datetime.datetime(*components)
+            except ValueError:
+                break
+
+            # Try this format first for the next value
+            if i:
+                self.formats.insert(0, self.formats.pop(i))
+
+            return value
+
+        return parser.parse(text, default=DEFAULT_DATE)
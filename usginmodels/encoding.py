@@ -0,0 +1,44 @@
+"""
+The encoding check. A value passes if it converts to utf-8 and then to Win-1252 (used by the server), which only
+plain ASCII text does. Most files are entirely ASCII, so a row or column of values is checked in one go and a value
+is only looked at on its own when that fails, with the result for a repeated value remembered.
+"""
+
+# The most values an EncodingChecker remembers. Repeated values, such as those of a domain or SRS field, turn up
+# early in a file, so the first ones seen are kept.
+MAX_KNOWN = 4096
+
+def encodable(value):
+    """Whether the value converts to utf-8 and Win-1252"""
+    try:
+        value.encode("utf-8").encode("windows-1252")
+    except:
+        return False
+    return True
+
+def plain_text(values):
+    """Whether every value is ASCII text, a str or unicode, so all of them pass the encoding check"""
+    try:
+        u"".join(values).encode("ascii")
+    except (TypeError, UnicodeError):
+        return False
+    return True
+
+class EncodingChecker():
+    """The encoding check for the values of one column, remembering the result for each value it has seen"""
+
+    def __init__(self, max_known=MAX_KNOWN):
+        self.known = {}
+        self.max_known = max_known
+
+    def check(self, value):
+        """Whether the value passes the encoding check"""
+        try:
+            return self.known[value]
+        except KeyError:
+            ok = encodable(value)
+            if len(self.known) < self.max_known:
+                self.known[value] = ok
+            return ok
+        except TypeError:
+            return encodable(value)
@@ -1,5 +1,15 @@
 import datetime
-import dateutil.parser as parser
+
+from dates import DateParser
+from encoding import EncodingChecker
+from messages import Message, NOTICE, WARNING, ERROR
+
+# URI field names which must start with http://resources.usgin.org/uri-gin/, as well as the primary URI field
+URI_GIN_FIELDS = ["ObservationURI", "ParentWellURI", "SamplingFeatureURI", "HeaderURI", "WellBoreURI", "WellHeaderURI"]
+
+# Fields whose values check_domain restricts to a range
+DOMAIN_FIELDS = ["LatDegree", "LatDegreeWGS84", "LongDegree", "LongDegreeWGS84",
+                 "MaximumRecordedTemperature", "MeasuredTemperature", "CorrectedTemperature", "Temperature"]
 
 class Field():
 
@@ -14,61 +24,91 @@ class Field():
         self.field_description = field.get("description", "")
         self.field_optional = field.get("optional", "")
 
+        # Learns the format of the values in this field as it goes
+        self.date_parser = DateParser()
+
+        # Remembers which of the values seen so far pass the encoding check
+        self.encoding = EncodingChecker()
+
     def validate_field(self, data):
         """Check that the data matches the required type: string, double or dateTime"""
-        msg = None
+        return self.converter()(data)
 
-        # String type
+    def converter(self):
+        """Return the type check for this field's type"""
         if self.field_type == "string":
+            return self.validate_string
+        elif self.field_type == "double":
+            return self.validate_double
+        elif self.field_type == "dateTime":
+            return self.validate_datetime
+        # Improper schema or new type
+        else:
+            return self.validate_unknown
+
+    def validate_string(self, data):
+        """Check that the data is a string"""
+        msg = None
+
+        try:
+            data = str(data)
+        except:
+            if self.field_optional == False:
+                msg = Message(ERROR, "string_type", self.field_name, data)
+            else:
+                msg = Message(WARNING, "string_unrecognized", self.field_name, data)
+                data = ""
+        if data == "" and self.field_optional == False:
+            data = "Missing"
+            msg = Message(WARNING, "string_blank", self.field_name)
+
+        return msg, data
+
+    def validate_double(self, data):
+        """Check that the data is a double"""
+        msg = None
+
+        if data != "":
             try:
-                data = str(data)
+                data = float(data)
             except:
                 if self.field_optional == False:
-                    msg = "Error! " + self.field_name + ": Type must be string. Changing " + data + " to Missing"
+                    msg = Message(WARNING, "double_type", self.field_name, data)
+                    data = -9999
                 else:
-                    msg = "Warning! " + self.field_name + ": Not recognized as a string. Deleting " + data
+                    msg = Message(WARNING, "double_unrecognized", self.field_name, data)
                     data = ""
-            if data == "" and self.field_optional == False:
-                data = "Missing"
-                msg = "Warning! " + self.field_name + ": Can't be blank. Changing to Missing"
+        else:
+            if self.field_optional == False:
+                data = -9999
+                msg = Message(WARNING, "double_blank", self.field_name)
 
-        # Double type
-        elif self.field_type == "double":
-            if data != "":
-                try:
-                    data = float(data)
-                except:
-                    if self.field_optional == False:
-                        msg = "Warning! " + self.field_name + ": Type must be double. Changing " + str(data) + " to -9999"
-                        data = -9999
-                    else:
-                        msg = "Warning! " + self.field_name + ": Not recognized as a double. Deleting " + str(data)
-                        data = ""
-            else:
-                if self.field_optional == False:
-                    data = -9999
-                    msg = "Warning! " + self.field_name + ": Can't be blank. Changing to -9999"
+        return msg, data
 
-        # DateTime type
-        elif self.field_type == "dateTime":
-            if data != "":
-                try:
-                    data = (parser.parse(data, default=datetime.datetime(1901, 01, 01, 00, 00, 00))).isoformat()
-                except:
-                    if self.field_optional == False:
-                        msg = "Warning! " + self.field_name + ": Type must be dateTime. Changing " + str(data) + " to 1901-01-01T00:00:00"
-                        data = datetime.datetime(1901, 01, 01, 00, 00, 00).isoformat()
-                    else:
-                        msg = "Warning! " + self.field_name + ": Not recognized as a date. Deleting " + str(data)
-                        data = ""
-            else:
+    def validate_datetime(self, data):
+        """Check that the data is a dateTime"""
+        msg = None
+
+        if data != "":
+            try:
+                data = self.date_parser.parse(data).isoformat()
+            except:
                 if self.field_optional == False:
+                    msg = Message(WARNING, "date_type", self.field_name, data)
                     data = datetime.datetime(1901, 01, 01, 00, 00, 00).isoformat()
-                    msg = "Warning! " + self.field_name + ": Can't be blank. Changing to " + data
-
-        # Improper schema or new type
+                else:
+                    msg = Message(WARNING, "date_unrecognized", self.field_name, data)
+                    data = ""
         else:
-            msg = "Error! " + self.field_name + ": Not indicated in schema to be string, double or dateTime"
+            if self.field_optional == False:
+                data = datetime.datetime(1901, 01, 01, 00, 00, 00).isoformat()
+                msg = Message(WARNING, "date_blank", self.field_name)
+
+        return msg, data
+
+    def validate_unknown(self, data):
+        """The schema gives a type other than string, double or dateTime"""
+        msg = Message(ERROR, "unknown_type", self.field_name)
 
         return msg, data
 
@@ -76,11 +116,8 @@ class Field():
         """Check that conversion to utf-8 and Win-1252 encoding (used by the server) is possible"""
         msg = None
 
-        try:
-            data = data.encode("utf-8")
-            data = data.encode("windows-1252")
-        except:
-            msg = "Error! " + self.field_name + ": Found an unrecognized character."
+        if not self.encoding.check(data):
+            msg = Message(ERROR, "encoding", self.field_name)
 
         return msg
 
@@ -95,23 +132,29 @@ class Field():
             data_strip = data.strip()
             if data != data_strip:
                 data = data_strip
-                msg = "Notice! " + self.field_name + ": Removed trailing and leading whitespace"
+                msg = Message(NOTICE, "whitespace", self.field_name)
         except:
             pass
 
         if data == "nil:missing":
             data = "Missing"
-            msg = "Notice! " + self.field_name + ": Changed nil:missing"
+            msg = Message(NOTICE, "nil_missing", self.field_name)
 
         return msg, data
 
     def check_uri(self, data, primaryURIField, used_uris):
-        """Check that the URI is formatted correctly and, if it is the primary URI, that it is not repeated"""
-        msg = None
+        """
+        Check that the URI is formatted correctly and, if it is the primary URI, that it is not repeated.
+        used_uris is the set of primary URIs seen so far.
+        """
+        is_primary = primaryURIField is not None and self.field_name == primaryURIField.field_name
+        is_uri_gin = is_primary or self.field_name in URI_GIN_FIELDS
 
-        # URI field names which must start with http://resources.usgin.org/uri-gin/ and follow other specs below
-        uri_gin_fields = ["ObservationURI", "ParentWellURI", "SamplingFeatureURI", "HeaderURI", "WellBoreURI", "WellHeaderURI"]
-        uri_gin_fields.append(primaryURIField.field_name)
+        return self.check_uri_value(data, is_uri_gin, is_primary, used_uris)
+
+    def check_uri_value(self, data, is_uri_gin, is_primary, used_uris):
+        """check_uri with the field's role worked out ahead of time"""
+        msg = None
 
         if data == "" or data == "Missing":
             return msg, data, used_uris
@@ -120,30 +163,30 @@ class Field():
             # Remove any carriage returns in the URI
             if "\n" in data:
                 data = data.replace("\n", "")
-                msg = "Notice! " + self.field_name + ": Removed carriage return"
+                msg = Message(NOTICE, "carriage_return", self.field_name)
             # Remove any whitespace in the URI, unless there is a pipe character indicating multiple URIs
             if " " in data and not "|" in data:
                 data = data.replace(" ", "")
             # If the value is not blank or the word Missing and the field name is not MetadataURI or SourceURI or SourceCitationURI
-            if data != "" and data != "Missing" and self.field_name in uri_gin_fields:
+            if data != "" and data != "Missing" and is_uri_gin:
                 # If the value does not start with "http://resources.usgin.org/uri-gin/"
                 if data.find("http://resources.usgin.org/uri-gin/") != 0:
-                    msg = "Error! " + self.field_name + ": URI needs to start with http://resources.usgin.org/uri-gin/. Change " + data
+                    msg = Message(ERROR, "uri_prefix", self.field_name, data)
                 # If the last character is not a backslash add one
                 if data[len(data)-1] != "/":
                     data = data + "/"
-                    msg = "Notice! " + self.field_name + ": Added missing '/' to the end"
+                    msg = Message(NOTICE, "uri_slash", self.field_name)
                 # If the URI has less than 7 backslashes it does not have enough parts
                 if data.count("/") < 7:
-                    msg = "Error! " + self.field_name + ": URI field does not have enough components. Change " + data
+                    msg = Message(ERROR, "uri_components", self.field_name, data)
                 # If the current field is the primary URI field there can be no duplicates
-                if self.field_name == primaryURIField.field_name:
+                if is_primary:
                     # If the current URI is already in the list of URIs there is an error
                     if data in used_uris:
-                        msg = "Error! " + self.field_name + ": URI has already been used. Change " + data
+                        msg = Message(ERROR, "uri_used", self.field_name, data)
                     # If the current URI is not in the list of URIs add it
                     else:
-                        used_uris.append(data)
+                        used_uris.add(data)
 
         return msg, data, used_uris
 
@@ -160,9 +203,9 @@ class Field():
                     temp_units = data.lower()
                 else:
                     if data.lower() != temp_units:
-                        msg = "Error! " + self.field_name + ": Temperature unit " + temp_units + " has already been specified for this data. All units must be consistent. Change " + data
+                        msg = Message(ERROR, "temp_units_changed", self.field_name, (temp_units, data))
             else:
-                msg = "Error! " + self.field_name + ": Temperature unit " + data + " is not valid"
+                msg = Message(ERROR, "temp_units_invalid", self.field_name, data)
 
         return msg, data, temp_units
 
@@ -185,7 +228,7 @@ class Field():
                 srs = data
             else:
                 if data != srs:
-                    msg = "Error! " + self.field_name + ": Coordinate system " + srs + " has already been specified for this data. Coordinate system must remain consistent. Change " + data
+                    msg = Message(ERROR, "srs_changed", self.field_name, (srs, data))
 
         return msg, data, srs
 
@@ -193,15 +236,17 @@ class Field():
         """Check specified fields for valid data"""
         msg = None
 
+        # The value goes in the message as text since -9999 and -9999.0 are different messages
+
         if self.field_name == "LatDegree" or self.field_name == "LatDegreeWGS84":
             if not (data >= -90 and data <= 90):
-                msg = "Error! " + self.field_name + ": Latitude must be between -90 and 90. Change " + str(data)
+                msg = Message(ERROR, "latitude", self.field_name, str(data))
         elif self.field_name == "LongDegreeWGS84" or self.field_name == "LongDegree":
             if not (data >= -180 and data <= 180):
-                msg = "Error! " + self.field_name + ": Longitude must be between -180 and 180. Change " + str(data)
+                msg = Message(ERROR, "longitude", self.field_name, str(data))
         elif self.field_name == "MaximumRecordedTemperature" or self.field_name == "MeasuredTemperature" or self.field_name == "CorrectedTemperature" or self.field_name == "Temperature":
             if not (data >= 0 and data <= 999) and data != -999 and data != -9999 and data != "":
-                msg = "Error! " + self.field_name + ":Temperature must be between 0 and 999. Change " + str(data)
+                msg = Message(ERROR, "temperature", self.field_name, str(data))
 
         return msg, data
 
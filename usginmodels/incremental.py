@@ -0,0 +1,115 @@
+"""
+Incremental revalidation of a file that was validated before. Each row is fingerprinted and the result of checking
+it on its own (its corrected values, its messages with the duplicate URI, temperature unit and SRS checks put off
+as in a ChunkState, and its long_fields) is stored by fingerprint. On the next run only new or changed rows are
+checked, then the stored results are merged in row order to settle the checks that span the whole file, which
+gives the same result as a full run.
+"""
+import hashlib
+import os
+
+from columnar import corrected_data
+from messages import format_messages
+from model_cache import ModelCache, atomic_write, dump_pickle, load_pickle
+from plan import get_plan, read_rows, ValidationState, ChunkState
+from result_cache import get_validator_version
+
+class RowStore():
+    """The row results of the last run of each source, kept on disk"""
+
+    path = os.path.join(ModelCache.cache_dir, "rows")
+
+    def __init__(self, path=None):
+        if path is not None:
+            self.path = path
+
+    def key(self, source, version_uri, layer_name, fieldnames):
+        """Results are only reused for the same source, layer, header and validator"""
+        digest = hashlib.sha1()
+        for part in [get_validator_version(), source, version_uri, layer_name] + list(fieldnames):
+            digest.update(unicode(part).encode("utf-8") + "\0")
+        return digest.hexdigest()
+
+    def validate(self, layer, csv_text, uri_registry=None, source="", columnar=False):
+        """Layer.validate_file, reusing the results of the last run of source"""
+        return validate_incremental(layer, csv_text, self, uri_registry, source, columnar)
+
+    def rows_path(self, key):
+        return os.path.join(self.path, key + ".rows")
+
+    def load(self, key):
+        """Return the {fingerprint: row result} stored under key, empty if there isn't one"""
+        return load_pickle(self.rows_path(key)) or {}
+
+    def save(self, key, results):
+        """Replace the row results stored under key. Failing to write is not fatal, the next run checks every row."""
+        atomic_write(self.rows_path(key), dump_pickle(results, 1))
+
+def fingerprint(row, indexes):
+    """
+    Hash the values of the fields of a row, a value missing from a short row hashing differently from a blank and
+    a typed value (a float or datetime from a spreadsheet) differently from text
+    """
+    values = []
+    for index in indexes:
+        if index is None:
+            values.append("")
+        elif type(row[index]) is str:
+            values.append(row[index])
+        elif row[index] is None:
+            values.append("\1")
+        else:
+            values.append("\2" + repr(row[index]))
+    return hashlib.md5("\0".join(values)).digest()
+
+def check_row(plan, row, columns):
+    """
+    Validate a row on its own as row 0. Returns (corrected row, events, long_fields), the events being ChunkState
+    (row number, message) pairs with messages about the header at row -1.
+    """
+    state = ChunkState()
+    rowCorrected = plan.validate_row(row, 0, columns, state)
+    return rowCorrected, state.events, state.long_fields
+
+def validate_incremental(layer, csv_text, row_store, uri_registry=None, source="", columnar=False):
+    """Layer.validate_file, only checking the rows that aren't in the results row_store has for source"""
+    plan = get_plan(layer)
+
+    fieldnames, rows = read_rows(csv_text)
+    columns = plan.bind(fieldnames)
+    state = ValidationState(track_uris=uri_registry is not None)
+
+    # If a required field is missing no rows are validated
+    if not plan.check_header(columns, state):
+        return False, format_messages(state.messages), [], {}, ""
+
+    store_key = row_store.key(source, layer.version_uri, layer.layer_name, fieldnames)
+    previous = row_store.load(store_key)
+    results = {}
+    indexes = [index for f, index in columns]
+
+    dataCorrected = corrected_data(plan, columnar)
+    checked = 0
+
+    for i, row in enumerate(rows):
+        row_key = fingerprint(row, indexes)
+        result = results.get(row_key) or previous.get(row_key)
+        if result is None:
+            result = check_row(plan, row, columns)
+            checked += 1
+        results[row_key] = result
+
+        rowCorrected, events, long_fields = result
+        dataCorrected.append(list(rowCorrected))
+
+        # Settle the checks that depend on the other rows, in row order, the row's own messages moved to row i
+        state.merge(plan, [(row_num or i, msg) for row_num, msg in events], long_fields)
+
+    # Nothing to write if the file hasn't changed
+    if checked or len(results) != len(previous):
+        row_store.save(store_key, results)
+
+    if uri_registry is not None:
+        layer.check_uri_registry(plan, state, uri_registry, source)
+
+    return state.messages.valid, format_messages(state.messages), dataCorrected, state.long_fields, state.srs
@@ -1,132 +1,119 @@
-from itertools import count, groupby
+from timeit import default_timer
+
+from columnar import corrected_data
 from field import Field
+from messages import Message, ERROR
+from profiling import ValidationStats, profiled_plan
+from column_validation import validate_columns
+from parallel import validate_parallel
+from sampling import check_sample
+from validation_run import ValidationRun
+
+# These used to be defined here and are still importable from layer.py
+from messages import format_messages
+from plan import get_primary_uri_field
 
 class Layer():
 
     layer_name = ""
+    version_uri = ""
     fields = []
 
-    def __init__(self, layer, fields_dict):
+    def __init__(self, layer, fields_dict, version_uri=""):
         self.layer_name = layer
+        self.version_uri = version_uri
         self.fields = [Field(f) for f in fields_dict]
 
 
-    def validate_file(self, csv_text):
-        messages = []
-        valid = True
-
-        # Create the object for the corrected data and don't include the first field (OBJECTID) or last field (Shape)
-        dataCorrected = []
-        dataCorrected.append([f.field_name for f in self.fields[1:][:-1]])
-
-        used_uris = []
-        primary_uri_field = get_primary_uri_field(self.fields[1:][:-1])
-
-        temp_units = ""
-        srs = ""
-        long_fields = {}
-
-        # Remove trailing and leading whitespace from field names in csv file
-        for i, field in enumerate(csv_text.fieldnames):
-            csv_text.fieldnames[i] = field.strip()
-
-        for i, row in enumerate(csv_text):
-            rowCorrected = []
-            for f in self.fields[1:][:-1]:
-
-                # Check required fields. Immediately return when a required field is not found.
-                try:
-                    data = row[f.field_name]
-                except:
-                    if f.field_optional == False:
-                        msg = "Error! " + f.field_name + " is a required field but was not found in the imported file."
-                        valid, messages = addMessage(-1, False, msg, messages)
-                        messages = format_messages(messages)
-                        return valid, messages, [], {}, ""
-                    else:
-                        msg = "Warning! " + f.field_name + " was not found in the imported file but this is not a required field so ignoring."
-                        valid, messages = addMessage(-1, valid, msg, messages)
-                        data = ""
-
-                # Check encoding of data
-                encoding_error = f.check_encoding(data)
-                valid, messages = addMessage(i, valid, encoding_error, messages)
-
-                if not encoding_error:
-                    # Fix minor formatting issues
-                    format_error, data = f.fix_format(data)
-                    valid, messages = addMessage(i, valid, format_error, messages)
-
-                    # Check data types
-                    type_error, data = f.validate_field(data)
-                    valid, messages = addMessage(i,valid, type_error, messages)
-
-                    # Check URIs
-                    uri_error, data, used_uris = f.check_uri(data, primary_uri_field, used_uris)
-                    valid, messages = addMessage(i, valid, uri_error, messages)
-
-                    # Check temperature units
-                    temp_units_error, data, temp_units = f.check_temp_units(data, temp_units)
-                    valid, messages = addMessage(i, valid, temp_units_error, messages)
-
-                    # Check SRS
-                    srs_error, data, srs = f.check_srs(data, srs)
-                    valid, messages = addMessage(i, valid, srs_error, messages)
-
-                    # Check Domain
-                    domain_error, data = f.check_domain(data)
-                    valid, messages = addMessage(i, valid, domain_error, messages)
-
-                    # Check length of data
-                    long_fields = f.check_field_length(data, long_fields)
-
-                rowCorrected.append(data)
-            dataCorrected.append(rowCorrected)
-
-        messages = format_messages(messages)
-        return valid, messages, dataCorrected, long_fields, srs
-
-def get_primary_uri_field(fields):
-    """Find the first field name containing URI"""
-
-    for f in fields:
-        if "URI" in f.field_name:
-            return f
-
-    return None
-
-def addMessage(row_num, valid, new_msg, messages):
-    """ Add error message to the list of errors and set the validity"""
-
-    if new_msg:
-        if "Error" in new_msg:
-            valid = False
-        match = False
-
-        for msg in messages:
-            if new_msg == msg[1]:
-                match = True
-                if row_num + 1 != msg[0][-1]:
-                    msg[0].append(row_num + 1)
-                    return valid, messages
-
-        if match == False:
-            messages.append([[row_num + 1], new_msg])
-
-    return valid, messages
-
-def format_messages(messages):
-    """ Format the error messages by turing a list into a range where appropriate
-        For example: 1,2,3,4,7,8,9 becomes 1-4,7,8-9 """
-
-    messages_formatted = []
-    for msg in messages:
-        G = (list(x) for _,x in groupby(msg[0], lambda x,c=count(): next(c)-x))
-        rows_list = ",".join("-".join(map(str,(g[0],g[-1])[:len(g)])) for g in G)
-
-        if "," in rows_list or "-" in rows_list:
-            messages_formatted.append("Rows " + rows_list + " " + msg[1])
-        else:
-            messages_formatted.append("Row " + rows_list + " " + msg[1])
-
-    return messages_formatted
\ No newline at end of file
+    def validate_file(self, csv_text, uri_registry=None, source="", processes=1, chunk_size=5000, by_column=False,
+                      max_errors=None, max_messages=None, fail_fast=False, row_store=None, columnar=False,
+                      profile=False):
+        """
+        Validate the rows of a csv.reader (or csv.DictReader). If a UriRegistry is given the primary URIs are also checked against
+        the URIs other sources have submitted, and if the file is valid they are registered under source.
+        With processes other than 1 the rows are validated in chunks of chunk_size across a process pool
+        (None for one process per CPU). by_column validates a column at a time instead, using NumPy for the
+        double fields, which only pays off on a layer with many double fields.
+        max_errors and max_messages set an error budget: reading stops once that many errors or different
+        messages have been found, and the last message says where. fail_fast stops at the first error.
+        A budget needs the rows in order, so it always validates a row at a time in this process.
+        With a RowStore only the rows that are new or changed since the last run of source are checked.
+        columnar returns the corrected data as ColumnarData, which takes a fraction of the memory of the list of
+        rows and can be indexed, sliced and iterated over the same way.
+        profile times each check of each field and adds a ValidationStats to the end of the returned tuple.
+        Like a budget it validates a row at a time in this process.
+        """
+        if fail_fast:
+            max_errors = 1
+
+        if profile:
+            return self.profile_file(csv_text, uri_registry, source, max_errors, max_messages, columnar)
+
+        if max_errors is None and max_messages is None:
+            if row_store is not None:
+                return row_store.validate(self, csv_text, uri_registry, source, columnar)
+            if by_column:
+                return validate_columns(self, csv_text, uri_registry, source, columnar)
+            if processes != 1:
+                return validate_parallel(self, csv_text, uri_registry, source, processes, chunk_size, columnar)
+
+        run = ValidationRun(self, csv_text, uri_registry, source, max_errors, max_messages)
+
+        # Create the object for the corrected data
+        dataCorrected = corrected_data(run.plan, columnar)
+        dataCorrected.extend(run.rows())
+
+        summary = run.summary
+        if summary.stopped:
+            return summary.valid, summary.messages, [], {}, ""
+        return summary.valid, summary.messages, dataCorrected, summary.long_fields, summary.srs
+
+    def profile_file(self, csv_text, uri_registry=None, source="", max_errors=None, max_messages=None, columnar=False):
+        """validate_file with each check timed, returning (valid, messages, dataCorrected, long_fields, srs, stats)"""
+        stats = ValidationStats()
+        start = default_timer()
+
+        run = ValidationRun(self, csv_text, uri_registry, source, max_errors, max_messages, profiled_plan(self, stats))
+        dataCorrected = corrected_data(run.plan, columnar)
+        dataCorrected.extend(run.rows())
+
+        summary = run.summary
+        stats.rows = summary.rows
+        stats.seconds = default_timer() - start
+
+        if summary.stopped:
+            return summary.valid, summary.messages, [], {}, "", stats
+        return summary.valid, summary.messages, dataCorrected, summary.long_fields, summary.srs, stats
+
+    def iter_validate(self, csv_text, uri_registry=None, source="", max_errors=None, max_messages=None, fail_fast=False):
+        """
+        Validate the rows of a csv.reader (or csv.DictReader) as a stream. Iterate over the returned ValidationRun for
+        (row number, corrected row, messages) and read its summary once the rows run out.
+        """
+        if fail_fast:
+            max_errors = 1
+        return ValidationRun(self, csv_text, uri_registry, source, max_errors, max_messages)
+
+    def quick_check(self, fieldnames, rows, estimated_rows=None):
+        """
+        Check the field names and a sample of rows (lists of values) and estimate the error rate of the file.
+        Returns a QuickCheck.
+        """
+        return check_sample(self, fieldnames, rows, estimated_rows)
+
+    def check_uri_registry(self, plan, state, uri_registry, source):
+        """Check the primary URIs of the file against earlier submissions in bulk and register them if the file is valid"""
+        if not state.uri_rows:
+            return
+
+        # URIs have to be unique across all versions of a model, so drop the version number from the uri
+        model_uri = self.version_uri.rstrip("/").rsplit("/", 1)[0] + "/"
+        field_name = plan.primary_uri_field.field_name
+
+        collisions = uri_registry.find_collisions(model_uri, self.layer_name, [uri for row_num, uri in state.uri_rows], source)
+        for row_num, uri in state.uri_rows:
+            if uri in collisions:
+                state.add_message(row_num, Message(ERROR, "uri_registered", field_name, (collisions[uri], uri)))
+
+        if state.messages.valid:
+            uri_registry.register(model_uri, self.layer_name, [uri for row_num, uri in state.uri_rows], source)
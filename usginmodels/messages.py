@@ -0,0 +1,146 @@
+"""
+Validation messages are kept as Message records (severity, code, field name, argument) and only turned into text
+when the report is formatted, so a message repeated in many cells costs a small tuple instead of a new string.
+"""
+from operator import itemgetter
+
+# Severities, in increasing order
+NOTICE = 0
+WARNING = 1
+ERROR = 2
+
+SEVERITY_NAMES = {NOTICE: "Notice!", WARNING: "Warning!", ERROR: "Error!"}
+
+# The text of each message code. The field name, if there is one, comes first followed by the argument, or the
+# values of a tuple argument.
+TEMPLATES = {
+    "string_type": "%s: Type must be string. Changing %s to Missing",
+    "string_unrecognized": "%s: Not recognized as a string. Deleting %s",
+    "string_blank": "%s: Can't be blank. Changing to Missing",
+    "double_type": "%s: Type must be double. Changing %s to -9999",
+    "double_unrecognized": "%s: Not recognized as a double. Deleting %s",
+    "double_blank": "%s: Can't be blank. Changing to -9999",
+    "date_type": "%s: Type must be dateTime. Changing %s to 1901-01-01T00:00:00",
+    "date_unrecognized": "%s: Not recognized as a date. Deleting %s",
+    "date_blank": "%s: Can't be blank. Changing to 1901-01-01T00:00:00",
+    "unknown_type": "%s: Not indicated in schema to be string, double or dateTime",
+    "encoding": "%s: Found an unrecognized character.",
+    "whitespace": "%s: Removed trailing and leading whitespace",
+    "nil_missing": "%s: Changed nil:missing",
+    "carriage_return": "%s: Removed carriage return",
+    "uri_prefix": "%s: URI needs to start with http://resources.usgin.org/uri-gin/. Change %s",
+    "uri_slash": "%s: Added missing '/' to the end",
+    "uri_components": "%s: URI field does not have enough components. Change %s",
+    "uri_used": "%s: URI has already been used. Change %s",
+    "uri_registered": "%s: URI has already been used in %s. Change %s",
+    "temp_units_changed": "%s: Temperature unit %s has already been specified for this data. All units must be consistent. Change %s",
+    "temp_units_invalid": "%s: Temperature unit %s is not valid",
+    "srs_changed": "%s: Coordinate system %s has already been specified for this data. Coordinate system must remain consistent. Change %s",
+    "latitude": "%s: Latitude must be between -90 and 90. Change %s",
+    "longitude": "%s: Longitude must be between -180 and 180. Change %s",
+    "temperature": "%s:Temperature must be between 0 and 999. Change %s",
+    "required_missing": "%s is a required field but was not found in the imported file.",
+    "optional_missing": "%s was not found in the imported file but this is not a required field so ignoring.",
+    "stopped": "Validation stopped after finding %s. The rows after this one were not checked."
+}
+
+class Message(tuple):
+    """A validation message. Equal messages compare and hash as tuples, so they group without being rendered."""
+
+    __slots__ = ()
+
+    def __new__(cls, severity, code, field=None, argument=None):
+        return tuple.__new__(cls, (severity, code, field, argument))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    severity = property(itemgetter(0))
+    code = property(itemgetter(1))
+    field = property(itemgetter(2))
+    argument = property(itemgetter(3))
+
+    def text(self):
+        """Render the message, for example "Warning! Depth: Can't be blank. Changing to -9999" """
+        severity, code, field, argument = self
+
+        values = () if field is None else (field,)
+        if type(argument) is tuple:
+            values += argument
+        elif argument is not None:
+            values += (argument,)
+
+        return SEVERITY_NAMES[severity] + " " + TEMPLATES[code] % values
+
+class ReportLine(unicode):
+    """A line of the formatted report, which remembers the severity of its message"""
+
+    __slots__ = ("severity",)
+
+    def __new__(cls, text, severity):
+        line = unicode.__new__(cls, text)
+        line.severity = severity
+        return line
+
+    def __reduce__(self):
+        return ReportLine, (unicode(self), self.severity)
+
+class MessageStore():
+    """
+    The messages of a validation run in the order they were first seen, each with the rows it was found in.
+    Rows are kept as runs of consecutive row numbers so adding a message is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self.valid = True
+        self.errors = 0
+        self.order = []
+        self.rows = {}
+
+    def add(self, row_num, new_msg):
+        """ Add error message to the store and set the validity"""
+
+        if not new_msg:
+            return
+
+        row = row_num + 1
+        runs = self.rows.get(new_msg)
+        if runs is None:
+            self.rows[new_msg] = [[row, row]]
+            self.order.append(new_msg)
+        else:
+            # A message is only recorded once per row
+            last = runs[-1]
+            if row == last[1] + 1:
+                last[1] = row
+            elif row != last[1]:
+                runs.append([row, row])
+            else:
+                return
+
+        # Count each row an error was found in, for the error budget
+        if new_msg.severity >= ERROR:
+            self.valid = False
+            self.errors += 1
+
+    def __len__(self):
+        return len(self.order)
+
+    def items(self):
+        """Return (message, runs of rows) in the order the messages were first seen"""
+        return [(msg, self.rows[msg]) for msg in self.order]
+
+def format_messages(messages):
+    """ Format the error messages by turing the rows into ranges where appropriate
+        For example: 1,2,3,4,7,8,9 becomes 1-4,7-9 """
+
+    messages_formatted = []
+    for msg, runs in messages.items():
+        rows_list = ",".join(str(first) if first == last else str(first) + "-" + str(last) for first, last in runs)
+
+        if "," in rows_list or "-" in rows_list:
+            messages_formatted.append(ReportLine("Rows " + rows_list + " " + msg.text(), msg.severity))
+        else:
+            messages_formatted.append(ReportLine("Row " + rows_list + " " + msg.text(), msg.severity))
+
+    return messages_formatted
@@ -1,23 +1,195 @@
-from urllib2 import urlopen
+from urllib2 import urlopen, Request, HTTPError
 from datetime import datetime
+import cPickle
+import hashlib
 import json
+import os
+import time
+import warnings
+import zlib
 
 from content_model import ContentModel
+from plan import clear_plans
+
+def env_int(name, default):
+    """The whole number an environment variable holds, or default (with a warning) if it is set to anything else"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        warnings.warn("%s should be a whole number, not %r. Using %d." % (name, value, default))
+        return default
+
+def atomic_write(path, data):
+    """
+    Write data to path through a temporary file renamed over it, creating the directory if needed, so a reader
+    never sees part of a file. Returns False if it couldn't be written.
+    """
+    temp_path = path + ".%d.tmp" % os.getpid()
+
+    try:
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        temp_file = open(temp_path, "wb")
+        try:
+            temp_file.write(data)
+        finally:
+            temp_file.close()
+
+        # os.rename won't replace an existing file on Windows
+        if os.name == "nt" and os.path.exists(path):
+            os.remove(path)
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+    return True
+
+def dump_pickle(value, level=6):
+    """Pickle and compress a value for load_pickle"""
+    return zlib.compress(cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL), level)
+
+def load_pickle(path):
+    """Return the value dump_pickle wrote to path, or None if the file is missing or can't be read"""
+    try:
+        pickle_file = open(path, "rb")
+        try:
+            return cPickle.loads(zlib.decompress(pickle_file.read()))
+        finally:
+            pickle_file.close()
+    except (IOError, OSError, zlib.error, cPickle.UnpicklingError, EOFError, ValueError):
+        return None
 
 class ModelCache():
 
     models = []
+    models_by_uri = {}
+    schema_uris = {}
     last_update = None
-    url = "http://schemas.usgin.org/contentmodels.json"
+    url = os.environ.get("USGINMODELS_URL", "http://schemas.usgin.org/contentmodels.json")
 
-    def __init__(self, url=None):
+    # Local snapshot of contentmodels.json, reused until it is older than ttl seconds. Unless a ttl is given it is
+    # read from USGINMODELS_CACHE_TTL when the snapshot is checked.
+    cache_dir = os.environ.get("USGINMODELS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".usginmodels"))
+    ttl = None
+    default_ttl = 24 * 60 * 60
+    timeout = 30
+
+    def __init__(self, url=None, cache_dir=None, ttl=None, lazy=False):
         if url:
             self.url = url
-        self.refresh()
+        if cache_dir is not None:
+            self.cache_dir = cache_dir
+        if ttl is not None:
+            self.ttl = ttl
+        if not lazy:
+            self.refresh()
+
+    def load(self):
+        """Refresh the first time the models are needed, afterwards just return the cache"""
+        if self.last_update is None:
+            self.refresh()
+        return self
 
-    def refresh(self):
-        response = urlopen(self.url)
-        server_data = json.load(response)
+    def refresh(self, force=False):
+        """
+        Load the content models from the local snapshot if it is fresh, otherwise revalidate it against the server.
+        force skips the freshness check but still sends a conditional request.
+        """
+        snapshot = self.read_snapshot()
+        ttl = self.ttl
+        if ttl is None:
+            ttl = env_int("USGINMODELS_CACHE_TTL", self.default_ttl)
+
+        if snapshot is not None and not force and time.time() - snapshot["fetched"] < ttl:
+            server_data = snapshot["models"]
+        else:
+            server_data = self.fetch(snapshot)
 
         self.models = [ContentModel(m) for m in server_data]
-        self.last_update = datetime.now()
\ No newline at end of file
+        self.build_index()
+        clear_plans()
+        self.last_update = datetime.now()
+
+    def build_index(self):
+        """Index the models by uri and the version uris by "Title version" so lookups don't scan the lists"""
+        self.models_by_uri = {}
+        self.schema_uris = {}
+        for m in self.models:
+            # The first model with a uri wins, the last version with a title and version number wins
+            self.models_by_uri.setdefault(m.uri, m)
+            for v in m.versions:
+                self.schema_uris[m.title + " " + v.version] = v.uri
+
+    def fetch(self, snapshot=None):
+        """Download contentmodels.json, sending the ETag and Last-Modified of the snapshot if there is one"""
+        request = Request(self.url)
+        if snapshot is not None:
+            if snapshot.get("etag"):
+                request.add_header("If-None-Match", snapshot["etag"])
+            if snapshot.get("last_modified"):
+                request.add_header("If-Modified-Since", snapshot["last_modified"])
+
+        try:
+            response = urlopen(request, timeout=self.timeout)
+            server_data = json.load(response)
+        except HTTPError as err:
+            # 304 Not Modified: the snapshot is still current
+            if err.code == 304 and snapshot is not None:
+                snapshot["fetched"] = time.time()
+                self.write_snapshot(snapshot)
+                return snapshot["models"]
+            if snapshot is None:
+                raise
+            return snapshot["models"]
+        except (IOError, ValueError):
+            # If the server is down or slow a stale snapshot is better than nothing
+            if snapshot is None:
+                raise
+            return snapshot["models"]
+
+        headers = response.info()
+        self.write_snapshot({
+            "url": self.url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched": time.time(),
+            "models": server_data
+        })
+
+        return server_data
+
+    def snapshot_path(self):
+        """Each url gets its own snapshot file in the cache directory"""
+        name = "contentmodels-" + hashlib.md5(self.url).hexdigest()[:12] + ".json"
+        return os.path.join(self.cache_dir, name)
+
+    def read_snapshot(self):
+        """Return the snapshot for this url, or None if there isn't a usable one"""
+        try:
+            snapshot_file = open(self.snapshot_path())
+            try:
+                snapshot = json.load(snapshot_file)
+            finally:
+                snapshot_file.close()
+        except (IOError, ValueError):
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("url") != self.url or "models" not in snapshot:
+            return None
+        snapshot["fetched"] = snapshot.get("fetched", 0)
+
+        return snapshot
+
+    def write_snapshot(self, snapshot):
+        """Write the snapshot atomically. Failing to write is not fatal, the next process just fetches again."""
+        atomic_write(self.snapshot_path(), json.dumps(snapshot))
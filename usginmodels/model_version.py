@@ -12,6 +12,7 @@ class ModelVersion():
     xls_url = ""
     date_created = datetime(1900, 1, 1)
     layers = []
+    layers_by_name = {}
 
     def __init__(self, version_dict):
         self.version = version_dict.get("version", "")
@@ -19,4 +20,9 @@ class ModelVersion():
         self.xsd_url = version_dict.get("xsd_file_path", "")
         self.xls_url = version_dict.get("xls_file_path", "")
         self.date_created = date_parser.parse(version_dict.get("date_created", self.date_created.isoformat()))
-        self.layers = [Layer(l, k) for l, k in version_dict.get("layers_info",[]).items()]
\ No newline at end of file
+        self.layers = [Layer(l, k, self.uri) for l, k in version_dict.get("layers_info",[]).items()]
+
+        # Index the layers by name, keeping the first one if a name is repeated
+        self.layers_by_name = {}
+        for l in self.layers:
+            self.layers_by_name.setdefault(l.layer_name, l)
@@ -0,0 +1,83 @@
+"""
+Validation of a file in chunks of rows across a pool of processes. Each chunk is checked on its own with a
+ChunkState and the chunks are merged in order, settling the duplicate URI, temperature unit and SRS checks
+against the whole file, so the result is the same as validating serially. Only a few chunks per process are
+read ahead of the merge, so a file much larger than memory can still be validated when its rows are read lazily.
+"""
+from collections import deque
+from itertools import islice
+import multiprocessing
+
+from columnar import corrected_data
+from messages import format_messages
+from plan import get_plan, read_rows, ValidationState, ChunkState
+
+# The plan and columns of the file a worker process is validating, set up by init_worker
+worker = {}
+
+def init_worker(layer, columns):
+    worker["plan"] = get_plan(layer)
+    worker["columns"] = columns
+
+def validate_chunk(chunk):
+    """Validate (first row number, rows) and return the corrected rows, message events and long fields"""
+    start, rows = chunk
+    plan = worker["plan"]
+    columns = worker["columns"]
+
+    state = ChunkState()
+    corrected = [plan.validate_row(row, start + i, columns, state) for i, row in enumerate(rows)]
+
+    return corrected, state.events, state.long_fields
+
+def read_chunks(rows, chunk_size):
+    """Yield (first row number, rows) for each chunk of the file"""
+    start = 0
+    while True:
+        rows_chunk = list(islice(rows, chunk_size))
+        if not rows_chunk:
+            return
+        yield start, rows_chunk
+        start += len(rows_chunk)
+
+def imap_window(pool, func, items, window):
+    """pool.imap, in order, that only takes the next item from items once fewer than window are being worked on"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def validate_parallel(layer, csv_text, uri_registry=None, source="", processes=None, chunk_size=5000, columnar=False):
+    """Layer.validate_file across processes (default one per CPU)"""
+    plan = get_plan(layer)
+
+    fieldnames, rows = read_rows(csv_text)
+    columns = plan.bind(fieldnames)
+    state = ValidationState(track_uris=uri_registry is not None)
+
+    # If a required field is missing no rows are validated
+    if not plan.check_header(columns, state):
+        return False, format_messages(state.messages), [], {}, ""
+
+    dataCorrected = corrected_data(plan, columnar)
+
+    processes = processes or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes, init_worker, (layer, columns))
+    try:
+        for corrected, events, long_fields in imap_window(pool, validate_chunk, read_chunks(rows, chunk_size), 2 * processes):
+            state.merge(plan, events, long_fields)
+            dataCorrected.extend(corrected)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    if uri_registry is not None:
+        layer.check_uri_registry(plan, state, uri_registry, source)
+
+    return state.messages.valid, format_messages(state.messages), dataCorrected, state.long_fields, state.srs
@@ -0,0 +1,308 @@
+"""
+A Layer compiled for validation. Each field gets its type check and only the other checks that can apply to it,
+worked out once instead of for every cell. Plans are cached by version uri and layer name.
+"""
+from datetime import datetime
+
+from encoding import plain_text
+from field import URI_GIN_FIELDS, DOMAIN_FIELDS
+from messages import MessageStore, Message, WARNING, ERROR
+
+# Compiled plans keyed by (version uri, layer name)
+plans = {}
+
+def get_plan(layer):
+    """Return the compiled plan for the layer, compiling it the first time"""
+
+    # A layer that didn't come from a ModelVersion has nothing to key it by
+    if not layer.version_uri:
+        return LayerPlan(layer)
+
+    key = (layer.version_uri, layer.layer_name)
+    plan = plans.get(key)
+    if plan is None:
+        plan = plans[key] = LayerPlan(layer)
+
+    return plan
+
+def clear_plans():
+    """Forget the compiled plans, the layers they were built from may have changed"""
+    plans.clear()
+
+def get_primary_uri_field(fields):
+    """Find the first field name containing URI"""
+
+    for f in fields:
+        if "URI" in f.field_name:
+            return f
+
+    return None
+
+def read_rows(csv_text):
+    """
+    Return the field names, with leading and trailing whitespace removed, and an iterator over the rows as lists
+    for a csv.reader or a csv.DictReader. Rows shorter than the header are padded with None and blank lines are
+    skipped, as csv.DictReader does.
+    """
+    if hasattr(csv_text, "fieldnames"):
+        fieldnames = csv_text.fieldnames
+        reader = csv_text.reader
+    else:
+        reader = csv_text
+        fieldnames = next(reader, None)
+
+    fieldnames = [field.strip() for field in fieldnames or []]
+    return fieldnames, pad_rows(reader, len(fieldnames))
+
+def pad_rows(reader, width):
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [None] * (width - len(row))
+        yield row
+
+class FieldPlan():
+
+    def __init__(self, field, primary_uri_field, index):
+        self.field = field
+        self.index = index
+        self.field_name = field.field_name
+        self.required = field.field_optional == False
+
+        # Bound methods for the checks every value goes through
+        self.check_encoding = field.check_encoding
+        self.fix_format = field.fix_format
+        self.convert = field.converter()
+
+        # Which of the remaining checks apply to this field
+        self.is_uri = "URI" in field.field_name
+        self.is_primary_uri = primary_uri_field is not None and field.field_name == primary_uri_field.field_name
+        self.is_uri_gin = self.is_primary_uri or field.field_name in URI_GIN_FIELDS
+        self.is_temp_units = field.field_name == "TemperatureUnits"
+        self.is_srs = "SRS" in field.field_name
+        self.is_domain = field.field_name in DOMAIN_FIELDS
+
+        # Values a reader has already typed skip the encoding, format and type checks: floats for a double field
+        # and datetimes for a dateTime field
+        self.typed = float if field.field_type == "double" else datetime if field.field_type == "dateTime" else None
+
+    def check(self, data, row_num, state, encoded=False):
+        """
+        Run the checks that apply to this field on a value and return the corrected value. encoded says the value
+        is already known to pass the encoding check.
+        """
+        add_message = state.add_message
+
+        if type(data) is not str and type(data) is self.typed:
+            if self.typed is datetime:
+                data = data.isoformat()
+        else:
+            # Check encoding of data
+            if not encoded:
+                encoding_error = self.check_encoding(data)
+                if encoding_error:
+                    add_message(row_num, encoding_error)
+                    return data
+
+            # Fix minor formatting issues
+            msg, data = self.fix_format(data)
+            add_message(row_num, msg)
+
+            # Check data types
+            msg, data = self.convert(data)
+            add_message(row_num, msg)
+
+        # Check URIs
+        if self.is_primary_uri:
+            msg, data = state.check_primary_uri(self, data, row_num)
+            add_message(row_num, msg)
+        elif self.is_uri:
+            msg, data, used_uris = self.field.check_uri_value(data, self.is_uri_gin, False, None)
+            add_message(row_num, msg)
+
+        # Check temperature units
+        if self.is_temp_units:
+            msg, data = state.check_temp_units(self, data)
+            add_message(row_num, msg)
+
+        # Check SRS
+        if self.is_srs:
+            msg, data = state.check_srs(self, data)
+            add_message(row_num, msg)
+
+        # Check Domain
+        if self.is_domain:
+            msg, data = self.field.check_domain(data)
+            add_message(row_num, msg)
+
+        # Check length of data
+        state.long_fields = self.field.check_field_length(data, state.long_fields)
+
+        return data
+
+    def missing_message(self):
+        """The message for when the field isn't in the file"""
+        if self.required:
+            return Message(ERROR, "required_missing", self.field_name)
+        else:
+            return Message(WARNING, "optional_missing", self.field_name)
+
+class LayerPlan():
+
+    def __init__(self, layer):
+        self.layer_name = layer.layer_name
+
+        # Don't include the first field (OBJECTID) or last field (Shape)
+        fields = layer.fields[1:][:-1]
+        primary_uri_field = get_primary_uri_field(fields)
+
+        self.primary_uri_field = primary_uri_field
+        self.fields = [FieldPlan(f, primary_uri_field, i) for i, f in enumerate(fields)]
+        self.field_names = [f.field_name for f in fields]
+
+        # Check the encoding of a whole row at once, only checking the values of a row that isn't plain text
+        self.encoding_by_row = True
+
+    def bind(self, fieldnames):
+        """
+        Given the field names of a file, pair each field with the index of its column, or None if it is missing.
+        As with csv.DictReader the last column with a name wins.
+        """
+        indexes = dict((name, i) for i, name in enumerate(fieldnames))
+        return [(f, indexes.get(f.field_name)) for f in self.fields]
+
+    def check_header(self, columns, state):
+        """
+        If a required field is missing from the file, add the messages for all the missing fields and return False.
+        Otherwise the rows can be validated.
+        """
+        missing = [f for f, index in columns if index is None]
+        if not [f for f in missing if f.required]:
+            return True
+
+        for f in missing:
+            state.add_message(-1, f.missing_message())
+        return False
+
+    def validate_row(self, row, row_num, columns, state):
+        """Check and correct one row, a list of values, with columns coming from bind"""
+        rowCorrected = []
+        encoded = self.encoding_by_row and plain_text(row)
+
+        for f, index in columns:
+
+            # A missing field that isn't required is checked as blank
+            if index is None:
+                state.add_message(-1, f.missing_message())
+                data = ""
+            else:
+                data = row[index]
+
+            rowCorrected.append(f.check(data, row_num, state, encoded))
+
+        return rowCorrected
+
+class ValidationState():
+    """
+    What validation carries from one row to the next. The checks that depend on earlier rows go through here so
+    that a ChunkState can put them off until the chunks are merged.
+    """
+
+    def __init__(self, track_uris=False):
+        self.messages = MessageStore()
+        self.add_message = self.messages.add
+        self.used_uris = set()
+        self.uri_rows = [] if track_uris else None
+        self.temp_units = ""
+        self.srs = ""
+        self.long_fields = {}
+
+    def check_primary_uri(self, f, data, row_num):
+        """Check a primary URI, which can't repeat one used earlier"""
+        known = len(self.used_uris)
+        msg, data, self.used_uris = f.field.check_uri_value(data, f.is_uri_gin, True, self.used_uris)
+
+        # Remember where each primary URI was first used if it will be checked against a UriRegistry
+        if self.uri_rows is not None and len(self.used_uris) != known:
+            self.uri_rows.append((row_num, data))
+
+        return msg, data
+
+    def check_temp_units(self, f, data):
+        msg, data, self.temp_units = f.field.check_temp_units(data, self.temp_units)
+        return msg, data
+
+    def check_srs(self, f, data):
+        msg, data, self.srs = f.field.check_srs(data, self.srs)
+        return msg, data
+
+    def merge(self, plan, events, long_fields):
+        """
+        Add the (row number, message) events of a chunk validated by a ChunkState, in order, settling the
+        checks it put off as if the rows had been validated here
+        """
+        add_message = self.add_message
+        for row_num, msg in events:
+            if type(msg) is tuple:
+                msg = self.resolve(plan, row_num, msg)
+            add_message(row_num, msg)
+
+        for field_name, is_long in long_fields.items():
+            self.long_fields[field_name] = self.long_fields.get(field_name, False) or is_long
+
+    def resolve(self, plan, row_num, deferred):
+        """Run the part of a check a ChunkState put off and return its message"""
+        check, index, data, msg = deferred
+        f = plan.fields[index]
+
+        if check == "uri":
+            if data in self.used_uris:
+                # Already formatted, so this only finds the duplicate
+                msg, data, used_uris = f.field.check_uri_value(data, f.is_uri_gin, True, self.used_uris)
+            else:
+                self.check_primary_uri(f, data, row_num)
+        elif check == "temp_units":
+            msg, data = self.check_temp_units(f, data)
+        elif check == "srs":
+            # SRS values come back already normalized and normalizing is idempotent
+            msg, data = self.check_srs(f, data)
+
+        return msg
+
+class ChunkState(ValidationState):
+    """
+    The state of a chunk of rows validated apart from the rest of the file. Messages are kept as a list of
+    (row number, message) events, and the checks that depend on earlier rows record a (check, field index, data,
+    message) tuple instead of a message, for ValidationState.merge to settle.
+    """
+
+    def __init__(self):
+        ValidationState.__init__(self)
+        self.events = []
+        self.add_message = self.add_event
+
+    def add_event(self, row_num, msg):
+        if msg:
+            self.events.append((row_num, msg))
+
+    def check_primary_uri(self, f, data, row_num):
+        used_uris = set()
+        msg, data, used_uris = f.field.check_uri_value(data, f.is_uri_gin, True, used_uris)
+
+        # Only a URI that made it as far as the duplicate check needs the rows of the other chunks
+        if used_uris:
+            return ("uri", f.index, data, msg), data
+        return msg, data
+
+    def check_temp_units(self, f, data):
+        msg, data, temp_units = f.field.check_temp_units(data, "")
+
+        # Blank and invalid units don't depend on the other rows
+        if temp_units:
+            return ("temp_units", f.index, data, None), data
+        return msg, data
+
+    def check_srs(self, f, data):
+        msg, data, srs = f.field.check_srs(data, "")
+        return ("srs", f.index, data, None), data
@@ -0,0 +1,137 @@
+"""
+Timing and counts for each check of each field, for finding out why a file is slow to validate. A profiled run
+validates with a plan built from TimedField wrappers, so an ordinary run doesn't pay anything for it.
+"""
+from timeit import default_timer
+
+from plan import LayerPlan
+
+# The checks FieldPlan.check runs, in order
+CHECKS = ("encoding", "format", "type", "uri", "temp_units", "srs", "domain", "length")
+
+class ValidationStats():
+    """
+    Cumulative seconds, calls and hits (calls that found something to report, or for the length check a value
+    longer than 255 characters) for each check of each field, plus the rows and time of the whole run.
+    Time spent outside the checks, reading the file and storing messages, is seconds less check_seconds().
+    """
+
+    def __init__(self):
+        self.field_names = []
+        self.counters = {}
+        self.rows = 0
+        self.seconds = 0.0
+
+    def field_counters(self, field_name):
+        """The {check: [calls, hits, seconds]} of a field"""
+        counters = self.counters.get(field_name)
+        if counters is None:
+            counters = self.counters[field_name] = dict((check, [0, 0, 0.0]) for check in CHECKS)
+            self.field_names.append(field_name)
+        return counters
+
+    def items(self):
+        """(field name, check, calls, hits, seconds) for each check that ran, in field and check order"""
+        for field_name in self.field_names:
+            counters = self.counters[field_name]
+            for check in CHECKS:
+                calls, hits, seconds = counters[check]
+                if calls:
+                    yield field_name, check, calls, hits, seconds
+
+    def by_check(self):
+        """{check: (calls, hits, seconds)} summed over the fields"""
+        totals = {}
+        for field_name, check, calls, hits, seconds in self.items():
+            total = totals.get(check, (0, 0, 0.0))
+            totals[check] = (total[0] + calls, total[1] + hits, total[2] + seconds)
+        return totals
+
+    def by_field(self):
+        """{field name: (calls, hits, seconds)} summed over the checks"""
+        totals = {}
+        for field_name, check, calls, hits, seconds in self.items():
+            total = totals.get(field_name, (0, 0, 0.0))
+            totals[field_name] = (total[0] + calls, total[1] + hits, total[2] + seconds)
+        return totals
+
+    def check_seconds(self):
+        """Seconds spent in the checks"""
+        return sum(seconds for field_name, check, calls, hits, seconds in self.items())
+
+    def report(self, top=20):
+        """Lines of text: the totals, each check, then the slowest field checks"""
+        lines = ["%d rows in %.3f s, %.3f s in the checks" % (self.rows, self.seconds, self.check_seconds())]
+
+        by_check = self.by_check()
+        for check in CHECKS:
+            if check in by_check:
+                calls, hits, seconds = by_check[check]
+                lines.append("  %-11s %10d calls %8d hits %9.3f s" % (check, calls, hits, seconds))
+
+        slowest = sorted(self.items(), key=lambda item: item[4], reverse=True)[:top]
+        for field_name, check, calls, hits, seconds in slowest:
+            lines.append("  %-30s %-11s %10d calls %8d hits %9.3f s" % (field_name, check, calls, hits, seconds))
+
+        return lines
+
+def timed(check, counters, is_hit):
+    """Wrap check so each call adds to counters, [calls, hits, seconds]"""
+    timer = default_timer
+
+    def timed_check(*args):
+        start = timer()
+        result = check(*args)
+        counters[2] += timer() - start
+        counters[0] += 1
+        if is_hit(args, result):
+            counters[1] += 1
+        return result
+
+    return timed_check
+
+def message_returned(args, result):
+    return bool(result)
+
+def message_first(args, result):
+    return bool(result[0])
+
+def long_value(args, result):
+    return len(str(args[0])) > 255
+
+class TimedField():
+    """A Field whose checks record their time and counts in a ValidationStats"""
+
+    def __init__(self, field, stats):
+        self.field = field
+        self.field_name = field.field_name
+        self.field_type = field.field_type
+        self.field_description = field.field_description
+        self.field_optional = field.field_optional
+
+        counters = self.counters = stats.field_counters(field.field_name)
+        self.check_encoding = timed(field.check_encoding, counters["encoding"], message_returned)
+        self.fix_format = timed(field.fix_format, counters["format"], message_first)
+        self.check_uri_value = timed(field.check_uri_value, counters["uri"], message_first)
+        self.check_temp_units = timed(field.check_temp_units, counters["temp_units"], message_first)
+        self.check_srs = timed(field.check_srs, counters["srs"], message_first)
+        self.check_domain = timed(field.check_domain, counters["domain"], message_first)
+        self.check_field_length = timed(field.check_field_length, counters["length"], long_value)
+
+    def converter(self):
+        return timed(self.field.converter(), self.counters["type"], message_first)
+
+class ProfiledLayer():
+    """What LayerPlan needs of a Layer, with the fields timed"""
+
+    def __init__(self, layer, stats):
+        self.layer_name = layer.layer_name
+        self.fields = [TimedField(f, stats) for f in layer.fields]
+
+def profiled_plan(layer, stats):
+    """A plan for the layer whose checks record their time and counts in stats"""
+    plan = LayerPlan(ProfiledLayer(layer, stats))
+
+    # Every value goes through its field's timed encoding check
+    plan.encoding_by_row = False
+    return plan
@@ -0,0 +1,144 @@
+"""
+Validation results kept on disk so that running the tool again on an unchanged file skips straight to the output.
+Results are keyed by a hash of the input file, the sheet name, the schema version uri, the layer name and the
+validator itself, and the least recently used ones are removed once the cache grows past max_bytes.
+"""
+import hashlib
+import os
+
+from model_cache import ModelCache, atomic_write, dump_pickle, load_pickle, env_int
+
+# Hash of the validator's source, set the first time a key is made
+validator_version = None
+
+def hash_sources(paths):
+    """Hash the .py files of a list of files and directories (not their subdirectories) in a stable order"""
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.isdir(path):
+            names = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".py")]
+        else:
+            names = [path]
+        for name in names:
+            source_file = open(name, "rb")
+            try:
+                digest.update(os.path.basename(name) + "\0" + source_file.read())
+            finally:
+                source_file.close()
+    return digest.hexdigest()
+
+def get_validator_version():
+    """Hash the source files of this package, so results from another version of the validator aren't reused"""
+    global validator_version
+
+    if validator_version is None:
+        validator_version = hash_sources([os.path.dirname(os.path.abspath(__file__))])
+
+    return validator_version
+
+class ResultCache():
+
+    path = os.path.join(ModelCache.cache_dir, "results")
+
+    # Unless max_bytes is given it is read from USGINMODELS_RESULT_CACHE_BYTES when a result is stored
+    max_bytes = None
+    default_max_bytes = 256 * 1024 * 1024
+
+    def __init__(self, path=None, max_bytes=None):
+        if path is not None:
+            self.path = path
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+
+    def key(self, in_file, sheet_name, version_uri, layer_name, reader_version=""):
+        """
+        The key for validating the sheet (or "" for a csv file) of in_file against a layer. reader_version
+        identifies the code that reads a file that isn't csv, such as ExcelToCsv.converter_version() for a
+        spreadsheet, so a change to it doesn't reuse results it read differently.
+        """
+        digest = hashlib.sha1()
+        for part in (get_validator_version(), reader_version, sheet_name, version_uri, layer_name):
+            digest.update(unicode(part).encode("utf-8") + "\0")
+
+        input_file = open(in_file, "rb")
+        try:
+            for block in iter(lambda: input_file.read(1024 * 1024), ""):
+                digest.update(block)
+        finally:
+            input_file.close()
+
+        return digest.hexdigest()
+
+    def get_max_bytes(self):
+        if self.max_bytes is not None:
+            return self.max_bytes
+        return env_int("USGINMODELS_RESULT_CACHE_BYTES", self.default_max_bytes)
+
+    def result_path(self, key):
+        return os.path.join(self.path, key + ".result")
+
+    def get(self, key):
+        """Return the (valid, messages, dataCorrected, long_fields, srs) stored under key, or None"""
+        path = self.result_path(key)
+        result = load_pickle(path)
+        if result is None:
+            return None
+
+        # Mark it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return result
+
+    def put(self, key, result):
+        """
+        Store a validation result, then evict the least recently used results until the cache fits in max_bytes.
+        Failing to write is not fatal, the next run just validates again.
+        """
+        max_bytes = self.get_max_bytes()
+        data = dump_pickle(tuple(result))
+        if len(data) > max_bytes:
+            return
+
+        if atomic_write(self.result_path(key), data):
+            self.evict(max_bytes)
+
+    def evict(self, max_bytes=None):
+        """Remove the least recently used results until the rest fit in max_bytes"""
+        if max_bytes is None:
+            max_bytes = self.get_max_bytes()
+
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            if not name.endswith(".result"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for mtime, size, name in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every stored result"""
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.endswith(".result"):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
@@ -0,0 +1,161 @@
+"""
+A quick check of a file against a layer: the header plus a deterministic sample of rows (the first rows, the last
+rows and rows at a random stride through the rest) get the full set of checks, and the share of sampled rows with
+errors estimates the error rate of the whole file. Only the sampled rows are read, so it takes about as long on a
+million rows as on a thousand.
+"""
+from collections import deque
+import csv
+import os
+import random
+
+from messages import ReportLine, ERROR
+from plan import get_plan, ValidationState
+
+# Default sample: the first and last rows and this many rows spread through the rest
+HEAD = 100
+TAIL = 100
+SAMPLES = 300
+
+def sample_indexes(n_rows, head=HEAD, tail=TAIL, samples=SAMPLES, seed=0):
+    """Return the sorted indexes of the rows to sample out of n_rows, the same ones for the same seed"""
+    if n_rows <= head + tail + samples:
+        return range(n_rows)
+
+    indexes = range(head)
+
+    # One row from each of samples strides between the head and the tail
+    stride = float(n_rows - head - tail) / samples
+    rand = random.Random(seed)
+    indexes.extend(head + int(i * stride + rand.random() * stride) for i in xrange(samples))
+
+    indexes.extend(xrange(n_rows - tail, n_rows))
+    return indexes
+
+def read_csv_sample(csv_file, head=HEAD, tail=TAIL, samples=SAMPLES, seed=0):
+    """
+    Read the field names and a sample of rows from a csv file. Returns (field names, rows, estimated number of rows).
+    The rows after the head are found by seeking to byte offsets and starting at the next line, so a file that
+    can't seek is read from the start and the row count is only an estimate when the file is larger than the head.
+    """
+    reader = csv.reader(iter(csv_file.readline, ""))
+    try:
+        fieldnames = reader.next()
+    except StopIteration:
+        return [], [], 0
+
+    try:
+        header_end = csv_file.tell()
+        size = os.fstat(csv_file.fileno()).st_size
+    except (AttributeError, IOError, OSError):
+        header_end = size = None
+
+    rows = []
+    for row in reader:
+        rows.append(row)
+        if len(rows) == head:
+            break
+    else:
+        return fieldnames, rows, len(rows)
+
+    if size is not None:
+        head_end = csv_file.tell()
+        row_bytes = float(head_end - header_end) / head
+        estimated_rows = head + int((size - head_end) / row_bytes)
+
+    # The estimate is rough, a file that might be small enough to sample whole is read through like one that
+    # can't seek
+    if size is None or estimated_rows <= 2 * (head + tail + samples):
+        rest = list(reader)
+        indexes = sample_indexes(len(rest), 0, tail, samples, seed)
+        return fieldnames, rows + [rest[i] for i in indexes], head + len(rest)
+
+    # Leave room for the tail, found by reading the end of the file
+    tail_start = max(head_end, size - int(row_bytes * (tail + 1) * 2))
+
+    def row_at(offset):
+        """The first whole row after offset, or None if it doesn't fit the header"""
+        csv_file.seek(offset)
+        csv_file.readline()
+        try:
+            row = csv.reader(iter(csv_file.readline, "")).next()
+        except (StopIteration, csv.Error):
+            return None
+        return row if len(row) == len(fieldnames) else None
+
+    rand = random.Random(seed)
+    stride = float(tail_start - head_end) / samples
+    if stride >= row_bytes:
+        for i in xrange(samples):
+            row = row_at(head_end + int(i * stride + rand.random() * stride))
+            if row is not None:
+                rows.append(row)
+
+    csv_file.seek(tail_start)
+    if tail_start > head_end:
+        csv_file.readline()
+    last_rows = deque(maxlen=tail)
+    try:
+        for row in csv.reader(iter(csv_file.readline, "")):
+            if len(row) == len(fieldnames):
+                last_rows.append(row)
+    except csv.Error:
+        pass
+    rows.extend(last_rows)
+
+    return fieldnames, rows, estimated_rows
+
+class QuickCheck():
+    """
+    The result of a quick check. header_messages are about the field names, messages about the sampled rows,
+    each followed by how many of the sampled rows it was found in. error_rate is the share of sampled rows
+    with at least one error.
+    """
+
+    def __init__(self, header_messages, store, sampled, rows_with_errors, estimated_rows):
+        self.sampled = sampled
+        self.rows_with_errors = rows_with_errors
+        self.estimated_rows = estimated_rows
+        self.error_rate = float(rows_with_errors) / sampled if sampled else 0.0
+        self.valid = store.valid and not [msg for msg in header_messages if msg.severity >= ERROR]
+        self.header_messages = [ReportLine(msg.text(), msg.severity) for msg in header_messages]
+
+        self.messages = []
+        for msg, runs in store.items():
+            found = sum(last - first + 1 for first, last in runs)
+            self.messages.append(ReportLine(msg.text() + " (" + str(found) + " of " + str(sampled) + " sampled rows)", msg.severity))
+
+def check_sample(layer, fieldnames, rows, estimated_rows=None):
+    """
+    Run the checks of Layer.validate_file on sampled rows, lists of values in the order of fieldnames.
+    Fields missing from the header are reported once and the rest of the fields are still checked.
+    """
+    plan = get_plan(layer)
+    fieldnames = [field.strip() for field in fieldnames]
+    columns = plan.bind(fieldnames)
+
+    header_messages = [f.missing_message() for f, index in columns if index is None]
+    columns = [(f, index) for f, index in columns if index is not None or not f.required]
+
+    state = ValidationState()
+    store_add = state.messages.add
+    error_rows = set()
+
+    def add_message(row_num, msg):
+        if msg:
+            if msg.severity >= ERROR:
+                error_rows.add(row_num)
+            store_add(row_num, msg)
+    state.add_message = add_message
+
+    width = len(fieldnames)
+    for i, row in enumerate(rows):
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        for f, index in columns:
+            f.check("" if index is None else row[index], i, state)
+
+    if estimated_rows is None:
+        estimated_rows = len(rows)
+
+    return QuickCheck(header_messages, state.messages, len(rows), len(error_rows), estimated_rows)
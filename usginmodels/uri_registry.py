@@ -0,0 +1,79 @@
+"""
+Primary URIs that have already been submitted, kept in a local SQLite database so that a URI reused in a later
+spreadsheet is caught as well as one repeated within a file.
+"""
+import os
+import sqlite3
+import time
+
+from model_cache import ModelCache
+
+class UriRegistry():
+
+    path = os.path.join(ModelCache.cache_dir, "uris.sqlite")
+
+    def __init__(self, path=None):
+        if path:
+            self.path = path
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.text_factory = str
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS uris (
+                model_uri TEXT NOT NULL,
+                layer_name TEXT NOT NULL,
+                uri TEXT NOT NULL,
+                source TEXT NOT NULL,
+                submitted REAL NOT NULL,
+                PRIMARY KEY (model_uri, layer_name, uri)
+            );
+            CREATE INDEX IF NOT EXISTS uris_source ON uris (model_uri, layer_name, source);
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def find_collisions(self, model_uri, layer_name, uris, source):
+        """Return {uri: source} for the uris that another source has already submitted for this model and layer"""
+        cursor = self.connection.cursor()
+
+        # Look the uris up in one join rather than one query each
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (uri TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM lookup")
+        cursor.executemany("INSERT OR IGNORE INTO lookup (uri) VALUES (?)", ((uri,) for uri in uris))
+        cursor.execute("""
+            SELECT uris.uri, uris.source FROM lookup JOIN uris ON uris.uri = lookup.uri
+            WHERE uris.model_uri = ? AND uris.layer_name = ? AND uris.source != ?
+        """, (model_uri, layer_name, source))
+        collisions = dict(cursor.fetchall())
+
+        cursor.execute("DELETE FROM lookup")
+        self.connection.commit()
+
+        return collisions
+
+    def register(self, model_uri, layer_name, uris, source):
+        """Record the uris of a submission, replacing whatever that source submitted before"""
+        submitted = time.time()
+        cursor = self.connection.cursor()
+
+        try:
+            cursor.execute("DELETE FROM uris WHERE model_uri = ? AND layer_name = ? AND source = ?",
+                           (model_uri, layer_name, source))
+            cursor.executemany("INSERT OR IGNORE INTO uris (model_uri, layer_name, uri, source, submitted) VALUES (?, ?, ?, ?, ?)",
+                               ((model_uri, layer_name, uri, source, submitted) for uri in uris))
+        except:
+            self.connection.rollback()
+            raise
+
+        self.connection.commit()
+
+    def forget(self, model_uri, layer_name, source):
+        """Remove everything a source submitted for this model and layer"""
+        self.connection.execute("DELETE FROM uris WHERE model_uri = ? AND layer_name = ? AND source = ?",
+                                (model_uri, layer_name, source))
+        self.connection.commit()
@@ -0,0 +1,114 @@
+"""
+Validation as a stream of corrected rows. Only the state that has to span the whole file (primary URIs, SRS,
+temperature units, long fields and the row numbers of each message) is kept, so downstream writers can consume
+rows while validation is still running.
+
+An error budget (max_errors errors or max_messages different messages) stops reading the file once it is used up,
+so a badly broken file is rejected without checking every row. The report then ends with an error saying where
+validation stopped.
+"""
+from messages import format_messages, Message, ERROR
+from plan import get_plan, read_rows, ValidationState
+
+class ValidationSummary():
+
+    def __init__(self, state, rows, stopped, truncated=False):
+        self.valid = state.messages.valid
+        self.messages = format_messages(state.messages)
+        self.rows = rows
+
+        # Validation stops before the first row if a required field isn't in the file
+        self.stopped = stopped
+
+        # The error budget ran out, only the first rows were checked
+        self.truncated = truncated
+        self.long_fields = {} if stopped else state.long_fields
+        self.srs = "" if stopped else state.srs
+
+class ValidationRun():
+
+    def __init__(self, layer, csv_text, uri_registry=None, source="", max_errors=None, max_messages=None, plan=None):
+        self.layer = layer
+        self.csv_text = csv_text
+        self.uri_registry = uri_registry
+        self.source = source
+        self.max_errors = max_errors
+        self.max_messages = max_messages
+
+        self.plan = plan or get_plan(layer)
+        self.state = ValidationState(track_uris=uri_registry is not None)
+
+        # The header of the corrected data, which doesn't include the first field (OBJECTID) or last field (Shape)
+        self.header = list(self.plan.field_names)
+
+        # Set once all the rows have been read
+        self.summary = None
+
+    def rows(self):
+        """Yield the corrected rows"""
+        plan = self.plan
+        state = self.state
+
+        fieldnames, rows = read_rows(self.csv_text)
+        columns = plan.bind(fieldnames)
+
+        # A required field is missing
+        if not plan.check_header(columns, state):
+            self.summary = ValidationSummary(state, 0, True)
+            return
+
+        budget = self.max_errors is not None or self.max_messages is not None
+
+        i = -1
+        for i, row in enumerate(rows):
+            rowCorrected = plan.validate_row(row, i, columns, state)
+
+            if budget and self.over_budget(i):
+                self.summary = ValidationSummary(state, i + 1, False, True)
+                yield rowCorrected
+                return
+
+            yield rowCorrected
+
+        if self.uri_registry is not None:
+            self.layer.check_uri_registry(plan, state, self.uri_registry, self.source)
+
+        self.summary = ValidationSummary(state, i + 1, False)
+
+    def over_budget(self, row_num):
+        """If the error budget has run out, add the message saying validation stopped and return True"""
+        messages = self.state.messages
+
+        if self.max_errors is not None and messages.errors >= self.max_errors:
+            found = "1 error" if messages.errors == 1 else "%d errors" % messages.errors
+        elif self.max_messages is not None and len(messages) >= self.max_messages:
+            found = "1 different message" if len(messages) == 1 else "%d different messages" % len(messages)
+        else:
+            return False
+
+        self.state.add_message(row_num, Message(ERROR, "stopped", None, found))
+        return True
+
+    def __iter__(self):
+        """
+        Yield (row number, corrected row, text of the messages found in the row) for each row. The messages about
+        the header, such as a missing field, only come with the first row.
+        """
+        store_add = self.state.messages.add
+        row_messages = []
+        header_messages = set()
+
+        def add_message(row_num, msg):
+            if msg:
+                if row_num < 0:
+                    if msg in header_messages:
+                        store_add(row_num, msg)
+                        return
+                    header_messages.add(msg)
+                row_messages.append(msg)
+                store_add(row_num, msg)
+        self.state.add_message = add_message
+
+        for i, rowCorrected in enumerate(self.rows()):
+            yield i + 1, rowCorrected, [msg.text() for msg in row_messages]
+            del row_messages[:]